@@ -1,21 +1,46 @@
 """
 Analysis Team Agents
 """
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
+from langchain_core.runnables.config import ContextThreadPoolExecutor
 from agents.base import BaseAgent
-from tools.analysis_tools import analyze_sentiment, detect_patterns
+from agents.research_agents import format_article, retrieve_details, split_research_notes
+from config.settings import settings
+from tools.analysis_tools import analyze_sentiment, analyze_sentiment_batch, detect_patterns
+from tools.topic_memo import TopicMemo, get_topic_memo
+from utils.blobs import resolve_json, resolve_text
 from utils.logger import get_logger
+import asyncio
+import re
 
 logger = get_logger(__name__)
 
+_INSIGHTS_HEADING = re.compile(r"^[ \t*#_]*insights[*_]*[ \t]*(?::[*_]*|$)", re.IGNORECASE | re.MULTILINE)
+_SUMMARY_HEADING = re.compile(r"^[\s*#_]*summary[*_]*[ \t]*:?[*_]*", re.IGNORECASE)
+
+def split_topic_analysis(text: str) -> Tuple[str, str]:
+    """
+    Split a per-topic analysis into its summary and its insights.
+    
+    Text without an "Insights:" heading is all summary.
+    """
+    match = _INSIGHTS_HEADING.search(text)
+    summary, insights = (text[:match.start()], text[match.end():]) if match else (text, "")
+    summary = _SUMMARY_HEADING.sub("", summary.strip())
+    return summary.strip(), insights.strip()
+
 class AnalystAgent(BaseAgent):
     """Agent specialized in analyzing trends and patterns."""
     
+    # What the analysis covers; each retrieves its own relevant articles
+    SECTIONS = ("key insights", "market implications", "emerging trends")
+    
     def __init__(self):
         super().__init__(
             name="Analyst",
             temperature=0.5,
-            use_google=False  # Using Groq instead
+            use_google=False,  # Using Groq instead
+            expected_output_tokens=500
         )
     
     def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
@@ -23,42 +48,229 @@ class AnalystAgent(BaseAgent):
         logger.info(f"{self.name}: Starting analysis")
         
         try:
-            research_notes = state.get('research_notes', '')
+            if self._per_topic(state):
+                topic_articles = resolve_json(state['topic_articles'])
+                sections, pending = self._reuse_sections(topic_articles)
+                if pending:
+                    workers = max(1, min(settings.rate_limit_max_concurrency, len(pending)))
+                    with ContextThreadPoolExecutor(max_workers=workers) as executor:
+                        futures = {
+                            topic: executor.submit(self._analyze_topic, topic, topic_articles[topic])
+                            for topic in pending
+                        }
+                        sections.update({topic: future.result() for topic, future in futures.items()})
+                
+                prompt, patterns = self._synthesis_prompt(state, list(topic_articles), sections)
+                synthesis = self.invoke(prompt)
+                
+                logger.info(f"{self.name}: Analysis complete ({len(pending)} of {len(sections)} topics recomputed)")
+                return self._build_topic_result(list(topic_articles), sections, pending, synthesis, patterns)
             
-            # Detect patterns
-            topics = state.get('trending_topics', [])
-            patterns = detect_patterns.invoke({"data": topics})
+            prompt, patterns = self._build_prompt(state)
+            analysis = self.invoke(prompt)
             
-            # Perform analysis
-            prompt = f"""Analyze these research findings:
+            logger.info(f"{self.name}: Analysis complete")
+            return self._build_result(analysis, patterns)
+        
+        except Exception as e:
+            return self._error_result(e)
+    
+    async def aexecute(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyze research findings without blocking the event loop."""
+        logger.info(f"{self.name}: Starting analysis")
+        
+        try:
+            if self._per_topic(state):
+                topic_articles = resolve_json(state['topic_articles'])
+                sections, pending = self._reuse_sections(topic_articles)
+                semaphore = asyncio.Semaphore(max(1, settings.rate_limit_max_concurrency))
+                
+                async def analyze(topic: str) -> Dict[str, str]:
+                    async with semaphore:
+                        return await self._aanalyze_topic(topic, topic_articles[topic])
+                
+                results = await asyncio.gather(*[analyze(topic) for topic in pending])
+                sections.update(zip(pending, results))
+                
+                prompt, patterns = self._synthesis_prompt(state, list(topic_articles), sections)
+                synthesis = await self.ainvoke(prompt)
+                
+                logger.info(f"{self.name}: Analysis complete ({len(pending)} of {len(sections)} topics recomputed)")
+                return self._build_topic_result(list(topic_articles), sections, pending, synthesis, patterns)
+            
+            prompt, patterns = self._build_prompt(state)
+            analysis = await self.ainvoke(prompt)
+            
+            logger.info(f"{self.name}: Analysis complete")
+            return self._build_result(analysis, patterns)
+        
+        except Exception as e:
+            return self._error_result(e)
+    
+    def _build_prompt(self, state: Dict[str, Any]) -> Tuple[str, List[str]]:
+        """Detect patterns and format the analysis prompt."""
+        research_notes = resolve_text(state.get('research_notes'))
+        
+        # Detect patterns
+        patterns = detect_patterns.invoke({"data": self._pattern_texts(state)})
+        
+        # Perform analysis on the most relevant articles; article details are
+        # trimmed before the overview
+        research, articles = split_research_notes(research_notes)
+        articles = retrieve_details(state, articles, self.SECTIONS)
+        prompt = self.fit_prompt(
+            """Analyze these research findings:
 
-{research_notes}
+{research}{articles}
 
 Common Patterns:
-{chr(10).join(f'- {p}' for p in patterns)}
+{patterns}
 
 Provide:
 1. Key Insights (3-4 bullet points)
 2. Market Implications (2-3 sentences)
 3. Emerging Trends (2-3 bullet points)
 
-Keep it concise and actionable."""
-            
-            analysis = self.invoke(prompt)
-            
-            logger.info(f"{self.name}: Analysis complete")
-            return {
-                "analysis_results": analysis,
-                "patterns": patterns,
-                "next_agent": "writer"
-            }
+Keep it concise and actionable.""",
+            {"research": research, "articles": articles, "patterns": chr(10).join(f'- {p}' for p in patterns)},
+            trim_order=("articles", "research")
+        )
         
-        except Exception as e:
-            logger.error(f"{self.name} error: {str(e)}")
-            return {
-                "analysis_results": f"Analysis error: {str(e)}",
-                "next_agent": "writer"
+        return prompt, patterns
+    
+    @staticmethod
+    def _pattern_texts(state: Dict[str, Any]) -> List[str]:
+        """Topic names plus the text of every collected article."""
+        return state.get('trending_topics', []) + [
+            f"{article['title']}. {article['summary']}" for article in resolve_json(state.get('articles'), [])
+        ]
+    
+    def _per_topic(self, state: Dict[str, Any]) -> bool:
+        return settings.topic_memo_enabled and bool(state.get('topic_articles'))
+    
+    def _reuse_sections(self, topic_articles: Dict[str, List[dict]]) -> Tuple[Dict[str, Dict[str, str]], List[str]]:
+        """Look up every topic in the memo; return the reused sections and the topics to recompute."""
+        memo = get_topic_memo()
+        sections, pending = {}, []
+        for topic, articles in topic_articles.items():
+            entry = memo.lookup(topic, TopicMemo.fingerprint(articles))
+            if entry is None:
+                pending.append(topic)
+            else:
+                sections[topic] = {"summary": entry["summary"], "insights": entry["insights"]}
+        return sections, pending
+    
+    def _topic_prompt(self, topic: str, articles: List[dict]) -> str:
+        articles_text = "\n\n".join(format_article(article) for article in articles)
+        return self.fit_prompt(
+            """Analyze recent coverage of this trending topic: {topic}
+
+Articles:
+{articles}
+
+Reply in this format:
+Summary: (2 sentences)
+Insights:
+- (2-3 bullet points)""",
+            {"topic": topic, "articles": articles_text},
+            trim_order=("articles",)
+        )
+    
+    def _analyze_topic(self, topic: str, articles: List[dict]) -> Dict[str, str]:
+        analysis = self.invoke(self._topic_prompt(topic, articles))
+        return self._store_topic(topic, articles, analysis)
+    
+    async def _aanalyze_topic(self, topic: str, articles: List[dict]) -> Dict[str, str]:
+        analysis = await self.ainvoke(self._topic_prompt(topic, articles))
+        return self._store_topic(topic, articles, analysis)
+    
+    def _store_topic(self, topic: str, articles: List[dict], analysis: str) -> Dict[str, str]:
+        """Memoize a freshly computed topic as soon as it is ready."""
+        summary, insights = split_topic_analysis(analysis)
+        get_topic_memo().put(topic, TopicMemo.fingerprint(articles), articles, summary, insights)
+        return {"summary": summary, "insights": insights}
+    
+    @staticmethod
+    def _join_sections(topics: List[str], sections: Dict[str, Dict[str, str]]) -> str:
+        """The per-topic sections, in topic order."""
+        return "\n\n".join(
+            f"### {topic}\n{sections[topic]['summary']}\n\n{sections[topic]['insights']}".rstrip()
+            for topic in topics
+        )
+    
+    def _synthesis_prompt(
+        self,
+        state: Dict[str, Any],
+        topics: List[str],
+        sections: Dict[str, Dict[str, str]]
+    ) -> Tuple[str, List[str]]:
+        """
+        Format the cross-topic prompt over the per-topic sections.
+        
+        The sections stand in for the article details, so this call stays
+        much smaller than the full analysis prompt while still drawing on
+        the research overview and the detected patterns.
+        """
+        patterns = detect_patterns.invoke({"data": self._pattern_texts(state)})
+        research, _ = split_research_notes(resolve_text(state.get('research_notes')))
+        prompt = self.fit_prompt(
+            """Analyze these research findings:
+
+{research}
+
+Per-Topic Analysis:
+{sections}
+
+Common Patterns:
+{patterns}
+
+Provide:
+1. Key Insights (3-4 bullet points)
+2. Market Implications (2-3 sentences)
+3. Emerging Trends (2-3 bullet points)
+
+Keep it concise and actionable.""",
+            {
+                "research": research,
+                "sections": self._join_sections(topics, sections),
+                "patterns": chr(10).join(f'- {p}' for p in patterns)
+            },
+            trim_order=("sections", "research")
+        )
+        return prompt, patterns
+    
+    def _build_topic_result(
+        self,
+        topics: List[str],
+        sections: Dict[str, Dict[str, str]],
+        recomputed: List[str],
+        synthesis: str,
+        patterns: List[str]
+    ) -> Dict[str, Any]:
+        """Follow the cross-topic synthesis with the per-topic sections."""
+        analysis = f"{synthesis.strip()}\n\n{self._join_sections(topics, sections)}"
+        return {
+            **self._build_result(analysis, patterns),
+            "topic_sections": {
+                topic: "recomputed" if topic in recomputed else "reused"
+                for topic in topics
             }
+        }
+    
+    def _build_result(self, analysis: str, patterns: List[str]) -> Dict[str, Any]:
+        return {
+            "analysis_results": analysis,
+            "patterns": patterns,
+            "next_agent": "writer"
+        }
+    
+    def _error_result(self, e: Exception) -> Dict[str, Any]:
+        logger.error(f"{self.name} error: {str(e)}")
+        return {
+            "analysis_results": f"Analysis error: {str(e)}",
+            "next_agent": "writer",
+            **self._failure(e)
+        }
 
 class SentimentAnalyzer(BaseAgent):
     """Agent specialized in sentiment analysis."""
@@ -74,8 +286,13 @@ class SentimentAnalyzer(BaseAgent):
         logger.info(f"{self.name}: Analyzing sentiment")
         
         try:
-            research_notes = state.get('research_notes', '')
-            sentiment_data = analyze_sentiment.invoke({"text": research_notes})
+            # Score each article on its own; the notes stand in when there are none
+            articles = resolve_json(state.get('articles'), [])
+            if articles:
+                texts = [f"{article['title']}. {article['summary']}" for article in articles]
+                sentiment_data = analyze_sentiment_batch.invoke({"texts": texts})["aggregate"]
+            else:
+                sentiment_data = analyze_sentiment.invoke({"text": resolve_text(state.get('research_notes'))})
             
             logger.info(f"{self.name}: Sentiment is {sentiment_data['sentiment']}")
             return {
@@ -85,6 +302,7 @@ class SentimentAnalyzer(BaseAgent):
         except Exception as e:
             logger.error(f"{self.name} error: {str(e)}")
             return {
-                "sentiment_analysis": {"sentiment": "neutral", "score": 50}
+                "sentiment_analysis": {"sentiment": "neutral", "score": 50},
+                **self._failure(e)
             }
 
@@ -1,15 +1,27 @@
 """
 Base Agent Class
 """
+import asyncio
+import contextlib
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
-from langchain_groq import ChatGroq
-from langchain_google_genai import ChatGoogleGenerativeAI
+from typing import Dict, Any, AsyncIterator, Iterator, Optional, Sequence, Tuple
 from config.settings import settings
+from llm.cache import ResponseCache, get_response_cache
+from llm.clients import get_chat_model
+from llm.providers import Backend, get_provider_pool
+from llm.rate_limit import DEFAULT_OUTPUT_TOKENS, RateLimiter, get_rate_limiter
+from llm.routing import get_router
+from llm.semantic_cache import get_semantic_cache, parse_thresholds
 from utils.logger import get_logger
+from utils.tokens import context_budget, count_tokens, fit_sections
+from utils.tracing import tracer
 
 logger = get_logger(__name__)
 
+# Openings that mean the model declined rather than answered
+_REFUSAL_PREFIXES = ("i'm sorry", "i am sorry", "i cannot", "i can't", "as an ai")
+
 class BaseAgent(ABC):
     """Base class for all agents."""
     
@@ -18,39 +30,400 @@ class BaseAgent(ABC):
         name: str,
         model_name: str = None,
         temperature: float = 0.7,
-        use_google: bool = False
+        use_google: bool = False,
+        use_cache: Optional[bool] = None,
+        semantic_threshold: Optional[float] = None,
+        expected_output_tokens: Optional[int] = None,
+        latency_slo: Optional[float] = None,
+        cascade: Optional[bool] = None
     ):
         self.name = name
-        self.model_name = model_name or settings.default_model
+        self.provider = "google" if use_google else "groq"
+        self.model_name = model_name or (settings.fast_model if use_google else settings.default_model)
         self.temperature = temperature
         
-        logger.info(f"Initializing agent: {name}")
+        # Response caching is opt-in globally and can be toggled per agent
+        if use_cache is None:
+            excluded = {n.strip() for n in settings.llm_cache_exclude_agents.split(",") if n.strip()}
+            use_cache = settings.llm_cache_enabled and name not in excluded
+        self.use_cache = use_cache
         
-        # Initialize model
-        if use_google:
-            self.model = ChatGoogleGenerativeAI(
-                model=settings.fast_model,
-                temperature=temperature,
-                google_api_key=settings.google_api_key
-            )
-        else:
-            self.model = ChatGroq(
-                model=self.model_name,
-                temperature=temperature,
-                groq_api_key=settings.groq_api_key
+        # Near-duplicate prompts are served from the semantic tier when
+        # their similarity passes this agent's threshold (None disables it)
+        if semantic_threshold is None and settings.semantic_cache_enabled:
+            semantic_threshold = parse_thresholds(settings.semantic_cache_thresholds).get(
+                name, settings.semantic_cache_threshold
             )
+        self.semantic_threshold = semantic_threshold
+        
+        # Prompt token budget enforced by fit_prompt() (None disables trimming)
+        self.context_budget = context_budget(name)
+        
+        # Routing hints: rules in llm.routing may serve this stage from the
+        # cheap model, and a cascading agent tries the cheap model first and
+        # escalates to its own model when validate_output() rejects the answer
+        self.expected_output_tokens = expected_output_tokens
+        self.latency_slo = latency_slo
+        if cascade is None:
+            cascade = name in {n.strip() for n in settings.model_cascade_agents.split(",")}
+        self.cascade = cascade
+        self.last_model: Optional[str] = None
+        
+        logger.info(f"Initializing agent: {name}")
+        
+        # Initialize model (shared with other agents using the same settings)
+        self.model = get_chat_model(self.provider, self.model_name, temperature)
     
     @abstractmethod
     def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Execute agent's main task."""
         pass
     
-    def invoke(self, prompt: str) -> str:
-        """Invoke the model with a prompt."""
-        try:
-            response = self.model.invoke(prompt)
-            return response.content if hasattr(response, 'content') else str(response)
-        except Exception as e:
-            logger.error(f"Error in {self.name}: {str(e)}")
-            raise
+    async def aexecute(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Execute agent's main task asynchronously.
+        
+        Agents without a native async implementation run execute() in a
+        worker thread so they never block the event loop.
+        """
+        return await asyncio.to_thread(self.execute, state)
+    
+    def fit_prompt(self, template: str, sections: Dict[str, str], trim_order: Sequence[str]) -> str:
+        """
+        Fill a prompt template, trimming sections to fit the context budget.
+        
+        Args:
+            template: str.format template with one placeholder per section
+            sections: Section name -> text
+            trim_order: Sections that may be trimmed, lowest priority first
+        
+        Returns:
+            The formatted prompt
+        """
+        if self.context_budget is None:
+            return template.format(**sections)
+        
+        overhead = count_tokens(template.format(**{name: "" for name in sections}))
+        fitted, _ = fit_sections(sections, trim_order, self.context_budget - overhead, label=self.name)
+        return template.format(**fitted)
+    
+    def invoke(self, prompt: str, semantic_text: Optional[str] = None) -> str:
+        """
+        Invoke the model with a prompt.
+        
+        Args:
+            prompt: Text prompt for the model
+            semantic_text: The user-supplied part of the prompt, compared by
+                similarity in the semantic cache (defaults to the whole prompt)
+        """
+        with self._span(prompt) as span:
+            model_name, escalation = self._route(prompt)
+            route = self._route_label(model_name, escalation)
+            key, cached = self._cache_lookup(prompt, semantic_text, route)
+            if cached is not None:
+                span.set(cached=True, completion_chars=len(cached))
+                return cached
+            
+            try:
+                start = time.perf_counter()
+                response, served = self._invoke_model(model_name, prompt)
+                content = self._content(response)
+                if escalation is not None and not self.validate_output(prompt, content):
+                    logger.info(f"{self.name}: {model_name} output failed validation, escalating to {escalation}")
+                    model_name = escalation
+                    response, served = self._invoke_model(model_name, prompt)
+                    content = self._content(response)
+            except Exception as e:
+                logger.error(f"Error in {self.name}: {str(e)}")
+                raise
+            
+            self._record_model(span, served, escalated=model_name == escalation)
+            span.set(completion_chars=len(content), **self._usage(response))
+            self._cache_store(key, prompt, semantic_text, content, time.perf_counter() - start, route)
+            return content
+    
+    async def ainvoke(self, prompt: str, semantic_text: Optional[str] = None) -> str:
+        """Invoke the model asynchronously with a prompt."""
+        with self._span(prompt) as span:
+            model_name, escalation = self._route(prompt)
+            route = self._route_label(model_name, escalation)
+            key, cached = self._cache_lookup(prompt, semantic_text, route)
+            if cached is not None:
+                span.set(cached=True, completion_chars=len(cached))
+                return cached
+            
+            try:
+                start = time.perf_counter()
+                response, served = await self._ainvoke_model(model_name, prompt)
+                content = self._content(response)
+                if escalation is not None and not self.validate_output(prompt, content):
+                    logger.info(f"{self.name}: {model_name} output failed validation, escalating to {escalation}")
+                    model_name = escalation
+                    response, served = await self._ainvoke_model(model_name, prompt)
+                    content = self._content(response)
+            except Exception as e:
+                logger.error(f"Error in {self.name}: {str(e)}")
+                raise
+            
+            self._record_model(span, served, escalated=model_name == escalation)
+            span.set(completion_chars=len(content), **self._usage(response))
+            self._cache_store(key, prompt, semantic_text, content, time.perf_counter() - start, route)
+            return content
+    
+    def stream(self, prompt: str, semantic_text: Optional[str] = None) -> Iterator[str]:
+        """
+        Invoke the model and yield the response text as it is generated.
+        
+        Cached responses are yielded as a single chunk; streamed responses
+        are stored in the cache once complete. Streams are routed but never
+        cascade, since tokens can't be taken back once yielded.
+        """
+        with self._span(prompt, streamed=True) as span:
+            model_name, _ = self._route(prompt, allow_cascade=False)
+            key, cached = self._cache_lookup(prompt, semantic_text, model_name)
+            if cached is not None:
+                span.set(cached=True, completion_chars=len(cached))
+                yield cached
+                return
+            
+            # A stream can't fail over midway, so it runs on one healthy backend
+            backend = self._select_backend(model_name)
+            chunks = []
+            try:
+                start = time.perf_counter()
+                with self._rate_limit_slot(backend, prompt):
+                    for chunk in self._client(backend[1], backend[0]).stream(prompt):
+                        text = chunk.content if hasattr(chunk, 'content') else str(chunk)
+                        if text:
+                            chunks.append(text)
+                            yield text
+            except Exception as e:
+                logger.error(f"Error in {self.name}: {str(e)}")
+                self._record_backend(backend, start, ok=False)
+                raise
+            
+            content = "".join(chunks)
+            self._record_backend(backend, start, ok=True)
+            self._record_model(span, self._served_label(backend))
+            span.set(completion_chars=len(content))
+            self._cache_store(key, prompt, semantic_text, content, time.perf_counter() - start, model_name)
+    
+    async def astream(self, prompt: str, semantic_text: Optional[str] = None) -> AsyncIterator[str]:
+        """Async variant of stream()."""
+        with self._span(prompt, streamed=True) as span:
+            model_name, _ = self._route(prompt, allow_cascade=False)
+            key, cached = self._cache_lookup(prompt, semantic_text, model_name)
+            if cached is not None:
+                span.set(cached=True, completion_chars=len(cached))
+                yield cached
+                return
+            
+            backend = self._select_backend(model_name)
+            chunks = []
+            try:
+                start = time.perf_counter()
+                async with self._arate_limit_slot(backend, prompt):
+                    async for chunk in self._client(backend[1], backend[0]).astream(prompt):
+                        text = chunk.content if hasattr(chunk, 'content') else str(chunk)
+                        if text:
+                            chunks.append(text)
+                            yield text
+            except Exception as e:
+                logger.error(f"Error in {self.name}: {str(e)}")
+                self._record_backend(backend, start, ok=False)
+                raise
+            
+            content = "".join(chunks)
+            self._record_backend(backend, start, ok=True)
+            self._record_model(span, self._served_label(backend))
+            span.set(completion_chars=len(content))
+            self._cache_store(key, prompt, semantic_text, content, time.perf_counter() - start, model_name)
+    
+    def _failure(self, e: Exception) -> Dict[str, Any]:
+        """State update recording a failed step, so a checkpointed run can resume from it."""
+        return {"errors": [{"agent": self.name, "error": str(e)}]}
+    
+    def validate_output(self, prompt: str, content: str) -> bool:
+        """
+        Decide whether a cheap-model answer is good enough to keep.
+        
+        Used by cascading agents; override for stage-specific checks.
+        """
+        text = content.strip().lower()
+        return bool(text) and not text.startswith(_REFUSAL_PREFIXES)
+    
+    def _route(self, prompt: str, allow_cascade: bool = True) -> Tuple[str, Optional[str]]:
+        """
+        Return (model for the first attempt, model to escalate to or None).
+        
+        Routing only picks among the agent's provider models; Google-backed
+        agents always use their own model.
+        """
+        if self.provider != "groq":
+            return self.model_name, None
+        
+        model_name = self.model_name
+        if settings.model_routing_enabled:
+            model_name = get_router().route(
+                self.name,
+                count_tokens(prompt),
+                fallback=self.model_name,
+                expected_output_tokens=self.expected_output_tokens,
+                latency_slo=self.latency_slo
+            )
+        
+        if allow_cascade and self.cascade:
+            first = settings.cheap_model if model_name == self.model_name else model_name
+            if first != self.model_name:
+                return first, self.model_name
+        return model_name, None
+    
+    @staticmethod
+    def _route_label(model_name: str, escalation: Optional[str]) -> str:
+        # Cascaded answers may come from either model, so they get their own cache entries
+        return model_name if escalation is None else f"{model_name}>{escalation}"
+    
+    def _client(self, model_name: str, provider: Optional[str] = None):
+        provider = provider or self.provider
+        if provider == self.provider and model_name == self.model_name:
+            return self.model
+        return get_chat_model(provider, model_name, self.temperature)
+    
+    def _rate_limiter(self, backend: Backend) -> Optional[RateLimiter]:
+        return get_rate_limiter(*backend) if settings.rate_limit_enabled else None
+    
+    def _token_estimate(self, prompt: str) -> int:
+        """Tokens reserved against the model's budget: the prompt plus the expected output."""
+        return count_tokens(prompt) + (self.expected_output_tokens or DEFAULT_OUTPUT_TOKENS)
+    
+    def _invoke_model(self, model_name: str, prompt: str) -> Tuple[Any, str]:
+        """
+        Call a model through the provider pool, under each backend's rate limiter.
+        
+        Returns:
+            (response, label of the backend that served it)
+        """
+        def call(provider: str, model: str) -> Any:
+            client = self._client(model, provider)
+            limiter = self._rate_limiter((provider, model))
+            if limiter is None:
+                return client.invoke(prompt)
+            return limiter.call(lambda: client.invoke(prompt), self._token_estimate(prompt))
+        
+        if not settings.provider_pool_enabled:
+            return call(self.provider, model_name), model_name
+        backend, response = get_provider_pool().call((self.provider, model_name), call)
+        return response, self._served_label(backend)
+    
+    async def _ainvoke_model(self, model_name: str, prompt: str) -> Tuple[Any, str]:
+        async def call(provider: str, model: str) -> Any:
+            client = self._client(model, provider)
+            limiter = self._rate_limiter((provider, model))
+            if limiter is None:
+                return await client.ainvoke(prompt)
+            return await limiter.acall(lambda: client.ainvoke(prompt), self._token_estimate(prompt))
+        
+        if not settings.provider_pool_enabled:
+            return await call(self.provider, model_name), model_name
+        backend, response = await get_provider_pool().acall((self.provider, model_name), call)
+        return response, self._served_label(backend)
+    
+    def _select_backend(self, model_name: str) -> Backend:
+        if not settings.provider_pool_enabled:
+            return self.provider, model_name
+        return get_provider_pool().select((self.provider, model_name))
+    
+    def _record_backend(self, backend: Backend, start: float, ok: bool):
+        if settings.provider_pool_enabled:
+            get_provider_pool().record(backend, time.perf_counter() - start, ok)
+    
+    def _served_label(self, backend: Backend) -> str:
+        # Models on the agent's own provider keep their plain name
+        provider, model = backend
+        return model if provider == self.provider else f"{provider}:{model}"
+    
+    def _rate_limit_slot(self, backend: Backend, prompt: str):
+        # Streams hold a slot for their whole duration and are not retried
+        limiter = self._rate_limiter(backend)
+        return limiter.slot(self._token_estimate(prompt)) if limiter else contextlib.nullcontext()
+    
+    def _arate_limit_slot(self, backend: Backend, prompt: str):
+        limiter = self._rate_limiter(backend)
+        return limiter.aslot(self._token_estimate(prompt)) if limiter else contextlib.nullcontext()
+    
+    @staticmethod
+    def _content(response: Any) -> str:
+        return response.content if hasattr(response, 'content') else str(response)
+    
+    def _record_model(self, span, model_name: str, escalated: bool = False):
+        """Remember which model served the call (agent, router stats and trace span)."""
+        self.last_model = model_name
+        get_router().record(self.name, model_name, escalated)
+        span.set(served_by=model_name, escalated=escalated)
+        if model_name != self.model_name:
+            logger.debug(f"{self.name}: Served by {model_name}")
+    
+    def _span(self, prompt: str, **attributes):
+        """Open an "llm" span for a model call (a no-op while tracing is off)."""
+        if not tracer.enabled:
+            return tracer.span("llm", self.name)
+        return tracer.span(
+            "llm", self.name,
+            provider=self.provider,
+            model=self.model_name,
+            prompt_chars=len(prompt),
+            **attributes
+        )
+    
+    @staticmethod
+    def _usage(response: Any) -> Dict[str, int]:
+        """Token counts reported by the provider, when available."""
+        usage = getattr(response, "usage_metadata", None) or {}
+        return {k: usage[k] for k in ("input_tokens", "output_tokens") if k in usage}
+    
+    def _cache_lookup(self, prompt: str, semantic_text: Optional[str] = None, route: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Return (cache key, cached response) for a prompt.
+        
+        The exact-match tier is checked first, then the semantic tier.
+        Entries are keyed by route (the model or cascade serving the call).
+        """
+        route = route or self.model_name
+        key = None
+        if self.use_cache:
+            key = ResponseCache.make_key(self.provider, route, self.temperature, prompt)
+            cached = get_response_cache().get(key)
+            if cached is not None:
+                logger.debug(f"{self.name}: Response cache hit")
+                return key, cached
+        
+        if self.semantic_threshold is not None:
+            scope, text = self._semantic_scope(prompt, semantic_text, route)
+            cached = get_semantic_cache().lookup(scope, text, self.semantic_threshold)
+            if cached is not None:
+                logger.debug(f"{self.name}: Semantic cache hit")
+                return key, cached
+        
+        return key, None
+    
+    def _cache_store(self, key: Optional[str], prompt: str, semantic_text: Optional[str], content: str, latency: float, route: Optional[str] = None):
+        if not content:
+            return
+        if key is not None:
+            get_response_cache().set(key, content, latency)
+        if self.semantic_threshold is not None:
+            scope, text = self._semantic_scope(prompt, semantic_text, route or self.model_name)
+            get_semantic_cache().add(scope, text, content)
+    
+    def _semantic_scope(self, prompt: str, semantic_text: Optional[str], route: str) -> Tuple[str, str]:
+        """
+        Split a prompt into an exact-match scope and the text compared by similarity.
+        
+        Only the user-supplied part is embedded; the rest of the prompt must
+        match exactly, so a shared template can't make unrelated tasks look alike.
+        """
+        if semantic_text:
+            fixed = prompt.replace(semantic_text, "")
+            return ResponseCache.make_key(self.provider, route, self.temperature, fixed), semantic_text
+        return ResponseCache.make_key(self.provider, route, self.temperature, ""), prompt
 
@@ -1,13 +1,64 @@
 """
 Research Team Agents
 """
-from typing import Dict, Any, List
+import asyncio
+from typing import Dict, Any, List, Sequence, Tuple
+from langchain_core.runnables.config import ContextThreadPoolExecutor
 from agents.base import BaseAgent
+from config.settings import settings
+from tools.data_tools import summarize_texts
+from tools.dedup import dedup_articles, get_dedup_index
+from tools.retrieval import get_passage_index
 from tools.search_tools import fetch_trending_topics, search_articles
+from tools.topic_memo import get_topic_memo
+from utils.blobs import resolve_json, resolve_text, store_json, store_text
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Heading the Data Collector uses for the article details it appends to research notes
+DETAILED_DATA_HEADER = "## Detailed Research Data"
+
+def split_research_notes(notes: str) -> Tuple[str, str]:
+    """
+    Split research notes into the overview and the appended article details.
+    
+    The parts concatenate back to the original notes, so prompts built
+    from them are unchanged unless a part is trimmed.
+    """
+    index = notes.find("\n\n" + DETAILED_DATA_HEADER)
+    if index < 0:
+        return notes, ""
+    return notes[:index], notes[index:]
+
+def format_article(article: Dict[str, Any]) -> str:
+    return f"**{article['title']}**\n{article['summary']}\nSource: {article['source']}"
+
+def retrieve_details(state: Dict[str, Any], details: str, sections: Sequence[str]) -> str:
+    """
+    Narrow the article details of the notes to the passages an agent needs.
+    
+    Articles are ranked against the task combined with each of the
+    agent's sections, and the retrieval_top_k best are kept in their
+    original order, so the prompt stays about the same size however many
+    articles were collected.
+    
+    Args:
+        state: Current workflow state (its articles and current_task)
+        details: The article details from split_research_notes
+        sections: What the agent writes about, one query per section
+    """
+    articles = resolve_json(state.get('articles'), [])
+    if not settings.retrieval_enabled or not details or len(articles) <= settings.retrieval_top_k:
+        return details
+    
+    passages = [format_article(article) for article in articles]
+    task = state.get('current_task', '')
+    index = get_passage_index(passages, settings.retrieval_dim)
+    chosen = index.select([f"{task} {section}" for section in sections], settings.retrieval_top_k)
+    logger.info(f"Retrieved {len(chosen)} of {len(passages)} articles for: {', '.join(sections)}")
+    return f"\n\n{DETAILED_DATA_HEADER}\n\n" + "\n\n".join(passages[i] for i in chosen)
+
 class ResearchAgent(BaseAgent):
     """Agent specialized in gathering trending information."""
     
@@ -15,7 +66,8 @@ class ResearchAgent(BaseAgent):
         super().__init__(
             name="Researcher",
             temperature=0.3,
-            use_google=False  # Using Groq instead
+            use_google=False,  # Using Groq instead
+            expected_output_tokens=150  # 2-3 sentence overview
         )
     
     def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
@@ -25,39 +77,64 @@ class ResearchAgent(BaseAgent):
         try:
             # Fetch trending topics
             topics = fetch_trending_topics.invoke({"timeframe": "week", "limit": 5})
+            overview = self.invoke(self._build_prompt(state, topics), semantic_text=self._task(state))
             
-            # Format research notes
-            prompt = f"""You are a research specialist.
+            logger.info(f"{self.name}: Research complete")
+            return self._build_result(topics, overview)
+        
+        except Exception as e:
+            return self._error_result(e)
+    
+    async def aexecute(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Gather trending topics without blocking the event loop."""
+        logger.info(f"{self.name}: Starting research")
+        
+        try:
+            topics = await fetch_trending_topics.ainvoke({"timeframe": "week", "limit": 5})
+            overview = await self.ainvoke(self._build_prompt(state, topics), semantic_text=self._task(state))
             
-Task: {state.get('current_task', 'Research trending topics')}
+            logger.info(f"{self.name}: Research complete")
+            return self._build_result(topics, overview)
+        
+        except Exception as e:
+            return self._error_result(e)
+    
+    def _task(self, state: Dict[str, Any]) -> str:
+        return state.get('current_task', 'Research trending topics')
+    
+    def _build_prompt(self, state: Dict[str, Any], topics: List[str]) -> str:
+        """Format the overview prompt for the fetched topics."""
+        return f"""You are a research specialist.
+
+Task: {self._task(state)}
 
 I've found these trending topics:
 {chr(10).join(f'{i+1}. {topic}' for i, topic in enumerate(topics))}
 
 Create a brief overview of why these topics are trending (2-3 sentences total)."""
-            
-            overview = self.invoke(prompt)
-            
-            research_notes = f"""## Trending Topics
+    
+    def _build_result(self, topics: List[str], overview: str) -> Dict[str, Any]:
+        """Format research notes into a state update."""
+        research_notes = f"""## Trending Topics
 
 {chr(10).join(f'{i+1}. {topic}' for i, topic in enumerate(topics))}
 
 ## Overview
 {overview}"""
-            
-            logger.info(f"{self.name}: Research complete")
-            return {
-                "research_notes": research_notes,
-                "trending_topics": topics,
-                "next_agent": "collector"
-            }
         
-        except Exception as e:
-            logger.error(f"{self.name} error: {str(e)}")
-            return {
-                "research_notes": f"Error in research: {str(e)}",
-                "next_agent": "analyst"
-            }
+        return {
+            "research_notes": store_text(research_notes),
+            "trending_topics": topics,
+            "next_agent": "collector"
+        }
+    
+    def _error_result(self, e: Exception) -> Dict[str, Any]:
+        logger.error(f"{self.name} error: {str(e)}")
+        return {
+            "research_notes": f"Error in research: {str(e)}",
+            "next_agent": "analyst",
+            **self._failure(e)
+        }
 
 class DataCollectorAgent(BaseAgent):
     """Agent specialized in gathering detailed information."""
@@ -75,37 +152,130 @@ class DataCollectorAgent(BaseAgent):
         
         try:
             topics = state.get('trending_topics', [])
-            all_articles = []
             
-            # Gather articles for each topic
-            for topic in topics[:3]:  # Limit to 3 topics for speed
-                articles = search_articles.invoke({
-                    "topic": topic,
-                    "max_results": 2
-                })
-                all_articles.extend(articles)
+            # Gather articles for every topic concurrently, bounded by the
+            # configured concurrency so total time tracks the slowest search
+            workers = max(1, min(settings.search_concurrency, len(topics)))
+            with ContextThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(self._search_topic, topic) for topic in topics]
+                results = [future.exception() or future.result() for future in futures]
+            topic_articles = self._merge_results(topics, results)
             
-            # Format detailed data
-            articles_text = "\n\n".join([
-                f"**{article['title']}**\n{article['summary']}\nSource: {article['source']}"
-                for article in all_articles
-            ])
+            logger.info(f"{self.name}: Data collection complete")
+            return self._build_result(state, topic_articles)
+        
+        except Exception as e:
+            logger.error(f"{self.name} error: {str(e)}")
+            return {"next_agent": "analyst", **self._failure(e)}
+    
+    async def aexecute(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Collect detailed data about topics without blocking the event loop."""
+        logger.info(f"{self.name}: Collecting data")
+        
+        try:
+            topics = state.get('trending_topics', [])
+            semaphore = asyncio.Semaphore(max(1, settings.search_concurrency))
             
-            detailed_data = f"""## Detailed Research Data
-
-{articles_text}"""
+            async def search(topic: str):
+                async with semaphore:
+                    return await self._asearch_topic(topic)
             
-            # Combine with existing research
-            updated_notes = state.get('research_notes', '') + "\n\n" + detailed_data
+            results = await asyncio.gather(*[search(topic) for topic in topics], return_exceptions=True)
+            topic_articles = self._merge_results(topics, results)
             
             logger.info(f"{self.name}: Data collection complete")
-            return {
-                "research_notes": updated_notes,
-                "articles": all_articles,
-                "next_agent": "analyst"
-            }
+            return self._build_result(state, topic_articles)
         
         except Exception as e:
             logger.error(f"{self.name} error: {str(e)}")
-            return {"next_agent": "analyst"}
+            return {"next_agent": "analyst", **self._failure(e)}
+    
+    def _search_topic(self, topic: str) -> List[Dict[str, str]]:
+        return search_articles.invoke({
+            "topic": topic,
+            "max_results": 2
+        })
+    
+    async def _asearch_topic(self, topic: str) -> List[Dict[str, str]]:
+        return await search_articles.ainvoke({
+            "topic": topic,
+            "max_results": 2
+        })
+    
+    def _merge_results(self, topics: List[str], results: List[Any]) -> Dict[str, List[Dict[str, str]]]:
+        """
+        Map each topic to its articles, in topic order.
+        
+        A topic whose search failed falls back to the articles stored in
+        the topic memo, and is skipped if there are none.
+        """
+        topic_articles = {}
+        for topic, result in zip(topics, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"{self.name}: Search failed for '{topic}': {str(result)}")
+                entry = get_topic_memo().get(topic) if settings.topic_memo_enabled else None
+                if entry is None:
+                    continue
+                logger.info(f"{self.name}: Reusing stored articles for '{topic}'")
+                result = entry["articles"]
+            topic_articles[topic] = result
+        return topic_articles
+    
+    def _shrink_articles(self, topic_articles: Dict[str, List[Dict[str, str]]]) -> Dict[str, List[Dict[str, str]]]:
+        """Summarize article text longer than article_summary_chars, without a model call."""
+        limit = settings.article_summary_chars
+        long_articles = [
+            article for articles in topic_articles.values() for article in articles
+            if limit and len(article['summary']) > limit
+        ]
+        if not long_articles:
+            return topic_articles
+        
+        summaries = summarize_texts.invoke({
+            "texts": [article['summary'] for article in long_articles],
+            "max_length": limit
+        })
+        shortened = {id(article): summary for article, summary in zip(long_articles, summaries)}
+        return {
+            topic: [
+                {**article, "summary": shortened[id(article)]} if id(article) in shortened else article
+                for article in articles
+            ]
+            for topic, articles in topic_articles.items()
+        }
+    
+    def _build_result(self, state: Dict[str, Any], topic_articles: Dict[str, List[Dict[str, str]]]) -> Dict[str, Any]:
+        """
+        Append collected articles to the research notes.
+        
+        The notes and articles go into the blob store; the state update
+        only carries their references.
+        """
+        dedup_stats = {}
+        if settings.dedup_enabled:
+            topic_articles, dedup_stats = dedup_articles(topic_articles, get_dedup_index())
+            logger.info(
+                f"{self.name}: Removed {dedup_stats['duplicates']} near-duplicate articles "
+                f"({dedup_stats['tokens_removed']} tokens)"
+            )
+        topic_articles = self._shrink_articles(topic_articles)
+        all_articles = [article for articles in topic_articles.values() for article in articles]
+        
+        # Format detailed data
+        articles_text = "\n\n".join(format_article(article) for article in all_articles)
+        
+        detailed_data = f"""{DETAILED_DATA_HEADER}
+
+{articles_text}"""
+        
+        # Combine with existing research
+        updated_notes = resolve_text(state.get('research_notes')) + "\n\n" + detailed_data
+        
+        return {
+            "research_notes": store_text(updated_notes),
+            "articles": store_json(all_articles),
+            "topic_articles": store_json(topic_articles),
+            "dedup_stats": dedup_stats,
+            "next_agent": "analyst"
+        }
 
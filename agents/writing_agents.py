@@ -1,9 +1,11 @@
 """
 Writing Team Agents
 """
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Optional
 from agents.base import BaseAgent
+from agents.research_agents import retrieve_details, split_research_notes
 from config.settings import settings
+from utils.blobs import resolve_text
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -11,28 +13,88 @@ logger = get_logger(__name__)
 class WriterAgent(BaseAgent):
     """Agent specialized in creating final reports."""
     
+    # Report sections; each retrieves its own relevant articles
+    SECTIONS = ("key developments", "strategic insights and opportunities", "recommendations")
+    
     def __init__(self):
         super().__init__(
             name="Writer",
             model_name="llama-3.3-70b-versatile",
-            temperature=0.7
+            temperature=0.7,
+            expected_output_tokens=1200
         )
     
-    def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        """Create final report."""
+    def execute(self, state: Dict[str, Any], on_token: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """
+        Create final report.
+        
+        Args:
+            state: Current workflow state
+            on_token: Called with each chunk of the report as it streams in
+        """
+        logger.info(f"{self.name}: Writing report")
+        
+        try:
+            prompt = self._build_prompt(state)
+            if on_token is None:
+                report = self.invoke(prompt)
+            else:
+                chunks = []
+                for chunk in self.stream(prompt):
+                    chunks.append(chunk)
+                    on_token(chunk)
+                report = "".join(chunks)
+            
+            report += self._sections_note(state, on_token)
+            logger.info(f"{self.name}: Report complete")
+            return self._build_result(report)
+        
+        except Exception as e:
+            return self._error_result(e)
+    
+    async def aexecute(self, state: Dict[str, Any], on_token: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """Create final report without blocking the event loop."""
         logger.info(f"{self.name}: Writing report")
         
         try:
-            research_notes = state.get('research_notes', '')
-            analysis_results = state.get('analysis_results', '')
+            prompt = self._build_prompt(state)
+            if on_token is None:
+                report = await self.ainvoke(prompt)
+            else:
+                chunks = []
+                async for chunk in self.astream(prompt):
+                    chunks.append(chunk)
+                    on_token(chunk)
+                report = "".join(chunks)
             
-            prompt = f"""Create an executive summary for tech professionals.
+            report += self._sections_note(state, on_token)
+            logger.info(f"{self.name}: Report complete")
+            return self._build_result(report)
+        
+        except Exception as e:
+            return self._error_result(e)
+    
+    def _build_prompt(self, state: Dict[str, Any]) -> str:
+        """Format the report prompt from research and analysis."""
+        research_notes = resolve_text(state.get('research_notes'))
+        analysis_results = state.get('analysis_results', '')
+        
+        sentiment = state.get('sentiment_analysis')
+        if sentiment:
+            analysis_results += f"\n\nOverall sentiment: {sentiment.get('sentiment', 'neutral')} (score: {sentiment.get('score', 50)}/100)"
+        
+        # Only the articles relevant to the report's sections are included; under
+        # the context budget, they go first, then analysis, then the overview
+        research, articles = split_research_notes(research_notes)
+        articles = retrieve_details(state, articles, self.SECTIONS)
+        return self.fit_prompt(
+            """Create an executive summary for tech professionals.
 
 **Research Findings:**
-{research_notes}
+{research}{articles}
 
 **Analysis:**
-{analysis_results}
+{analysis}
 
 Format as:
 # Weekly Tech Intelligence Report
@@ -49,22 +111,46 @@ Format as:
 ## Recommendations
 (3-4 actionable recommendations)
 
-Keep it professional, concise, and focused on actionable insights."""
-            
-            report = self.invoke(prompt)
-            
-            logger.info(f"{self.name}: Report complete")
-            return {
-                "final_report": report,
-                "next_agent": "END"
-            }
+Keep it professional, concise, and focused on actionable insights.""",
+            {"research": research, "articles": articles, "analysis": analysis_results},
+            trim_order=("articles", "analysis", "research")
+        )
+    
+    def _sections_note(self, state: Dict[str, Any], on_token: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Footnote listing which topic sections were reused from the topic memo.
         
-        except Exception as e:
-            logger.error(f"{self.name} error: {str(e)}")
-            return {
-                "final_report": f"Error generating report: {str(e)}",
-                "next_agent": "END"
-            }
+        Args:
+            state: Current workflow state
+            on_token: Also receives the note when the report is streamed
+        """
+        sections = state.get('topic_sections')
+        if not sections:
+            return ""
+        
+        reused = [topic for topic, status in sections.items() if status == "reused"]
+        recomputed = [topic for topic, status in sections.items() if status != "reused"]
+        note = (
+            f"\n\n---\n*Topic sections: {len(reused)} reused, {len(recomputed)} recomputed*\n\n"
+            + "\n".join(f"- {topic}: {status}" for topic, status in sections.items())
+        )
+        if on_token is not None:
+            on_token(note)
+        return note
+    
+    def _build_result(self, report: str) -> Dict[str, Any]:
+        return {
+            "final_report": report,
+            "next_agent": "END"
+        }
+    
+    def _error_result(self, e: Exception) -> Dict[str, Any]:
+        logger.error(f"{self.name} error: {str(e)}")
+        return {
+            "final_report": f"Error generating report: {str(e)}",
+            "next_agent": "END",
+            **self._failure(e)
+        }
 
 class EditorAgent(BaseAgent):
     """Agent specialized in editing and refining content."""
@@ -80,20 +166,24 @@ class EditorAgent(BaseAgent):
         logger.info(f"{self.name}: Editing report")
         
         try:
-            draft = state.get('final_report', '')
+            edited_report = self.invoke(self._build_prompt(state))
             
-            prompt = f"""Review and improve this report:
-
-{draft}
-
-Make it:
-1. More concise (remove redundancy)
-2. More professional (improve tone)
-3. More actionable (strengthen recommendations)
-
-Return the improved version."""
-            
-            edited_report = self.invoke(prompt)
+            logger.info(f"{self.name}: Editing complete")
+            return {
+                "final_report": edited_report,
+                "next_agent": "END"
+            }
+        
+        except Exception as e:
+            logger.error(f"{self.name} error: {str(e)}")
+            return {"next_agent": "END"}
+    
+    async def aexecute(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Edit and refine the report without blocking the event loop."""
+        logger.info(f"{self.name}: Editing report")
+        
+        try:
+            edited_report = await self.ainvoke(self._build_prompt(state))
             
             logger.info(f"{self.name}: Editing complete")
             return {
@@ -104,4 +194,23 @@ Return the improved version."""
         except Exception as e:
             logger.error(f"{self.name} error: {str(e)}")
             return {"next_agent": "END"}
+    
+    def validate_output(self, prompt: str, content: str) -> bool:
+        """Reject edits that drop most of the draft (a sign the cheap model lost track)."""
+        return super().validate_output(prompt, content) and len(content) >= 0.3 * len(prompt)
+    
+    def _build_prompt(self, state: Dict[str, Any]) -> str:
+        """Format the editing prompt for the current draft."""
+        draft = state.get('final_report', '')
+        
+        return f"""Review and improve this report:
+
+{draft}
+
+Make it:
+1. More concise (remove redundancy)
+2. More professional (improve tone)
+3. More actionable (strengthen recommendations)
+
+Return the improved version."""
 
@@ -6,14 +6,22 @@ import sys
 from pathlib import Path
 from datetime import datetime
 import json
+import time
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from config.settings import settings
-from workflows.single_agent import create_single_agent_system
-from workflows.multi_agent import create_multi_agent_system
+from llm.cache import get_response_cache
+from llm.semantic_cache import get_semantic_cache
+from llm.routing import get_router
+from llm.providers import get_provider_pool
+from workflows.checkpoints import get_run_store
+from workflows.jobs import FINISHED, get_job_executor
+from workflows.registry import prewarm
+from utils.blobs import resolve_json, resolve_text
 from utils.logger import get_logger
+from utils.tracing import tracer, start_metrics_server
 
 logger = get_logger(__name__)
 
@@ -88,6 +96,16 @@ def initialize_session_state():
         st.session_state.current_result = None
     if 'agent_logs' not in st.session_state:
         st.session_state.agent_logs = []
+    if 'jobs' not in st.session_state:
+        st.session_state.jobs = []  # Ids of this session's background jobs, oldest first
+
+@st.cache_resource
+def warm_up():
+    """Compile workflows and open model connections once per server process."""
+    prewarm(warm_connections=True)
+    if tracer.enabled and settings.metrics_port:
+        start_metrics_server(settings.metrics_port)
+    return True
 
 def validate_setup():
     """Validate that API keys are configured."""
@@ -152,11 +170,40 @@ def sidebar_config():
         st.subheader("ℹ️ System Info")
         st.info(f"""
         **Model**: {settings.default_model}
+        **Cheap Model**: {settings.cheap_model}
         **Fast Model**: {settings.fast_model}
         **Max Retries**: {settings.max_retries}
         **Timeout**: {settings.timeout_seconds}s
         """)
         
+        if settings.llm_cache_enabled:
+            stats = get_response_cache().stats()
+            st.caption(
+                f"LLM cache: {stats['hits']} hits / {stats['misses']} misses "
+                f"({stats['hit_rate']:.0%}), {stats['saved_seconds']}s saved"
+            )
+        
+        if settings.semantic_cache_enabled:
+            stats = get_semantic_cache().stats()
+            st.caption(f"Semantic cache: {stats['saved_calls']} model calls saved ({stats['hit_rate']:.0%})")
+        
+        if settings.model_routing_enabled:
+            served = {}
+            for models in get_router().stats()["served"].values():
+                for model, calls in models.items():
+                    served[model] = served.get(model, 0) + calls
+            if served:
+                st.caption("Model calls: " + ", ".join(f"{m} {n}" for m, n in sorted(served.items())))
+        
+        if settings.provider_pool_enabled:
+            unhealthy = [
+                f"{name} ({health['state']})"
+                for name, health in get_provider_pool().stats()["backends"].items()
+                if health["state"] != "closed"
+            ]
+            if unhealthy:
+                st.caption("⚠️ Circuit open: " + ", ".join(unhealthy))
+        
         return {
             'system_type': system_type,
             'task': task,
@@ -165,84 +212,89 @@ def sidebar_config():
             'verbose_output': verbose_output
         }
 
-def run_single_agent(config):
-    """Execute single agent workflow."""
-    logger.info("Running single agent workflow")
-    
-    try:
-        with st.spinner("🔄 Single agent processing..."):
-            system = create_single_agent_system()
-            
-            result = system.invoke({
-                "task": config['task'],
-                "messages": []
-            })
-            
-            return {
-                'success': True,
-                'result': result.get('result', 'No result'),
-                'type': 'single'
-            }
+# Status shown once each workflow node finishes
+NODE_PROGRESS_MESSAGES = {
+    "research": "📚 Research complete, collecting articles...",
+    "collect": "📈 Articles collected, analysis team at work...",
+    "analyze": "🧠 Trend analysis complete...",
+    "sentiment": "💬 Sentiment analysis complete...",
+    "write": "✅ Report written!",
+    "process": "✅ Task processed!"
+}
+
+def submit_job(config, run_id=None, force=False):
+    """Queue the configured workflow (or resume run_id) on the background executor; returns the job id."""
+    if config['system_type'] == "Single Agent":
+        return get_job_executor().submit("single", config['task'], resume_id=run_id, force=force)
+    return get_job_executor().submit(
+        "multi", config['task'], resume_id=run_id, force=force, include_sentiment=config['include_analysis']
+    )
+
+def job_result(job):
+    """Turn a finished job into the result shown by display_results."""
+    state = job['state']
+    if state is None:
+        return {'success': False, 'error': job['error'] or "Run did not finish", 'type': job['workflow']}
     
-    except Exception as e:
-        logger.error(f"Single agent error: {str(e)}")
+    if job['workflow'] == "single":
         return {
-            'success': False,
-            'error': str(e),
+            'success': True,
+            'result': state.get('result', 'No result'),
+            'run_id': job['run_id'],
+            'run_status': job['status'],
             'type': 'single'
         }
+    
+    return {
+        'success': True,
+        'run_id': job['run_id'],
+        'run_status': job['status'],
+        'result': state.get('final_report', 'No report generated'),
+        # Notes and articles stay blob references; tabs resolve them
+        'research_notes': state.get('research_notes', ''),
+        'analysis_results': state.get('analysis_results', ''),
+        'trending_topics': state.get('trending_topics', []),
+        'sentiment_analysis': state.get('sentiment_analysis', {}),
+        'articles': state.get('articles', []),
+        'dedup_stats': state.get('dedup_stats', {}),
+        'type': 'multi'
+    }
+
+def node_preview(update):
+    """Short text for a node's state update (long text is cut, references resolved)."""
+    lines = []
+    for key, value in (update or {}).items():
+        if key in ('messages', 'next_agent', 'status', 'errors'):
+            continue
+        if key == 'articles':
+            value = f"{len(resolve_json(value, []))} articles"
+        elif isinstance(value, str):
+            value = resolve_text(value)
+            value = value if len(value) <= 300 else value[:300] + "..."
+        lines.append(f"**{key}:** {value}")
+    return "\n\n".join(lines) or "_No output_"
 
-def run_multi_agent(config):
-    """Execute multi-agent workflow."""
-    logger.info("Running multi-agent workflow")
+def display_job(job):
+    """Show a queued or running job's progress, finished nodes and streamed report."""
+    expected_nodes = 1 if job['workflow'] == "single" else 5 if job['options'].get('include_sentiment', True) else 4
+    done = len(job['nodes'])
     
-    try:
-        # Create progress indicators
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        
-        # Initialize system
-        status_text.text("🔧 Initializing multi-agent system...")
-        progress_bar.progress(10)
-        system = create_multi_agent_system()
-        
-        # Execute workflow
-        status_text.text("🔬 Research team gathering trends...")
-        progress_bar.progress(30)
-        
-        result = system.invoke({
-            "current_task": config['task'],
-            "messages": [],
-            "research_notes": "",
-            "trending_topics": [],
-            "articles": [],
-            "analysis_results": "",
-            "patterns": [],
-            "final_report": "",
-            "next_agent": "researcher",
-            "status": "started"
-        })
-        
-        progress_bar.progress(100)
-        status_text.text("✅ Analysis complete!")
-        
-        return {
-            'success': True,
-            'result': result.get('final_report', 'No report generated'),
-            'research_notes': result.get('research_notes', ''),
-            'analysis_results': result.get('analysis_results', ''),
-            'trending_topics': result.get('trending_topics', []),
-            'articles': result.get('articles', []),
-            'type': 'multi'
-        }
+    st.markdown(f"**{job['task'][:80]}** · `{job['id']}`")
+    st.progress(min(100, 10 + 90 * done // expected_nodes) if job['status'] == "running" else 0)
+    if job['status'] == "queued":
+        st.caption("⏳ Waiting for a free worker...")
+    elif job['report_preview']:
+        st.caption("✍️ Writing team drafting the report...")
+    elif done:
+        st.caption(NODE_PROGRESS_MESSAGES.get(job['nodes'][-1]['node'], f"✔️ {job['nodes'][-1]['node']} complete"))
+    else:
+        st.caption("🔬 Research team gathering trends...")
     
-    except Exception as e:
-        logger.error(f"Multi-agent error: {str(e)}")
-        return {
-            'success': False,
-            'error': str(e),
-            'type': 'multi'
-        }
+    for entry in job['nodes']:
+        with st.expander(f"✔️ {entry['node']}"):
+            st.markdown(node_preview(entry['update']))
+    if job['report_preview']:
+        st.markdown(job['report_preview'])
 
 def display_results(result):
     """Display execution results."""
@@ -252,7 +304,10 @@ def display_results(result):
         return
     
     # Success indicator
-    st.markdown('<div class="status-box success-box">✅ Task completed successfully!</div>', unsafe_allow_html=True)
+    if result.get('run_status') == 'failed':
+        st.markdown('<div class="status-box warning-box">⚠️ Some agents reported errors. Resume the run from the "Resume an unfinished run" panel to retry only the failed steps.</div>', unsafe_allow_html=True)
+    else:
+        st.markdown('<div class="status-box success-box">✅ Task completed successfully!</div>', unsafe_allow_html=True)
     
     # Display results based on type
     if result['type'] == 'single':
@@ -282,8 +337,9 @@ def display_results(result):
         
         with tab2:
             st.markdown("### Research Notes")
-            if result.get('research_notes'):
-                st.markdown(result['research_notes'])
+            research_notes = resolve_text(result.get('research_notes'))
+            if research_notes:
+                st.markdown(research_notes)
             else:
                 st.info("No research notes available")
         
@@ -294,6 +350,12 @@ def display_results(result):
             else:
                 st.info("No analysis available")
             
+            # Display sentiment if the sentiment branch ran
+            sentiment = result.get('sentiment_analysis')
+            if sentiment:
+                st.markdown("#### 💬 Sentiment")
+                st.markdown(f"**{sentiment.get('sentiment', 'neutral').title()}** (score: {sentiment.get('score', 50)}/100)")
+            
             # Display trending topics if available
             if result.get('trending_topics'):
                 st.markdown("#### 🔥 Trending Topics")
@@ -302,8 +364,12 @@ def display_results(result):
         
         with tab4:
             st.markdown("### Source Articles")
-            if result.get('articles'):
-                for article in result['articles']:
+            dedup = result.get('dedup_stats')
+            if dedup and dedup.get('duplicates'):
+                st.caption(f"🧹 {dedup['duplicates']} near-duplicate articles collapsed ({dedup['tokens_removed']} tokens saved)")
+            articles = resolve_json(result.get('articles'), [])
+            if articles:
+                for article in articles:
                     with st.expander(f"📰 {article.get('title', 'Untitled')}"):
                         st.markdown(f"**Source:** {article.get('source', 'Unknown')}")
                         st.markdown(f"**Date:** {article.get('date', 'N/A')}")
@@ -312,6 +378,27 @@ def display_results(result):
             else:
                 st.info("No source articles available")
 
+def resume_controls():
+    """Offer failed or interrupted runs for resuming; returns the chosen run, if any."""
+    if not settings.checkpoints_enabled:
+        return None
+    
+    # Runs a background job is executing now are not interrupted, so not offered
+    active = get_job_executor().active_run_ids()
+    runs = [run for run in get_run_store().list(("failed", "running"), limit=5 + len(active)) if run['run_id'] not in active][:5]
+    if not runs:
+        return None
+    
+    with st.expander("♻️ Resume an unfinished run"):
+        labels = {
+            f"{run['task'][:60]} · {run['status']} · {datetime.fromtimestamp(run['updated']).strftime('%Y-%m-%d %H:%M')}": run
+            for run in runs
+        }
+        choice = st.selectbox("Run", list(labels), help="Completed steps are reused; only the failed or unfinished ones run again")
+        if st.button("♻️ Resume", use_container_width=True):
+            return labels[choice]
+    return None
+
 def display_history():
     """Display execution history."""
     if st.session_state.history:
@@ -331,6 +418,7 @@ def main():
     # Initialize
     initialize_session_state()
     validate_setup()
+    warm_up()
     
     # Display header
     display_header()
@@ -349,39 +437,54 @@ def main():
     with col2:
         execute_button = st.button("🚀 Execute", use_container_width=True, type="primary")
     
-    # Execute on button click
-    if execute_button:
+    resume = resume_controls()
+    run_id = None
+    if resume:
+        # Re-run with the stored run's workflow, task and options
+        run_id = resume['run_id']
+        config = dict(
+            config,
+            system_type="Single Agent" if resume['workflow'] == "single" else "Multi-Agent",
+            task=resume['task'],
+            include_analysis=resume['options'].get('include_sentiment', True)
+        )
+    
+    # Queue a background job on button click; the page stays responsive
+    # and more tasks can be queued while it runs
+    if execute_button or resume:
         if not config['task'] or config['task'].strip() == "":
             st.warning("⚠️ Please enter a task description")
             return
-        
-        st.divider()
-        st.subheader("⚙️ Execution")
-        
-        # Run appropriate system
-        if config['system_type'] == "Single Agent":
-            result = run_single_agent(config)
-        else:
-            result = run_multi_agent(config)
-        
-        # Store in session state
-        st.session_state.current_result = result
-        
-        # Add to history
-        st.session_state.history.append({
-            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            'system_type': config['system_type'],
-            'task': config['task'],
-            'success': result['success'],
-            'summary': result.get('result', '')[:200] if result['success'] else None
-        })
-        
-        # Display results
+        try:
+            # A run left "running" without a live job here was interrupted
+            st.session_state.jobs.append(submit_job(config, run_id, force=bool(resume) and resume['status'] == "running"))
+        except ValueError as e:
+            st.error(f"❌ {str(e)}")
+    
+    # Show running jobs; record finished ones and show the latest result
+    jobs = get_job_executor().list(st.session_state.jobs)
+    active = [job for job in jobs if job['status'] not in FINISHED]
+    if active:
         st.divider()
-        display_results(result)
+        st.subheader(f"⚙️ Running ({len(active)})")
+        for job in active:
+            display_job(job)
     
-    # Display current result if available
-    elif st.session_state.current_result:
+    for job in reversed(jobs):
+        if job['status'] in FINISHED:
+            result = job_result(job)
+            st.session_state.current_result = result
+            st.session_state.history.append({
+                'timestamp': datetime.fromtimestamp(job['finished']).strftime("%Y-%m-%d %H:%M:%S"),
+                'system_type': "Single Agent" if job['workflow'] == "single" else "Multi-Agent",
+                'task': job['task'],
+                'success': result['success'],
+                'summary': result.get('result', '')[:200] if result['success'] else None
+            })
+    # Only jobs still in flight are polled again (ids the executor pruned drop out too)
+    st.session_state.jobs = [job['id'] for job in reversed(active)]
+    
+    if st.session_state.current_result:
         st.divider()
         st.subheader("📊 Last Execution Results")
         display_results(st.session_state.current_result)
@@ -398,6 +501,11 @@ def main():
         <p>Powered by Groq (Llama Models) - Free & Fast AI</p>
     </div>
     """, unsafe_allow_html=True)
+    
+    # Poll while this session has jobs in flight
+    if active:
+        time.sleep(settings.job_poll_seconds)
+        st.rerun()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,47 @@
+"""
+Batch Command Line Interface
+
+Usage:
+    python batch.py tasks.jsonl --output reports.jsonl --workflow multi --workers 8
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config.settings import settings
+from workflows.batch import format_summary, run_batch
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run many tasks through an agent workflow")
+    parser.add_argument("input", type=Path, help="JSONL file of tasks")
+    parser.add_argument("--output", "-o", type=Path, help="Results JSONL (default: <input>.results.jsonl)")
+    parser.add_argument("--workflow", choices=["single", "multi"], default="multi")
+    parser.add_argument("--workers", type=int, default=settings.batch_workers)
+    parser.add_argument("--no-resume", action="store_true", help="Overwrite the output instead of resuming")
+    parser.add_argument("--skip-failed", action="store_true", help="When resuming, don't rerun failed tasks")
+    parser.add_argument("--no-sentiment", action="store_true", help="Disable the sentiment branch")
+    args = parser.parse_args(argv)
+    
+    if not settings.validate_api_keys():
+        parser.error("GROQ_API_KEY is not set")
+    
+    output = args.output or args.input.with_suffix(".results.jsonl")
+    summary = run_batch(
+        args.input,
+        output,
+        workflow=args.workflow,
+        workers=args.workers,
+        resume=not args.no_resume,
+        retry_failed=not args.skip_failed,
+        include_sentiment=not args.no_sentiment
+    )
+    
+    print(format_summary(summary))
+    print(f"Results: {output}")
+
+if __name__ == "__main__":
+    main()
+
@@ -0,0 +1,15 @@
+from .fakes import BenchmarkChatModel, LatencyDistribution, fake_chat_models, stub_search_tools
+from .runner import run_benchmark, save_results, load_results, compare_results, format_report
+
+__all__ = [
+    'BenchmarkChatModel',
+    'LatencyDistribution',
+    'fake_chat_models',
+    'stub_search_tools',
+    'run_benchmark',
+    'save_results',
+    'load_results',
+    'compare_results',
+    'format_report'
+]
+
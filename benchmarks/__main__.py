@@ -0,0 +1,49 @@
+"""
+Benchmark Command Line Interface
+
+Usage:
+    python -m benchmarks --workflows single multi --concurrency 1 4 16 --runs 16
+    python -m benchmarks --compare data/benchmarks/bench_<timestamp>.json
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.runner import compare_results, format_report, load_results, run_benchmark, save_results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the agent workflows offline")
+    parser.add_argument("--workflows", nargs="+", default=["single", "multi"], choices=["single", "multi"])
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 16])
+    parser.add_argument("--runs", type=int, default=16, help="Tasks per concurrency level")
+    parser.add_argument("--llm-latency", default="lognormal:0.8,0.35", help="e.g. fixed:0.5, uniform:0.2,1.0")
+    parser.add_argument("--tool-latency", default="uniform:0.1,0.4")
+    parser.add_argument("--output-tokens", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mode", choices=["async", "thread"], default="async")
+    parser.add_argument("--output", type=Path, help="Results file (default: data/benchmarks/)")
+    parser.add_argument("--compare", type=Path, help="Earlier results file to compare against")
+    args = parser.parse_args(argv)
+    
+    results = run_benchmark(
+        workflows=args.workflows,
+        concurrency_levels=args.concurrency,
+        runs_per_level=args.runs,
+        llm_latency=args.llm_latency,
+        tool_latency=args.tool_latency,
+        output_tokens=args.output_tokens,
+        seed=args.seed,
+        mode=args.mode
+    )
+    path = save_results(results, args.output)
+    
+    comparison = compare_results(load_results(args.compare), results) if args.compare else None
+    print(format_report(results, comparison))
+    print(f"\nSaved results to {path}")
+
+if __name__ == "__main__":
+    main()
+
@@ -0,0 +1,227 @@
+"""
+Deterministic Fake Models and Tool Stubs for Benchmarks
+"""
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, AsyncIterator, List, Optional, Sequence
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from config.settings import settings
+from llm import clients
+from llm.clients import clear_chat_models
+from tools.search_tools import TRENDING_TOPICS, _build_articles, fetch_trending_topics, search_articles
+from utils.helpers import count_tokens_estimate
+from utils.tracing import traced
+from workflows.registry import clear_workflows
+import asyncio
+import json
+import math
+import random
+import threading
+import time
+
+# Words the fake model cycles through; includes a few sentiment keywords
+# so downstream analysis tools have something to count
+_VOCABULARY = (
+    "agents", "workflow", "growth", "adoption", "innovative", "latency", "teams",
+    "production", "great", "costs", "models", "patterns", "trend", "deployment",
+    "retrieval", "poor", "evaluation", "tooling", "scale", "best"
+)
+
+class LatencyDistribution:
+    """
+    Seeded latency sampler in seconds.
+    
+    Supported kinds: fixed:<s>, uniform:<low>,<high>, normal:<mean>,<sd>
+    and lognormal:<median>,<sigma>. Samples are clamped at zero.
+    """
+    
+    KINDS = ("fixed", "uniform", "normal", "lognormal")
+    
+    def __init__(self, kind: str = "fixed", params: Sequence[float] = (0.0,), seed: Optional[int] = None):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        self.kind = kind
+        self.params = tuple(params)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def parse(cls, spec: str, seed: Optional[int] = None) -> "LatencyDistribution":
+        """Build a distribution from a spec such as "lognormal:0.8,0.35"."""
+        kind, _, values = spec.partition(":")
+        params = tuple(float(v) for v in values.split(",") if v.strip()) or (0.0,)
+        return cls(kind.strip(), params, seed)
+    
+    def sample(self) -> float:
+        with self._lock:
+            if self.kind == "fixed":
+                value = self.params[0]
+            elif self.kind == "uniform":
+                value = self._random.uniform(*self.params[:2])
+            elif self.kind == "normal":
+                value = self._random.gauss(*self.params[:2])
+            else:
+                value = self._random.lognormvariate(math.log(self.params[0]), self.params[1])
+        return max(0.0, value)
+    
+    def __repr__(self) -> str:
+        return f"{self.kind}:{','.join(str(p) for p in self.params)}"
+
+class BenchmarkChatModel(BaseChatModel):
+    """
+    Offline chat model with injectable latency and a fixed output size.
+    
+    Responses are output_tokens words long. When tools are bound and the
+    conversation has no tool results yet, the model first answers with
+    the scripted tool_calls, so ReAct agents exercise their tool loop.
+    Streaming spreads the sampled latency evenly across the tokens.
+    """
+    
+    model: str = "benchmark"
+    latency: Any = None
+    output_tokens: int = 200
+    tool_calls: List[Dict[str, Any]] = []
+    bound_tools: List[str] = []
+    
+    @property
+    def _llm_type(self) -> str:
+        return "benchmark-fake"
+    
+    def bind_tools(self, tools: Sequence[Any], **kwargs) -> "BenchmarkChatModel":
+        names = [getattr(t, "name", None) or getattr(t, "__name__", str(t)) for t in tools]
+        return self.model_copy(update={"bound_tools": names})
+    
+    def _respond(self, messages: List[BaseMessage]) -> AIMessage:
+        usage = {"input_tokens": sum(count_tokens_estimate(str(m.content)) for m in messages)}
+        
+        if self.bound_tools and not any(isinstance(m, ToolMessage) for m in messages):
+            calls = [
+                {"name": call["name"], "args": call.get("args", {}), "id": f"call_{i}"}
+                for i, call in enumerate(self.tool_calls)
+                if call["name"] in self.bound_tools
+            ]
+            if calls:
+                usage.update(output_tokens=10 * len(calls), total_tokens=usage["input_tokens"] + 10 * len(calls))
+                return AIMessage(content="", tool_calls=calls, usage_metadata=usage)
+        
+        text = " ".join(_VOCABULARY[i % len(_VOCABULARY)] for i in range(self.output_tokens))
+        usage.update(output_tokens=self.output_tokens, total_tokens=usage["input_tokens"] + self.output_tokens)
+        return AIMessage(content=text, usage_metadata=usage)
+    
+    def _delay(self) -> float:
+        return self.latency.sample() if self.latency is not None else 0.0
+    
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self._delay())
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+    
+    async def _agenerate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self._delay())
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+    
+    def _chunks(self, message: AIMessage) -> List[AIMessageChunk]:
+        if message.tool_calls:
+            return [AIMessageChunk(
+                content="",
+                tool_call_chunks=[
+                    {"name": c["name"], "args": json.dumps(c["args"]), "id": c["id"], "index": i}
+                    for i, c in enumerate(message.tool_calls)
+                ],
+                usage_metadata=message.usage_metadata
+            )]
+        
+        words = message.content.split(" ")
+        chunks = [AIMessageChunk(content=w if i == 0 else f" {w}") for i, w in enumerate(words)]
+        chunks[-1].usage_metadata = message.usage_metadata
+        return chunks
+    
+    def _stream(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        chunks = self._chunks(self._respond(messages))
+        per_chunk = self._delay() / len(chunks)
+        for chunk in chunks:
+            time.sleep(per_chunk)
+            yield ChatGenerationChunk(message=chunk)
+    
+    async def _astream(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        chunks = self._chunks(self._respond(messages))
+        per_chunk = self._delay() / len(chunks)
+        for chunk in chunks:
+            await asyncio.sleep(per_chunk)
+            yield ChatGenerationChunk(message=chunk)
+
+@contextmanager
+def fake_chat_models(latency: LatencyDistribution, output_tokens: int = 200, tool_calls: Optional[List[Dict[str, Any]]] = None):
+    """
+    Serve every Groq/Google client from BenchmarkChatModel while active.
+    
+    Shared clients and compiled workflows are dropped on entry and exit,
+    so graphs built inside the block use the fake model and graphs built
+    afterwards use the real providers again. Client-side rate limiting is
+    off meanwhile, since fake models have no provider quota, and so is
+    the topic memo, so that every run analyzes every topic.
+    """
+    def factory(provider: str, model: str, temperature: float) -> BaseChatModel:
+        return BenchmarkChatModel(
+            model=model,
+            latency=latency,
+            output_tokens=output_tokens,
+            tool_calls=list(tool_calls or [])
+        )
+    
+    original = clients._create_model
+    rate_limit_enabled = settings.rate_limit_enabled
+    topic_memo_enabled = settings.topic_memo_enabled
+    clear_workflows()
+    clear_chat_models()
+    clients._create_model = factory
+    settings.rate_limit_enabled = False
+    settings.topic_memo_enabled = False
+    try:
+        yield
+    finally:
+        clients._create_model = original
+        settings.rate_limit_enabled = rate_limit_enabled
+        settings.topic_memo_enabled = topic_memo_enabled
+        clear_workflows()
+        clear_chat_models()
+
+@contextmanager
+def stub_search_tools(latency: LatencyDistribution):
+    """
+    Replace the search tool backends with uncached stubs of the given latency.
+    
+    The stubs return the same data as the simulated backends, so agent
+    behaviour is unchanged while the tool cache is bypassed.
+    """
+    def fetch(timeframe: str = "week", limit: int = 5) -> List[str]:
+        time.sleep(latency.sample())
+        return TRENDING_TOPICS[:limit]
+    
+    async def afetch(timeframe: str = "week", limit: int = 5) -> List[str]:
+        await asyncio.sleep(latency.sample())
+        return TRENDING_TOPICS[:limit]
+    
+    def search(topic: str, max_results: int = 3) -> List[Dict[str, str]]:
+        time.sleep(latency.sample())
+        return _build_articles(topic)[:max_results]
+    
+    async def asearch(topic: str, max_results: int = 3) -> List[Dict[str, str]]:
+        await asyncio.sleep(latency.sample())
+        return _build_articles(topic)[:max_results]
+    
+    stubs = [
+        (fetch_trending_topics, fetch, afetch),
+        (search_articles, search, asearch)
+    ]
+    originals = [(tool, tool.func, tool.coroutine) for tool, _, _ in stubs]
+    
+    for tool, func, coroutine in stubs:
+        tool.func = traced("tool", tool.name)(func)
+        tool.coroutine = traced("tool", tool.name)(coroutine)
+    try:
+        yield
+    finally:
+        for tool, func, coroutine in originals:
+            tool.func, tool.coroutine = func, coroutine
+
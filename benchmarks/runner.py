@@ -0,0 +1,218 @@
+"""
+Offline Workflow Benchmark Runner
+"""
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from benchmarks.fakes import LatencyDistribution, fake_chat_models, stub_search_tools
+from config.settings import settings
+from utils.helpers import latency_summary
+from utils.logger import get_logger
+from utils.tracing import capture_spans
+from workflows.registry import finish_run, get_workflow, start_run
+import asyncio
+import json
+import time
+
+logger = get_logger(__name__)
+
+BENCHMARK_TASKS = [
+    "Research the latest trends in AI agents",
+    "Summarize developments in multi-agent architectures",
+    "Analyze production LLM deployment practices",
+    "Report on retrieval-augmented generation tooling",
+    "Compare approaches to LLM cost optimization",
+]
+
+# Tool calls the fake model makes before answering in the single-agent ReAct loop
+SINGLE_AGENT_TOOL_CALLS = [
+    {"name": "fetch_trending_topics", "args": {"timeframe": "week", "limit": 5}},
+    {"name": "search_articles", "args": {"topic": "AI Agents and LangGraph 1.0", "max_results": 3}},
+]
+
+def run_benchmark(
+    workflows: Iterable[str] = ("single", "multi"),
+    concurrency_levels: Iterable[int] = (1, 4, 16),
+    runs_per_level: int = 16,
+    llm_latency: str = "lognormal:0.8,0.35",
+    tool_latency: str = "uniform:0.1,0.4",
+    output_tokens: int = 200,
+    seed: int = 0,
+    mode: str = "async"
+) -> Dict[str, Any]:
+    """
+    Benchmark workflows offline with fake models and stubbed search tools.
+    
+    Args:
+        workflows: Workflow names to benchmark ("single", "multi")
+        concurrency_levels: Number of tasks in flight at once, one level per entry
+        runs_per_level: Tasks executed at each concurrency level
+        llm_latency: Latency spec for each model call (see LatencyDistribution)
+        tool_latency: Latency spec for each search tool call
+        output_tokens: Words produced by each model response
+        seed: Seed for the latency samplers
+        mode: "async" (ainvoke on one event loop) or "thread" (invoke in a thread pool)
+    
+    Returns:
+        Results dict with the configuration and one entry per (workflow, level)
+    """
+    config = {
+        "workflows": list(workflows),
+        "concurrency_levels": list(concurrency_levels),
+        "runs_per_level": runs_per_level,
+        "llm_latency": llm_latency,
+        "tool_latency": tool_latency,
+        "output_tokens": output_tokens,
+        "seed": seed,
+        "mode": mode
+    }
+    results = []
+    
+    llm = LatencyDistribution.parse(llm_latency, seed)
+    tools = LatencyDistribution.parse(tool_latency, seed + 1)
+    
+    with fake_chat_models(llm, output_tokens, SINGLE_AGENT_TOOL_CALLS), stub_search_tools(tools):
+        for name in config["workflows"]:
+            # Compile up front so graph construction isn't timed
+            get_workflow(name)
+            for concurrency in config["concurrency_levels"]:
+                logger.info(f"Benchmarking {name} workflow at concurrency {concurrency}")
+                results.append(_run_level(name, concurrency, runs_per_level, mode))
+    
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "config": config,
+        "results": results
+    }
+
+def _run_level(name: str, concurrency: int, runs: int, mode: str) -> Dict[str, Any]:
+    tasks = [f"{BENCHMARK_TASKS[i % len(BENCHMARK_TASKS)]} (run {i})" for i in range(runs)]
+    
+    with capture_spans() as spans:
+        start = time.perf_counter()
+        if mode == "async":
+            outcomes = asyncio.run(_arun_all(name, tasks, concurrency))
+        else:
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                outcomes = list(pool.map(lambda task: _run_one(name, task), tasks))
+        wall = time.perf_counter() - start
+    
+    latencies = [latency for latency, ok in outcomes if ok]
+    node_latencies: Dict[str, List[float]] = defaultdict(list)
+    calls: Dict[str, int] = defaultdict(int)
+    output_tokens = 0
+    for span in spans:
+        calls[span.kind] += 1
+        if span.kind == "node":
+            node_latencies[span.name].append(span.duration)
+        output_tokens += span.attributes.get("output_tokens", 0)
+    
+    return {
+        "workflow": name,
+        "concurrency": concurrency,
+        "runs": runs,
+        "errors": sum(1 for _, ok in outcomes if not ok),
+        "wall_seconds": round(wall, 4),
+        "throughput_per_s": round(runs / wall, 4) if wall else 0.0,
+        "latency": latency_summary(latencies),
+        "nodes": {node: latency_summary(values) for node, values in sorted(node_latencies.items())},
+        "llm_calls": calls["llm"],
+        "tool_calls": calls["tool"],
+        "output_tokens": output_tokens
+    }
+
+def _run_one(name: str, task: str) -> Tuple[float, bool]:
+    start = time.perf_counter()
+    try:
+        graph, inputs, config = start_run(name, task)
+        finish_run(config, graph.invoke(inputs, config))
+        return time.perf_counter() - start, True
+    except Exception as e:
+        logger.error(f"Benchmark run failed: {str(e)}")
+        return time.perf_counter() - start, False
+
+async def _arun_all(name: str, tasks: List[str], concurrency: int) -> List[Tuple[float, bool]]:
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def run(task: str) -> Tuple[float, bool]:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                graph, inputs, config = await asyncio.to_thread(start_run, name, task)
+                state = await graph.ainvoke(inputs, config)
+                await asyncio.to_thread(finish_run, config, state)
+                return time.perf_counter() - start, True
+            except Exception as e:
+                logger.error(f"Benchmark run failed: {str(e)}")
+                return time.perf_counter() - start, False
+    
+    return await asyncio.gather(*(run(task) for task in tasks))
+
+def save_results(results: Dict[str, Any], path: Optional[Path] = None) -> Path:
+    """Write results as JSON (default: data/benchmarks/bench_<timestamp>.json)."""
+    if path is None:
+        stamp = results["timestamp"].replace(":", "").replace("-", "")
+        path = settings.data_dir / "benchmarks" / f"bench_{stamp}.json"
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return path
+
+def load_results(path: Path) -> Dict[str, Any]:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Compare two benchmark runs level by level.
+    
+    Returns:
+        One row per (workflow, concurrency) present in both runs, with
+        relative changes (0.1 means 10% higher) in p50/p95 latency and throughput
+    """
+    def change(new: float, old: float) -> Optional[float]:
+        return round((new - old) / old, 4) if old else None
+    
+    previous = {(r["workflow"], r["concurrency"]): r for r in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        base = previous.get((result["workflow"], result["concurrency"]))
+        if base is None:
+            continue
+        rows.append({
+            "workflow": result["workflow"],
+            "concurrency": result["concurrency"],
+            "p50_change": change(result["latency"]["p50"], base["latency"]["p50"]),
+            "p95_change": change(result["latency"]["p95"], base["latency"]["p95"]),
+            "throughput_change": change(result["throughput_per_s"], base["throughput_per_s"])
+        })
+    return rows
+
+def format_report(results: Dict[str, Any], comparison: Optional[List[Dict[str, Any]]] = None) -> str:
+    """Render results (and an optional comparison) as plain-text tables."""
+    lines = [
+        f"{'workflow':<8} {'conc':>5} {'runs':>5} {'err':>4} {'tput/s':>8} {'p50':>8} {'p95':>8} {'p99':>8}"
+    ]
+    for r in results["results"]:
+        latency = r["latency"]
+        lines.append(
+            f"{r['workflow']:<8} {r['concurrency']:>5} {r['runs']:>5} {r['errors']:>4} "
+            f"{r['throughput_per_s']:>8.2f} {latency['p50']:>8.3f} {latency['p95']:>8.3f} {latency['p99']:>8.3f}"
+        )
+        for node, summary in r["nodes"].items():
+            lines.append(f"{'':<8} {'':>5} node {node:<12} p50 {summary['p50']:.3f}s  p95 {summary['p95']:.3f}s")
+    
+    if comparison:
+        def pct(value):
+            return "n/a" if value is None else f"{value:+.1%}"
+        
+        lines.append("")
+        lines.append(f"{'workflow':<8} {'conc':>5} {'p50':>9} {'p95':>9} {'tput':>9}")
+        for row in comparison:
+            lines.append(
+                f"{row['workflow']:<8} {row['concurrency']:>5} {pct(row['p50_change']):>9} "
+                f"{pct(row['p95_change']):>9} {pct(row['throughput_change']):>9}"
+            )
+    return "\n".join(lines)
+
@@ -28,14 +28,103 @@ class Settings(BaseSettings):
     max_retries: int = int(os.getenv("MAX_RETRIES", "3"))
     timeout_seconds: int = int(os.getenv("TIMEOUT_SECONDS", "30"))
     
+    # Checkpoints (data/checkpoints.sqlite; lets failed runs resume)
+    checkpoints_enabled: bool = os.getenv("CHECKPOINTS_ENABLED", "true").lower() == "true"
+    checkpoint_keep_completed: bool = os.getenv("CHECKPOINT_KEEP_COMPLETED", "false").lower() == "true"
+    
+    # Blob Store (data/blobs; workflow state carries references to notes and articles)
+    blob_store_enabled: bool = os.getenv("BLOB_STORE_ENABLED", "true").lower() == "true"
+    blob_retention_days: float = float(os.getenv("BLOB_RETENTION_DAYS", "30"))
+    
+    # Topic Memo (data/topic_memo.sqlite; unchanged topics reuse their analysis)
+    topic_memo_enabled: bool = os.getenv("TOPIC_MEMO_ENABLED", "false").lower() == "true"  # Cold runs make one Analyst call per topic
+    topic_memo_ttl_days: float = float(os.getenv("TOPIC_MEMO_TTL_DAYS", "30"))
+    
+    # Article Deduplication (data/dedup.sqlite; SimHash near-duplicate index)
+    dedup_enabled: bool = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+    dedup_max_distance: int = int(os.getenv("DEDUP_MAX_DISTANCE", "6"))  # Differing bits out of 64; at most 7
+    dedup_source_priority: str = os.getenv("DEDUP_SOURCE_PRIORITY", "")  # e.g. "Engineering Digest,Tech Blog"; best first
+    
+    # Sentiment Lexicon ("term<TAB>weight" lines; empty uses tools/sentiment_lexicon.tsv)
+    sentiment_lexicon: str = os.getenv("SENTIMENT_LEXICON", "")
+    
+    # Pattern Detection (n-grams tracked by the heavy-hitters summary)
+    pattern_capacity: int = int(os.getenv("PATTERN_CAPACITY", "1000"))
+    
+    # Batch Settings
+    batch_workers: int = int(os.getenv("BATCH_WORKERS", "4"))
+    
+    # Background Jobs (runs started from the app; see workflows/jobs.py)
+    job_workers: int = int(os.getenv("JOB_WORKERS", "2"))  # Runs executing at once per server process
+    job_history: int = int(os.getenv("JOB_HISTORY", "50"))  # Finished jobs kept in memory
+    job_poll_seconds: float = float(os.getenv("JOB_POLL_SECONDS", "1.0"))  # App refresh interval while jobs run
+    
+    # Search Settings
+    search_concurrency: int = int(os.getenv("SEARCH_CONCURRENCY", "5"))
+    http_max_connections: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+    search_api_url: str = os.getenv("SEARCH_API_URL", "")  # GET ?q=&num= returning JSON articles; empty uses simulated results
+    trends_api_url: str = os.getenv("TRENDS_API_URL", "")  # GET ?timeframe=&limit= returning JSON topics; empty uses simulated topics
+    article_summary_chars: int = int(os.getenv("ARTICLE_SUMMARY_CHARS", "600"))  # Longer article text is summarized; 0 keeps it whole
+    tool_cache_enabled: bool = os.getenv("TOOL_CACHE_ENABLED", "true").lower() == "true"
+    tool_cache_ttls: str = os.getenv("TOOL_CACHE_TTLS", "fetch_trending_topics=300,search_articles=900")  # Seconds per tool
+    
+    # LLM Response Cache (opt-in)
+    llm_cache_enabled: bool = os.getenv("LLM_CACHE_ENABLED", "false").lower() == "true"
+    llm_cache_ttl_seconds: int = int(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+    llm_cache_max_mb: int = int(os.getenv("LLM_CACHE_MAX_MB", "100"))
+    llm_cache_exclude_agents: str = os.getenv("LLM_CACHE_EXCLUDE_AGENTS", "")  # Comma-separated agent names
+    
+    # Semantic Prompt Cache (opt-in, in-memory)
+    semantic_cache_enabled: bool = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+    semantic_cache_threshold: float = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9"))
+    semantic_cache_thresholds: str = os.getenv("SEMANTIC_CACHE_THRESHOLDS", "")  # e.g. "Researcher=0.85,Writer=0.97"
+    semantic_cache_max_entries: int = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "1024"))
+    
+    # Tracing and Metrics (opt-in)
+    tracing_enabled: bool = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+    metrics_port: int = int(os.getenv("METRICS_PORT", "0"))  # 0 disables the /metrics endpoint
+    
+    # Article Retrieval (local hashed TF-IDF index; Analyst and Writer see only the top articles)
+    retrieval_enabled: bool = os.getenv("RETRIEVAL_ENABLED", "true").lower() == "true"
+    retrieval_top_k: int = int(os.getenv("RETRIEVAL_TOP_K", "8"))
+    retrieval_dim: int = int(os.getenv("RETRIEVAL_DIM", "2048"))
+    
+    # Context Budgets (prompt tokens per agent; 0 disables trimming)
+    context_budget_tokens: int = int(os.getenv("CONTEXT_BUDGET_TOKENS", "6000"))
+    context_budgets: str = os.getenv("CONTEXT_BUDGETS", "")  # e.g. "Writer=8000,Analyst=4000"
+    token_encoding: str = os.getenv("TOKEN_ENCODING", "cl100k_base")
+    
+    # Client-Side Rate Limits (see llm/rate_limit.py)
+    rate_limit_enabled: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    rate_limits: str = os.getenv("RATE_LIMITS", "")  # e.g. "llama-3.3-70b-versatile=30/12000" (requests/tokens per minute)
+    rate_limit_max_concurrency: int = int(os.getenv("RATE_LIMIT_MAX_CONCURRENCY", "8"))  # Per model, per process
+    rate_limit_shared: bool = os.getenv("RATE_LIMIT_SHARED", "false").lower() == "true"  # Share budgets across processes
+    
+    # Provider Pool (see llm/providers.py)
+    provider_pool_enabled: bool = os.getenv("PROVIDER_POOL_ENABLED", "true").lower() == "true"
+    provider_fallbacks: str = os.getenv("PROVIDER_FALLBACKS", "")  # e.g. "google:gemini-2.0-flash-exp"; empty: every provider with a key
+    hedge_requests: bool = os.getenv("HEDGE_REQUESTS", "false").lower() == "true"
+    hedge_delay_seconds: float = float(os.getenv("HEDGE_DELAY_SECONDS", "4.0"))  # Until a backend has enough calls for its p95
+    provider_window: int = int(os.getenv("PROVIDER_WINDOW", "100"))  # Calls kept per backend for latency/error rates
+    circuit_failure_threshold: int = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "3"))  # Consecutive failures
+    circuit_error_rate: float = float(os.getenv("CIRCUIT_ERROR_RATE", "0.5"))
+    circuit_cooldown_seconds: float = float(os.getenv("CIRCUIT_COOLDOWN_SECONDS", "30"))
+    
     # Model Configurations
     default_model: str = "llama-3.3-70b-versatile"  # Groq model
     cheap_model: str = "llama-3.1-8b-instant"  # Groq fast model
     fast_model: str = "gemini-2.0-flash-exp"  # Google model
+    anthropic_model: str = "claude-haiku-4-5"  # Anthropic fallback model
+    
+    # Model Routing (see llm/routing.py for the rule format)
+    model_routing_enabled: bool = os.getenv("MODEL_ROUTING_ENABLED", "true").lower() == "true"
+    model_routing_rules: str = os.getenv("MODEL_ROUTING_RULES", "")  # JSON list; empty uses the defaults
+    model_cascade_agents: str = os.getenv("MODEL_CASCADE_AGENTS", "Editor")  # Try cheap_model first, escalate on bad output
     
     # Paths
     base_dir: Path = Path(__file__).parent.parent
     logs_dir: Path = base_dir / "logs"
+    data_dir: Path = base_dir / "data"
     
     class Config:
         env_file = ".env"
@@ -43,8 +132,9 @@ class Settings(BaseSettings):
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        # Create logs directory if it doesn't exist
+        # Create logs and data directories if they don't exist
         self.logs_dir.mkdir(exist_ok=True)
+        self.data_dir.mkdir(exist_ok=True)
     
     def validate_api_keys(self) -> bool:
         """Check if required API keys are set."""
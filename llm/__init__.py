@@ -0,0 +1,22 @@
+from .cache import ResponseCache, get_response_cache
+from .semantic_cache import SemanticCache, get_semantic_cache
+from .clients import get_chat_model
+from .routing import ModelRouter, get_router
+from .rate_limit import RateLimiter, get_rate_limiter, rate_limit_stats
+from .providers import ProviderPool, get_provider_pool
+
+__all__ = [
+    'ResponseCache',
+    'get_response_cache',
+    'SemanticCache',
+    'get_semantic_cache',
+    'get_chat_model',
+    'ModelRouter',
+    'get_router',
+    'RateLimiter',
+    'get_rate_limiter',
+    'rate_limit_stats',
+    'ProviderPool',
+    'get_provider_pool'
+]
+
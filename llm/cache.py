@@ -0,0 +1,169 @@
+"""
+Persistent LLM Response Cache
+"""
+from pathlib import Path
+from typing import Dict, Any, Optional
+from config.settings import settings
+from utils.logger import get_logger
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+logger = get_logger(__name__)
+
+class ResponseCache:
+    """
+    Content-addressed cache of model responses stored in SQLite.
+    
+    Entries are keyed on provider, model, temperature and a hash of the
+    prompt. Expired entries are dropped on read, and once the stored
+    responses exceed max_bytes the least recently used ones are evicted.
+    """
+    
+    def __init__(
+        self,
+        path: Path,
+        ttl_seconds: Optional[float] = None,
+        max_bytes: Optional[int] = None
+    ):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                latency REAL NOT NULL DEFAULT 0,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed)")
+        
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "expired": 0}
+        self._saved_seconds = 0.0
+    
+    @staticmethod
+    def make_key(provider: str, model: str, temperature: float, prompt: str) -> str:
+        """Build the content address for a prompt sent to a specific model."""
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        payload = json.dumps([provider, model, round(float(temperature), 4), prompt_hash])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, latency, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            
+            value, latency, created = row
+            if self.ttl_seconds is not None and now - created > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+            
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self._stats["hits"] += 1
+            self._saved_seconds += latency
+            return value
+    
+    def set(self, key: str, value: str, latency: float = 0.0):
+        """Store a response, recording how long the model took to produce it."""
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, latency, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, value, size, latency, now, now)
+            )
+            self._stats["writes"] += 1
+            self._evict(now)
+    
+    def _evict(self, now: float):
+        """Drop expired entries, then LRU entries until under max_bytes."""
+        if self.ttl_seconds is not None:
+            cursor = self._conn.execute(
+                "DELETE FROM responses WHERE created < ?", (now - self.ttl_seconds,)
+            )
+            self._stats["expired"] += max(cursor.rowcount, 0)
+        
+        if self.max_bytes is None:
+            return
+        
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        while total > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY accessed LIMIT 64"
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._stats["evictions"] += 1
+                total -= size
+    
+    def invalidate(self, key: str):
+        """Remove a single entry."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+    
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and storage usage."""
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            stats = dict(self._stats)
+        
+        lookups = stats["hits"] + stats["misses"]
+        stats.update({
+            "entries": entries,
+            "bytes": total,
+            "hit_rate": stats["hits"] / lookups if lookups else 0.0,
+            "saved_seconds": round(self._saved_seconds, 3)
+        })
+        return stats
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+def get_response_cache() -> ResponseCache:
+    """Return the process-wide response cache configured from settings."""
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache(
+                settings.data_dir / "llm_cache.sqlite",
+                ttl_seconds=settings.llm_cache_ttl_seconds,
+                max_bytes=settings.llm_cache_max_mb * 1024 * 1024
+            )
+            logger.info(f"LLM response cache at {_response_cache.path}")
+        return _response_cache
+
@@ -0,0 +1,96 @@
+"""
+Shared Chat Model Clients
+"""
+from typing import Dict, Tuple
+from langchain_core.language_models import BaseChatModel
+from langchain_groq import ChatGroq
+from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_anthropic import ChatAnthropic
+from config.settings import settings
+from llm.rate_limit import response_hooks
+from utils.logger import get_logger
+import groq
+import threading
+
+logger = get_logger(__name__)
+
+ClientKey = Tuple[str, str, float]
+
+_clients: Dict[ClientKey, BaseChatModel] = {}
+_clients_lock = threading.Lock()
+
+def _create_model(provider: str, model: str, temperature: float) -> BaseChatModel:
+    if provider == "google":
+        return ChatGoogleGenerativeAI(
+            model=model,
+            temperature=temperature,
+            google_api_key=settings.google_api_key
+        )
+    if provider == "groq":
+        http_clients = {}
+        if settings.rate_limit_enabled:
+            # Feed every response's rate-limit headers to the model's limiter
+            hook, ahook = response_hooks(provider, model)
+            http_clients = {
+                "http_client": groq.DefaultHttpxClient(event_hooks={"response": [hook]}),
+                "http_async_client": groq.DefaultAsyncHttpxClient(event_hooks={"response": [ahook]})
+            }
+        return ChatGroq(
+            model=model,
+            temperature=temperature,
+            groq_api_key=settings.groq_api_key,
+            **http_clients
+        )
+    if provider == "anthropic":
+        return ChatAnthropic(
+            model=model,
+            temperature=temperature,
+            anthropic_api_key=settings.anthropic_api_key
+        )
+    raise ValueError(f"Unknown provider: {provider}")
+
+def get_chat_model(provider: str, model: str, temperature: float) -> BaseChatModel:
+    """
+    Return the process-wide client for (provider, model, temperature).
+    
+    Each client owns an HTTP connection pool, so agents with the same
+    settings share one instead of opening their own.
+    """
+    key = (provider, model, round(float(temperature), 4))
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            logger.info(f"Creating {provider} client for {model} (temperature={temperature})")
+            client = _create_model(provider, model, temperature)
+            _clients[key] = client
+        return client
+
+def list_chat_models() -> Dict[ClientKey, BaseChatModel]:
+    """Return a snapshot of the shared clients."""
+    with _clients_lock:
+        return dict(_clients)
+
+def warm_connection(client: BaseChatModel) -> bool:
+    """
+    Open the client's HTTP connection ahead of the first request.
+    
+    Issues the provider's free model-listing call where the SDK exposes
+    one; returns False when the client can't be warmed this way.
+    """
+    root = getattr(getattr(client, "client", None), "_client", None)
+    models = getattr(root, "models", None)
+    if models is None or not hasattr(models, "list"):
+        return False
+    
+    try:
+        models.list()
+        return True
+    except Exception as e:
+        logger.warning(f"Connection warm-up failed: {str(e)}")
+        return False
+
+def clear_chat_models():
+    """Drop every shared client (mainly for tests)."""
+    with _clients_lock:
+        _clients.clear()
+
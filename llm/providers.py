@@ -0,0 +1,392 @@
+"""
+Provider Pool with Circuit Breakers and Hedged Requests
+"""
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from config.settings import settings
+from utils.helpers import percentile
+from utils.logger import get_logger
+import asyncio
+import threading
+import time
+
+logger = get_logger(__name__)
+
+Backend = Tuple[str, str]  # (provider, model)
+
+class BackendHealth:
+    """
+    Rolling latency/error window and circuit breaker for one backend.
+    
+    The circuit opens after `failure_threshold` consecutive failures, or
+    when the error rate over a full window of at least `min_calls` calls
+    reaches `max_error_rate`. After `cooldown` seconds one trial call is
+    let through (half-open): success closes the circuit, failure reopens it.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        window: int = 100,
+        min_calls: int = 10,
+        failure_threshold: int = 3,
+        max_error_rate: float = 0.5,
+        cooldown: float = 30.0
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_threshold = failure_threshold
+        self.max_error_rate = max_error_rate
+        self.cooldown = cooldown
+        
+        self._lock = threading.Lock()
+        self._samples: deque = deque(maxlen=window)  # (latency, ok)
+        self._consecutive_failures = 0
+        self._state = "closed"
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+    
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == "open" and time.time() - self._opened_at >= self.cooldown:
+                return "half_open"
+            return self._state
+    
+    def allow(self) -> bool:
+        """Return whether a call may go to this backend now (takes the half-open trial slot)."""
+        with self._lock:
+            if self._state == "closed":
+                return True
+            if self._state == "open" and time.time() - self._opened_at >= self.cooldown:
+                self._state = "half_open"
+            if self._state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+    
+    def record(self, latency: float, ok: bool):
+        """Add a call outcome and update the circuit."""
+        with self._lock:
+            self._samples.append((latency, ok))
+            if self._state == "half_open":
+                self._trial_in_flight = False
+                if ok:
+                    logger.info(f"{self.name}: Circuit closed")
+                    self._state = "closed"
+                    self._samples.clear()
+                    self._consecutive_failures = 0
+                else:
+                    self._open()
+                return
+            
+            self._consecutive_failures = 0 if ok else self._consecutive_failures + 1
+            if self._state == "closed" and not ok and self._should_open():
+                self._open()
+    
+    def abandon(self):
+        """Forget a call that was cancelled before finishing (frees the half-open trial)."""
+        with self._lock:
+            self._trial_in_flight = False
+    
+    def _should_open(self) -> bool:
+        if self._consecutive_failures >= self.failure_threshold:
+            return True
+        if len(self._samples) < self.min_calls:
+            return False
+        errors = sum(1 for _, ok in self._samples if not ok)
+        return errors / len(self._samples) >= self.max_error_rate
+    
+    def _open(self):
+        logger.warning(f"{self.name}: Circuit open for {self.cooldown:.0f}s")
+        self._state = "open"
+        self._opened_at = time.time()
+    
+    def latency_percentile(self, pct: float) -> Optional[float]:
+        """Latency percentile of successful calls (None until min_calls samples)."""
+        with self._lock:
+            latencies = [latency for latency, ok in self._samples if ok]
+        if len(latencies) < self.min_calls:
+            return None
+        return percentile(latencies, pct)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = list(self._samples)
+        latencies = [latency for latency, ok in samples if ok]
+        return {
+            "state": self.state,
+            "calls": len(samples),
+            "error_rate": round(sum(1 for _, ok in samples if not ok) / len(samples), 4) if samples else 0.0,
+            "p50": round(percentile(latencies, 50), 4) if latencies else None,
+            "p95": round(percentile(latencies, 95), 4) if latencies else None
+        }
+
+class ProviderPool:
+    """
+    Routes a model call across backends by health and latency.
+    
+    The caller's own backend is tried first and the fallbacks, fastest
+    p95 first, take over when it fails or its circuit is open. With
+    hedging on, a duplicate call goes to the next backend once the first
+    has run longer than its p95 latency, and whichever answers first wins.
+    """
+    
+    def __init__(
+        self,
+        fallbacks: Optional[List[Backend]] = None,
+        hedge: bool = False,
+        hedge_delay: float = 4.0,
+        **health_options
+    ):
+        self.fallbacks = list(fallbacks or [])
+        self.hedge = hedge
+        self.hedge_delay_default = hedge_delay
+        self._health_options = health_options
+        self._health: Dict[Backend, BackendHealth] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._stats = {"failovers": 0, "hedges": 0, "hedge_wins": 0}
+    
+    def health(self, backend: Backend) -> BackendHealth:
+        with self._lock:
+            if backend not in self._health:
+                self._health[backend] = BackendHealth(f"{backend[0]}:{backend[1]}", **self._health_options)
+            return self._health[backend]
+    
+    def candidates(self, primary: Backend) -> List[Backend]:
+        """The primary backend followed by the fallbacks, fastest p95 first."""
+        others = [b for b in self.fallbacks if b != primary]
+        others.sort(key=lambda b: self.health(b).latency_percentile(95) or self.hedge_delay_default)
+        return [primary] + others
+    
+    def hedge_delay(self, backend: Backend) -> float:
+        """Seconds to wait on a backend before hedging: its p95 latency once known."""
+        p95 = self.health(backend).latency_percentile(95)
+        return p95 if p95 is not None else self.hedge_delay_default
+    
+    def _count(self, stat: str):
+        with self._lock:
+            self._stats[stat] += 1
+    
+    def _timed(self, backend: Backend, func: Callable[[str, str], Any]) -> Tuple[Backend, Any]:
+        start = time.perf_counter()
+        try:
+            result = func(*backend)
+        except Exception:
+            self.health(backend).record(time.perf_counter() - start, ok=False)
+            raise
+        self.health(backend).record(time.perf_counter() - start, ok=True)
+        return backend, result
+    
+    async def _atimed(self, backend: Backend, func: Callable[[str, str], Awaitable[Any]]) -> Tuple[Backend, Any]:
+        start = time.perf_counter()
+        try:
+            result = await func(*backend)
+        except asyncio.CancelledError:
+            # A hedge that lost the race says nothing about the backend's health
+            self.health(backend).abandon()
+            raise
+        except Exception:
+            self.health(backend).record(time.perf_counter() - start, ok=False)
+            raise
+        self.health(backend).record(time.perf_counter() - start, ok=True)
+        return backend, result
+    
+    def _next_allowed(self, backends: List[Backend]) -> Optional[int]:
+        for index, backend in enumerate(backends):
+            if self.health(backend).allow():
+                return index
+        return None
+    
+    def call(self, primary: Backend, func: Callable[[str, str], Any], hedge: Optional[bool] = None) -> Tuple[Backend, Any]:
+        """
+        Run func(provider, model) on the best available backend.
+        
+        Args:
+            primary: The caller's own (provider, model)
+            func: Performs the call on a given backend
+            hedge: Override the pool's hedging setting for this call
+        
+        Returns:
+            (backend that answered, its result)
+        """
+        backends = self.candidates(primary)
+        hedge = self.hedge if hedge is None else hedge
+        last_error: Optional[Exception] = None
+        
+        while backends:
+            index = self._next_allowed(backends)
+            if index is None:
+                break
+            backend = backends[index]
+            backends = backends[index + 1:]
+            if last_error is not None:
+                self._count("failovers")
+                logger.warning(f"Failing over to {backend[0]}:{backend[1]}")
+            
+            try:
+                if hedge and backends:
+                    return self._call_hedged(backend, backends, func)
+                return self._timed(backend, func)
+            except Exception as e:
+                last_error = e
+                logger.warning(f"{backend[0]}:{backend[1]} failed: {str(e)}")
+        
+        if last_error is not None:
+            raise last_error
+        # Every circuit is open; the caller's own backend is still better than no answer
+        return self._timed(primary, func)
+    
+    def _call_hedged(self, first: Backend, rest: List[Backend], func: Callable[[str, str], Any]) -> Tuple[Backend, Any]:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="hedge")
+            executor = self._executor
+        
+        pending = {executor.submit(self._timed, first, func)}
+        done, pending = wait(pending, timeout=self.hedge_delay(first))
+        if not done:
+            index = self._next_allowed(rest)
+            if index is not None:
+                logger.debug(f"Hedging {first[0]}:{first[1]} with {rest[index][0]}:{rest[index][1]}")
+                self._count("hedges")
+                pending.add(executor.submit(self._timed, rest[index], func))
+        
+        last_error: Optional[BaseException] = None
+        while True:
+            for future in done:
+                if future.exception() is None:
+                    backend, result = future.result()
+                    if backend != first:
+                        self._count("hedge_wins")
+                    # The slower call is left to finish in the background
+                    return backend, result
+                last_error = future.exception()
+            if not pending:
+                raise last_error
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+    
+    async def acall(
+        self,
+        primary: Backend,
+        func: Callable[[str, str], Awaitable[Any]],
+        hedge: Optional[bool] = None
+    ) -> Tuple[Backend, Any]:
+        """Async variant of call(); func returns an awaitable."""
+        backends = self.candidates(primary)
+        hedge = self.hedge if hedge is None else hedge
+        last_error: Optional[Exception] = None
+        
+        while backends:
+            index = self._next_allowed(backends)
+            if index is None:
+                break
+            backend = backends[index]
+            backends = backends[index + 1:]
+            if last_error is not None:
+                self._count("failovers")
+                logger.warning(f"Failing over to {backend[0]}:{backend[1]}")
+            
+            try:
+                if hedge and backends:
+                    return await self._acall_hedged(backend, backends, func)
+                return await self._atimed(backend, func)
+            except Exception as e:
+                last_error = e
+                logger.warning(f"{backend[0]}:{backend[1]} failed: {str(e)}")
+        
+        if last_error is not None:
+            raise last_error
+        return await self._atimed(primary, func)
+    
+    async def _acall_hedged(self, first: Backend, rest: List[Backend], func: Callable[[str, str], Awaitable[Any]]) -> Tuple[Backend, Any]:
+        pending = {asyncio.create_task(self._atimed(first, func))}
+        done, pending = await asyncio.wait(pending, timeout=self.hedge_delay(first))
+        if not done:
+            index = self._next_allowed(rest)
+            if index is not None:
+                logger.debug(f"Hedging {first[0]}:{first[1]} with {rest[index][0]}:{rest[index][1]}")
+                self._count("hedges")
+                pending.add(asyncio.create_task(self._atimed(rest[index], func)))
+        
+        last_error: Optional[BaseException] = None
+        try:
+            while True:
+                for task in done:
+                    if task.exception() is None:
+                        backend, result = task.result()
+                        if backend != first:
+                            self._count("hedge_wins")
+                        return backend, result
+                    last_error = task.exception()
+                if not pending:
+                    raise last_error
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    def select(self, primary: Backend) -> Backend:
+        """Pick one backend for a call that can't fail over midway (e.g. a stream)."""
+        backends = self.candidates(primary)
+        index = self._next_allowed(backends)
+        return primary if index is None else backends[index]
+    
+    def record(self, backend: Backend, latency: float, ok: bool):
+        """Record the outcome of a call made outside call()/acall()."""
+        self.health(backend).record(latency, ok)
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            backends = dict(self._health)
+            counts = dict(self._stats)
+        return {
+            **counts,
+            "backends": {health.name: health.snapshot() for health in backends.values()}
+        }
+
+def parse_backends(spec: str) -> List[Backend]:
+    """Parse "google:gemini-2.0-flash-exp,anthropic:claude-haiku-4-5" into backends."""
+    backends = []
+    for item in spec.split(","):
+        if ":" in item:
+            provider, model = item.split(":", 1)
+            backends.append((provider.strip(), model.strip()))
+    return backends
+
+def default_fallbacks() -> List[Backend]:
+    """Fallback backends for every secondary provider with an API key."""
+    fallbacks = []
+    if settings.google_api_key:
+        fallbacks.append(("google", settings.fast_model))
+    if settings.anthropic_api_key:
+        fallbacks.append(("anthropic", settings.anthropic_model))
+    return fallbacks
+
+_pool: Optional[ProviderPool] = None
+_pool_lock = threading.Lock()
+
+def get_provider_pool() -> ProviderPool:
+    """Return the process-wide provider pool configured from settings."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProviderPool(
+                parse_backends(settings.provider_fallbacks) if settings.provider_fallbacks else default_fallbacks(),
+                hedge=settings.hedge_requests,
+                hedge_delay=settings.hedge_delay_seconds,
+                window=settings.provider_window,
+                failure_threshold=settings.circuit_failure_threshold,
+                max_error_rate=settings.circuit_error_rate,
+                cooldown=settings.circuit_cooldown_seconds
+            )
+        return _pool
+
+def clear_provider_pool():
+    """Drop the pool and its health history (mainly for tests)."""
+    global _pool
+    with _pool_lock:
+        _pool = None
+
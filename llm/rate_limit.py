@@ -0,0 +1,423 @@
+"""
+Adaptive Client-Side Rate Limiting
+"""
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Tuple
+from config.settings import settings
+from utils.logger import get_logger
+import asyncio
+import re
+import sqlite3
+import threading
+import time
+
+logger = get_logger(__name__)
+
+# Free-tier budgets as (requests per minute, tokens per minute); override with RATE_LIMITS
+DEFAULT_LIMITS: Dict[str, Tuple[int, int]] = {
+    "llama-3.3-70b-versatile": (30, 12000),
+    "llama-3.1-8b-instant": (30, 6000),
+    "gemini-2.0-flash-exp": (10, 1000000),
+}
+FALLBACK_LIMITS = (30, 6000)
+
+# Output tokens reserved for calls whose agent gives no expected_output_tokens hint
+DEFAULT_OUTPUT_TOKENS = 1024
+
+# A 429 halves the concurrency limit at most once per window, so a burst
+# of failures from requests already in flight counts as one congestion event
+DECREASE_WINDOW_SECONDS = 1.0
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+def parse_limits(spec: str) -> Dict[str, Tuple[int, int]]:
+    """Parse "llama-3.3-70b-versatile=30/12000,..." into model -> (rpm, tpm)."""
+    limits = dict(DEFAULT_LIMITS)
+    for item in spec.split(","):
+        if "=" in item:
+            model, value = item.split("=", 1)
+            rpm, tpm = value.split("/", 1)
+            limits[model.strip()] = (int(rpm), int(tpm))
+    return limits
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Parse a header duration such as "7.66s", "2m59.56s", "120ms" or "3" into seconds."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    
+    units = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+    parts = _DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(number) * units[unit] for number, unit in parts)
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """True for provider errors meaning "too many requests" (HTTP 429 / quota exhausted)."""
+    if getattr(error, "status_code", None) == 429 or getattr(error, "code", None) == 429:
+        return True
+    return type(error).__name__ in ("RateLimitError", "ResourceExhausted", "TooManyRequests")
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the provider asked us to wait, read from the error's response headers."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    for name in ("retry-after", "x-ratelimit-reset-tokens", "x-ratelimit-reset-requests"):
+        seconds = parse_duration(headers.get(name))
+        if seconds is not None:
+            return seconds
+    return None
+
+def _observed(error: BaseException) -> bool:
+    # Responses seen by response_hooks() have already been counted
+    extensions = getattr(getattr(error, "response", None), "extensions", None) or {}
+    return bool(extensions.get("rate_limit_observed"))
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `rate` per second up to `capacity`.
+    
+    Callers reserve what they need up front and are told how long to wait
+    for it; the level may go negative, which queues later callers behind
+    earlier ones in arrival order.
+    """
+    
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._level = capacity
+        self._paused_until = 0.0
+        self._updated = time.time()
+    
+    def _update(self, change: Callable[[float, float, float], Tuple[float, float, Any]]) -> Any:
+        """Apply change(level, paused_until, now) -> (level, paused_until, result) atomically."""
+        with self._lock:
+            now = time.time()
+            level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+            self._level, self._paused_until, result = change(level, self._paused_until, now)
+            self._updated = now
+            return result
+    
+    def reserve(self, amount: float) -> float:
+        """Take amount from the bucket and return the seconds to wait before using it."""
+        # A request larger than the whole bucket could never fit; let it drain the bucket instead
+        amount = min(amount, self.capacity)
+        
+        def change(level, paused_until, now):
+            level -= amount
+            wait = max(-level / self.rate if level < 0 else 0.0, paused_until - now)
+            return level, paused_until, wait
+        return self._update(change)
+    
+    def refund(self, amount: float):
+        """Return unused reservation (e.g. when a call used fewer tokens than estimated)."""
+        self._update(lambda level, paused_until, now: (min(self.capacity, level + amount), paused_until, None))
+    
+    def sync(self, remaining: float):
+        """Lower the level to what the provider reports is left."""
+        self._update(lambda level, paused_until, now: (min(level, remaining), paused_until, None))
+    
+    def pause(self, seconds: float):
+        """Make every reservation wait at least this long from now."""
+        self._update(lambda level, paused_until, now: (level, max(paused_until, now + seconds), None))
+    
+    def level(self) -> float:
+        return self._update(lambda level, paused_until, now: (level, paused_until, level))
+
+class SharedTokenBucket(TokenBucket):
+    """
+    Token bucket whose state lives in a SQLite file, shared by every
+    process (e.g. batch workers) that opens the same path and name.
+    """
+    
+    def __init__(self, rate: float, capacity: float, path: Path, name: str):
+        super().__init__(rate, capacity)
+        self.name = name
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS buckets (
+                name TEXT PRIMARY KEY,
+                level REAL NOT NULL,
+                paused_until REAL NOT NULL,
+                updated REAL NOT NULL
+            )
+        """)
+    
+    def _update(self, change):
+        with self._lock:
+            # BEGIN IMMEDIATE takes the write lock, so read-modify-write is atomic across processes
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = self._conn.execute(
+                    "SELECT level, paused_until, updated FROM buckets WHERE name = ?", (self.name,)
+                ).fetchone()
+                level, paused_until, updated = row if row else (self.capacity, 0.0, now)
+                level = min(self.capacity, level + (now - updated) * self.rate)
+                level, paused_until, result = change(level, paused_until, now)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO buckets (name, level, paused_until, updated) VALUES (?, ?, ?, ?)",
+                    (self.name, level, paused_until, now)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return result
+
+class RateLimiter:
+    """
+    Request, token and concurrency budget for one provider model.
+    
+    Requests and tokens per minute are token buckets; in-flight calls are
+    capped by an AIMD limit that halves on a 429 and grows back by about
+    one per round of successful calls. The buckets may be shared across
+    processes (see SharedTokenBucket); the concurrency limit is per process.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_concurrency: int = 8,
+        shared_path: Optional[Path] = None
+    ):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        if shared_path is not None:
+            self.requests = SharedTokenBucket(requests_per_minute / 60, requests_per_minute, shared_path, f"{name}:requests")
+            self.tokens = SharedTokenBucket(tokens_per_minute / 60, tokens_per_minute, shared_path, f"{name}:tokens")
+        else:
+            self.requests = TokenBucket(requests_per_minute / 60, requests_per_minute)
+            self.tokens = TokenBucket(tokens_per_minute / 60, tokens_per_minute)
+        
+        self._cond = threading.Condition()
+        self._limit = float(max_concurrency)
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._consecutive_limited = 0
+        self._stats = {"calls": 0, "rate_limited": 0, "waited_seconds": 0.0}
+    
+    @property
+    def concurrency_limit(self) -> int:
+        return max(1, int(self._limit))
+    
+    def _reserve(self, tokens: int) -> float:
+        wait = max(self.requests.reserve(1), self.tokens.reserve(tokens))
+        if wait > 0:
+            logger.debug(f"{self.name}: Throttling for {wait:.2f}s")
+        with self._cond:
+            self._stats["calls"] += 1
+            self._stats["waited_seconds"] += wait
+        return wait
+    
+    def _try_enter(self) -> bool:
+        with self._cond:
+            if self._in_flight >= self.concurrency_limit:
+                return False
+            self._in_flight += 1
+            return True
+    
+    def _leave(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+    
+    def _finish(self, error: Optional[BaseException]):
+        if error is None:
+            self.on_success()
+        elif is_rate_limit_error(error) and not _observed(error):
+            self.on_rate_limited(retry_after(error))
+    
+    @contextmanager
+    def slot(self, tokens: int):
+        """Wait for budget and a concurrency slot, then hold the slot for one call."""
+        time.sleep(self._reserve(tokens))
+        with self._cond:
+            while self._in_flight >= self.concurrency_limit:
+                self._cond.wait(0.1)
+            self._in_flight += 1
+        try:
+            yield
+        except Exception as e:
+            self._finish(e)
+            raise
+        else:
+            self._finish(None)
+        finally:
+            self._leave()
+    
+    @asynccontextmanager
+    async def aslot(self, tokens: int):
+        """Async variant of slot(); waits without blocking the event loop."""
+        await asyncio.sleep(self._reserve(tokens))
+        while not self._try_enter():
+            await asyncio.sleep(0.05)
+        try:
+            yield
+        except Exception as e:
+            self._finish(e)
+            raise
+        else:
+            self._finish(None)
+        finally:
+            self._leave()
+    
+    def call(self, func: Callable[[], Any], tokens: int, retries: Optional[int] = None) -> Any:
+        """
+        Run func() within the budget, retrying when the provider rate-limits it.
+        
+        Args:
+            func: The model call
+            tokens: Estimated prompt plus output tokens
+            retries: Retries after a 429 (default: MAX_RETRIES)
+        """
+        retries = settings.max_retries if retries is None else retries
+        for attempt in range(retries + 1):
+            try:
+                with self.slot(tokens):
+                    result = func()
+            except Exception as e:
+                if attempt < retries and is_rate_limit_error(e):
+                    logger.warning(f"{self.name}: Rate limited, retrying ({attempt + 1}/{retries})")
+                    continue
+                raise
+            self.settle(tokens, result)
+            return result
+    
+    async def acall(self, func: Callable[[], Awaitable[Any]], tokens: int, retries: Optional[int] = None) -> Any:
+        """Async variant of call(); func returns an awaitable."""
+        retries = settings.max_retries if retries is None else retries
+        for attempt in range(retries + 1):
+            try:
+                async with self.aslot(tokens):
+                    result = await func()
+            except Exception as e:
+                if attempt < retries and is_rate_limit_error(e):
+                    logger.warning(f"{self.name}: Rate limited, retrying ({attempt + 1}/{retries})")
+                    continue
+                raise
+            self.settle(tokens, result)
+            return result
+    
+    def settle(self, estimated: int, response: Any):
+        """Refund the part of a token reservation the call didn't use."""
+        usage = getattr(response, "usage_metadata", None) or {}
+        used = usage.get("total_tokens")
+        if used is not None and used < estimated:
+            self.tokens.refund(estimated - used)
+    
+    def on_success(self):
+        """Additive increase: about +1 concurrency per round of successful calls."""
+        with self._cond:
+            self._consecutive_limited = 0
+            self._limit = min(float(self.max_concurrency), self._limit + 1 / self._limit)
+    
+    def on_rate_limited(self, retry_after_seconds: Optional[float] = None):
+        """
+        Multiplicative decrease after a 429.
+        
+        New calls are held back for retry_after_seconds, or an exponential
+        backoff when the provider didn't say how long to wait.
+        """
+        now = time.time()
+        with self._cond:
+            self._stats["rate_limited"] += 1
+            self._consecutive_limited += 1
+            if now - self._last_decrease >= DECREASE_WINDOW_SECONDS:
+                self._limit = max(1.0, self._limit / 2)
+                self._last_decrease = now
+            backoff = min(60.0, 2.0 ** (self._consecutive_limited - 1))
+        
+        pause = retry_after_seconds if retry_after_seconds is not None else backoff
+        self.requests.pause(pause)
+        logger.warning(f"{self.name}: Rate limited; concurrency limit {self.concurrency_limit}, pausing {pause:.2f}s")
+    
+    def observe(self, headers: Mapping[str, str], status_code: int = 200):
+        """
+        Update the budgets from a response's rate-limit headers.
+        
+        Understands the x-ratelimit-* headers Groq (and OpenAI-compatible
+        APIs) send: the token bucket follows the reported tokens-per-minute
+        limit and remaining tokens, and an exhausted request quota pauses
+        new calls until it resets.
+        """
+        limit_tokens = headers.get("x-ratelimit-limit-tokens")
+        if limit_tokens and limit_tokens.isdigit():
+            self.tokens.capacity = float(limit_tokens)
+            self.tokens.rate = float(limit_tokens) / 60
+        
+        remaining_tokens = headers.get("x-ratelimit-remaining-tokens")
+        if remaining_tokens and remaining_tokens.isdigit():
+            self.tokens.sync(float(remaining_tokens))
+        
+        if headers.get("x-ratelimit-remaining-requests") == "0":
+            reset = parse_duration(headers.get("x-ratelimit-reset-requests"))
+            if reset:
+                self.requests.pause(reset)
+        
+        if status_code == 429:
+            self.on_rate_limited(parse_duration(headers.get("retry-after")))
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                **self._stats,
+                "waited_seconds": round(self._stats["waited_seconds"], 3),
+                "concurrency_limit": self.concurrency_limit,
+                "in_flight": self._in_flight
+            }
+
+_limiters: Dict[Tuple[str, str], RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(provider: str, model: str) -> RateLimiter:
+    """Return the process-wide limiter for a provider model."""
+    key = (provider, model)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            rpm, tpm = parse_limits(settings.rate_limits).get(model, FALLBACK_LIMITS)
+            limiter = RateLimiter(
+                f"{provider}:{model}",
+                rpm,
+                tpm,
+                max_concurrency=settings.rate_limit_max_concurrency,
+                shared_path=settings.data_dir / "rate_limits.sqlite" if settings.rate_limit_shared else None
+            )
+            _limiters[key] = limiter
+        return limiter
+
+def response_hooks(provider: str, model: str) -> Tuple[Callable, Callable]:
+    """
+    Return (sync, async) httpx response hooks feeding headers to the model's limiter.
+    
+    They see every response, including 429s the SDK retries internally.
+    """
+    def hook(response):
+        get_rate_limiter(provider, model).observe(response.headers, response.status_code)
+        response.extensions["rate_limit_observed"] = True
+    
+    async def ahook(response):
+        hook(response)
+    
+    return hook, ahook
+
+def rate_limit_stats() -> Dict[str, Dict[str, Any]]:
+    """Return stats for every limiter created so far."""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.stats() for limiter in limiters}
+
+def clear_rate_limiters():
+    """Drop every limiter (mainly for tests)."""
+    with _limiters_lock:
+        _limiters.clear()
+
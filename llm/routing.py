@@ -0,0 +1,115 @@
+"""
+Stage-Aware Model Routing
+"""
+from typing import Any, Dict, List, Optional
+from config.settings import settings
+from utils.logger import get_logger
+import json
+import threading
+
+logger = get_logger(__name__)
+
+# Rules are checked in order and the first match picks the model; agents
+# fall back to their own model when nothing matches. Conditions:
+#   agents: only these agent names
+#   max_prompt_tokens: prompt is at most this many tokens
+#   max_output_tokens: the agent expects at most this many output tokens
+#   max_latency_seconds: the agent's latency SLO is at most this tight
+# "model" is a model name or the alias "cheap" / "default".
+DEFAULT_ROUTING_RULES: List[Dict[str, Any]] = [
+    # Short, bounded outputs such as the Researcher's 2-3 sentence overview
+    {"max_prompt_tokens": 2000, "max_output_tokens": 300, "model": "cheap"},
+    # Tight latency SLOs favour the fast model whatever the output size
+    {"max_latency_seconds": 3.0, "model": "cheap"},
+]
+
+def load_rules(spec: str) -> List[Dict[str, Any]]:
+    """Parse MODEL_ROUTING_RULES (a JSON list of rules), or return the defaults."""
+    if not spec.strip():
+        return list(DEFAULT_ROUTING_RULES)
+    rules = json.loads(spec)
+    if not isinstance(rules, list) or not all(isinstance(r, dict) and "model" in r for r in rules):
+        raise ValueError("MODEL_ROUTING_RULES must be a JSON list of objects with a 'model' key")
+    return rules
+
+class ModelRouter:
+    """Picks a model per call from declarative rules and counts which model served it."""
+    
+    def __init__(self, rules: List[Dict[str, Any]], aliases: Optional[Dict[str, str]] = None):
+        self.rules = rules
+        self.aliases = aliases or {}
+        self._lock = threading.Lock()
+        self._served: Dict[str, Dict[str, int]] = {}
+        self._escalations = 0
+    
+    def resolve(self, model: str) -> str:
+        return self.aliases.get(model, model)
+    
+    def route(
+        self,
+        agent: str,
+        prompt_tokens: int,
+        fallback: str,
+        expected_output_tokens: Optional[int] = None,
+        latency_slo: Optional[float] = None
+    ) -> str:
+        """
+        Return the model for a call.
+        
+        Args:
+            agent: Agent name
+            prompt_tokens: Size of the prompt
+            fallback: Model used when no rule matches (the agent's own model)
+            expected_output_tokens: Upper bound the agent expects for its output
+            latency_slo: Seconds the agent's stage should take at most
+        """
+        for rule in self.rules:
+            if "agents" in rule and agent not in rule["agents"]:
+                continue
+            if "max_prompt_tokens" in rule and prompt_tokens > rule["max_prompt_tokens"]:
+                continue
+            if "max_output_tokens" in rule and (
+                expected_output_tokens is None or expected_output_tokens > rule["max_output_tokens"]
+            ):
+                continue
+            if "max_latency_seconds" in rule and (
+                latency_slo is None or latency_slo > rule["max_latency_seconds"]
+            ):
+                continue
+            return self.resolve(rule["model"])
+        return fallback
+    
+    def record(self, agent: str, model: str, escalated: bool = False):
+        """Count a call served by model (escalated: after a cascade fallback)."""
+        with self._lock:
+            by_model = self._served.setdefault(agent, {})
+            by_model[model] = by_model.get(model, 0) + 1
+            self._escalations += escalated
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return calls served per agent and model, plus cascade escalations."""
+        with self._lock:
+            return {
+                "served": {agent: dict(models) for agent, models in self._served.items()},
+                "escalations": self._escalations
+            }
+    
+    def reset_stats(self):
+        with self._lock:
+            self._served.clear()
+            self._escalations = 0
+
+_router: Optional[ModelRouter] = None
+_router_lock = threading.Lock()
+
+def get_router() -> ModelRouter:
+    """Return the process-wide router configured from settings."""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = ModelRouter(
+                load_rules(settings.model_routing_rules),
+                aliases={"cheap": settings.cheap_model, "default": settings.default_model}
+            )
+        return _router
+
@@ -0,0 +1,131 @@
+"""
+Semantic (Near-Duplicate) Prompt Cache
+"""
+from typing import Dict, Any, Optional
+from config.settings import settings
+from utils.logger import get_logger
+from utils.vectorize import HashingVectorizer
+import threading
+import time
+import numpy as np
+
+logger = get_logger(__name__)
+
+class SemanticCache:
+    """
+    In-memory cache that matches prompts by cosine similarity.
+    
+    Prompts are embedded locally with a HashingVectorizer into a
+    preallocated NumPy matrix, so memory is fixed at
+    max_entries x n_features floats. Lookups only compare entries that
+    share the same scope (model settings plus the fixed part of the
+    prompt), and when the matrix is full the least recently used row is
+    overwritten.
+    """
+    
+    def __init__(self, max_entries: int = 1024, n_features: int = 4096):
+        self.max_entries = max_entries
+        self.vectorizer = HashingVectorizer(n_features=n_features)
+        
+        self._lock = threading.Lock()
+        self._vectors = np.zeros((max_entries, n_features), dtype=np.float32)
+        self._scopes = np.full(max_entries, -1, dtype=np.int64)
+        self._last_used = np.zeros(max_entries, dtype=np.float64)
+        self._responses = [None] * max_entries
+        self._scope_ids: Dict[str, int] = {}
+        self._scope_names: Dict[int, str] = {}
+        self._next_scope_id = -1
+        self._size = 0
+        
+        self._stats = {"lookups": 0, "hits": 0, "misses": 0, "evictions": 0}
+    
+    def _scope_id(self, scope: str) -> int:
+        if scope not in self._scope_ids:
+            self._next_scope_id += 1
+            self._scope_ids[scope] = self._next_scope_id
+            self._scope_names[self._next_scope_id] = scope
+        return self._scope_ids[scope]
+    
+    def lookup(self, scope: str, text: str, threshold: float) -> Optional[str]:
+        """Return the cached response most similar to text if it passes threshold."""
+        vector = self.vectorizer.transform_one(text)
+        with self._lock:
+            self._stats["lookups"] += 1
+            scope_id = self._scope_ids.get(scope)
+            
+            if scope_id is not None and self._size:
+                similarities = self._vectors[:self._size] @ vector
+                similarities[self._scopes[:self._size] != scope_id] = -1.0
+                best = int(np.argmax(similarities))
+                
+                if similarities[best] >= threshold:
+                    self._last_used[best] = time.monotonic()
+                    self._stats["hits"] += 1
+                    logger.debug(f"Semantic cache hit (similarity {similarities[best]:.3f})")
+                    return self._responses[best]
+            
+            self._stats["misses"] += 1
+            return None
+    
+    def add(self, scope: str, text: str, response: str):
+        """Store a response, evicting the least recently used entry when full."""
+        vector = self.vectorizer.transform_one(text)
+        with self._lock:
+            if self._size < self.max_entries:
+                slot = self._size
+                self._size += 1
+            else:
+                slot = int(np.argmin(self._last_used))
+                self._stats["evictions"] += 1
+            
+            evicted_scope = int(self._scopes[slot])
+            self._vectors[slot] = vector
+            self._scopes[slot] = self._scope_id(scope)
+            self._last_used[slot] = time.monotonic()
+            self._responses[slot] = response
+            
+            # Forget scopes with no remaining entries so the map stays bounded
+            if evicted_scope >= 0 and not np.any(self._scopes[:self._size] == evicted_scope):
+                del self._scope_ids[self._scope_names.pop(evicted_scope)]
+    
+    def clear(self):
+        with self._lock:
+            self._vectors[:] = 0
+            self._scopes[:] = -1
+            self._last_used[:] = 0
+            self._responses = [None] * self.max_entries
+            self._scope_ids.clear()
+            self._scope_names.clear()
+            self._size = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return lookup counters; every hit is a model call saved."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = self._size
+        
+        stats["hit_rate"] = stats["hits"] / stats["lookups"] if stats["lookups"] else 0.0
+        stats["saved_calls"] = stats["hits"]
+        stats["index_bytes"] = self._vectors.nbytes
+        return stats
+
+def parse_thresholds(spec: str) -> Dict[str, float]:
+    """Parse "Agent=0.9,Other Agent=0.95" into a name -> threshold map."""
+    thresholds = {}
+    for item in spec.split(","):
+        if "=" in item:
+            name, value = item.split("=", 1)
+            thresholds[name.strip()] = float(value)
+    return thresholds
+
+_semantic_cache: Optional[SemanticCache] = None
+_semantic_cache_lock = threading.Lock()
+
+def get_semantic_cache() -> SemanticCache:
+    """Return the process-wide semantic cache configured from settings."""
+    global _semantic_cache
+    with _semantic_cache_lock:
+        if _semantic_cache is None:
+            _semantic_cache = SemanticCache(max_entries=settings.semantic_cache_max_entries)
+        return _semantic_cache
+
@@ -0,0 +1,43 @@
+"""
+Shared test fixtures
+"""
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from config.settings import settings
+from llm.clients import clear_chat_models
+from llm.providers import clear_provider_pool
+from tools.dedup import clear_dedup_index
+from tools.topic_memo import clear_topic_memo
+from utils.blobs import clear_blob_store
+from workflows.checkpoints import clear_checkpoints
+from workflows.jobs import clear_job_executor
+from workflows.registry import clear_workflows
+
+@pytest.fixture
+def fake_llm(monkeypatch, tmp_path):
+    """Replace the Groq client used by agents with an offline fake model."""
+    def factory(**kwargs):
+        return FakeListChatModel(responses=["Fake model response"])
+    
+    clear_chat_models()
+    clear_provider_pool()
+    monkeypatch.setattr("llm.clients.ChatGroq", factory)
+    # Fake models have no provider quota to protect
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+    # Checkpoints, the topic memo, the dedup index and blobs go to per-test storage
+    monkeypatch.setattr(settings, "data_dir", tmp_path)
+    clear_checkpoints()
+    clear_topic_memo()
+    clear_dedup_index()
+    clear_blob_store()
+    clear_workflows()
+    yield factory
+    clear_job_executor()
+    clear_chat_models()
+    clear_provider_pool()
+    clear_checkpoints()
+    clear_topic_memo()
+    clear_dedup_index()
+    clear_blob_store()
+    clear_workflows()
+
@@ -1,10 +1,13 @@
 """
 Unit tests for agents
 """
+import asyncio
+import threading
 import pytest
 from agents.research_agents import ResearchAgent, DataCollectorAgent
 from agents.analysis_agents import AnalystAgent
 from agents.writing_agents import WriterAgent
+from utils.blobs import resolve_json, resolve_text
 
 @pytest.fixture
 def mock_state():
@@ -50,3 +53,82 @@ def test_writer_execute(mock_state):
     assert "final_report" in result
     assert result["next_agent"] == "END"
 
+def test_writer_execute_streams_tokens(mock_state, fake_llm):
+    """Test that the writer reports tokens and still returns the full report."""
+    mock_state["analysis_results"] = "Test analysis"
+    tokens = []
+    result = WriterAgent().execute(mock_state, on_token=tokens.append)
+    
+    assert len(tokens) > 1
+    assert "".join(tokens) == result["final_report"] == "Fake model response"
+
+@pytest.mark.asyncio
+async def test_researcher_aexecute(mock_state, fake_llm):
+    """Test research agent async execution."""
+    agent = ResearchAgent()
+    result = await agent.aexecute(mock_state)
+    
+    assert "Fake model response" in resolve_text(result["research_notes"])
+    assert result["next_agent"] == "collector"
+
+@pytest.mark.asyncio
+async def test_base_agent_aexecute_fallback(mock_state, fake_llm):
+    """Test that agents without a native coroutine run execute() in a thread."""
+    from agents.analysis_agents import SentimentAnalyzer
+    agent = SentimentAnalyzer()
+    result = await agent.aexecute(mock_state)
+    
+    assert "sentiment_analysis" in result
+
+def test_collector_searches_topics_concurrently(mock_state, fake_llm, monkeypatch):
+    """Test that every topic's search is in flight at the same time."""
+    mock_state["trending_topics"] = ["AI", "ML", "LangGraph", "RAG", "Agents"]
+    # Sequential searches would never all reach the barrier, and time out
+    barrier = threading.Barrier(5, timeout=10)
+    original = DataCollectorAgent._search_topic
+    
+    def search(self, topic):
+        barrier.wait()
+        return original(self, topic)
+    
+    monkeypatch.setattr(DataCollectorAgent, "_search_topic", search)
+    result = DataCollectorAgent().execute(mock_state)
+    
+    assert len(resolve_json(result["articles"])) == 10
+    assert not barrier.broken
+
+@pytest.mark.asyncio
+async def test_collector_aexecute_concurrently(mock_state, fake_llm, monkeypatch):
+    """Test async collection covers every topic concurrently."""
+    mock_state["trending_topics"] = ["AI", "ML", "LangGraph", "RAG", "Agents"]
+    in_flight, peak = 0, 0
+    original = DataCollectorAgent._asearch_topic
+    
+    async def search(self, topic):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            return await original(self, topic)
+        finally:
+            in_flight -= 1
+    
+    monkeypatch.setattr(DataCollectorAgent, "_asearch_topic", search)
+    result = await DataCollectorAgent().aexecute(mock_state)
+    
+    assert [a["title"] for a in resolve_json(result["articles"])][:2] == ["Deep Dive into AI", "AI: Best Practices and Patterns"]
+    assert peak == 5
+
+def test_collector_summarizes_long_articles(mock_state, fake_llm, monkeypatch):
+    """Test that article text over the limit is summarized before it reaches the notes."""
+    body = " ".join(f"Agents sentence number {i} about agent workflows." for i in range(50))
+    article = {"title": "Long read", "url": "https://example.com/long", "summary": body, "source": "Blog"}
+    monkeypatch.setattr(DataCollectorAgent, "_search_topic", lambda self, topic: [article])
+    
+    result = DataCollectorAgent().execute(mock_state)
+    
+    assert all(len(a["summary"]) <= 600 for a in resolve_json(result["articles"]))
+    assert body not in resolve_text(result["research_notes"])
+    assert article["summary"] == body  # the search result itself is left alone
+
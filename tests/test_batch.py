@@ -0,0 +1,40 @@
+"""
+Test the headless batch runner
+"""
+import json
+from workflows.batch import run_batch
+
+def _write_tasks(path, tasks):
+    path.write_text("\n".join(json.dumps(t) for t in tasks) + "\n")
+
+def test_batch_streams_results_and_resumes(tmp_path, fake_llm):
+    """Test that results are written per task and finished tasks are skipped on resume."""
+    tasks_file = tmp_path / "tasks.jsonl"
+    output = tmp_path / "results.jsonl"
+    _write_tasks(tasks_file, [
+        {"id": "a", "task": "Research AI agents"},
+        {"id": "b", "task": "Research RAG systems", "workflow": "multi"},
+        "Research LLM costs"
+    ])
+    
+    summary = run_batch(tasks_file, output, workers=2)
+    
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert sorted(r["id"] for r in records) == ["3", "a", "b"]
+    assert all(r["status"] == "ok" and r["result"].startswith("Fake model response") for r in records)
+    assert summary["completed"] == 3
+    assert summary["latency"]["count"] == 3
+    
+    # A fourth task added later is the only one run on resume
+    _write_tasks(tasks_file, [
+        {"id": "a", "task": "Research AI agents"},
+        {"id": "b", "task": "Research RAG systems"},
+        "Research LLM costs",
+        {"id": "d", "task": "Research agent evaluation"}
+    ])
+    summary = run_batch(tasks_file, output, workers=2)
+    
+    assert summary["skipped"] == 3
+    assert summary["completed"] == 1
+    assert len(output.read_text().splitlines()) == 4
+
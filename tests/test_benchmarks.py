@@ -0,0 +1,41 @@
+"""
+Test the offline benchmark suite
+"""
+from benchmarks import LatencyDistribution, compare_results, run_benchmark
+
+def test_latency_distribution_is_seeded():
+    """Test that samplers with the same seed produce the same latencies."""
+    first = LatencyDistribution.parse("lognormal:0.5,0.3", seed=7)
+    second = LatencyDistribution.parse("lognormal:0.5,0.3", seed=7)
+    
+    assert [first.sample() for _ in range(5)] == [second.sample() for _ in range(5)]
+    assert LatencyDistribution.parse("fixed:0.25").sample() == 0.25
+
+def test_run_benchmark_reports_both_workflows(fake_llm, tmp_path):
+    """Test end-to-end, per-node and throughput numbers for each level."""
+    results = run_benchmark(
+        concurrency_levels=(1, 2),
+        runs_per_level=2,
+        llm_latency="fixed:0.01",
+        tool_latency="fixed:0"
+    )
+    
+    levels = {(r["workflow"], r["concurrency"]): r for r in results["results"]}
+    assert set(levels) == {("single", 1), ("single", 2), ("multi", 1), ("multi", 2)}
+    
+    multi = levels[("multi", 2)]
+    assert multi["errors"] == 0
+    assert multi["latency"]["count"] == 2
+    assert multi["throughput_per_s"] > 0
+    assert {"research", "collection", "analysis", "writing"} <= set(multi["nodes"])
+    assert multi["llm_calls"] > 0
+    
+    # The fake model drives the single agent through its tool loop (two tools per run)
+    assert levels[("single", 1)]["tool_calls"] == 4
+    
+    # Checkpoints, memo, dedup index and blobs stay in the test's directory
+    assert (tmp_path / "checkpoints.sqlite").exists()
+    
+    rows = compare_results(results, results)
+    assert all(row["p50_change"] == 0 for row in rows)
+
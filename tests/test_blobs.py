@@ -0,0 +1,74 @@
+"""
+Test the content-addressed blob store and references in workflow state
+"""
+import json
+import os
+import time
+import pytest
+from config.settings import settings
+from utils.blobs import BlobStore, is_ref, resolve_json, resolve_text, store_json, store_text
+from workflows.registry import start_run
+
+def test_store_deduplicates_and_maps_content(tmp_path):
+    """Test that equal content is stored once and read back through a memory map."""
+    store = BlobStore(tmp_path)
+    digest = store.put(b"research notes")
+    
+    assert store.put(b"research notes") == digest
+    assert len(list(tmp_path.glob("*/*"))) == 1
+    with store.view(digest) as data:
+        assert data[:8] == b"research"
+    assert store.get(store.put(b"")) == b""
+    with pytest.raises(KeyError):
+        store.get("0" * 64)
+
+def test_prune_keeps_recently_stored_blobs(tmp_path):
+    """Test that only blobs not stored again within the retention window are deleted."""
+    store = BlobStore(tmp_path)
+    old, fresh = store.put(b"old"), store.put(b"fresh")
+    month_ago = time.time() - 31 * 86400
+    for digest in (old, fresh):
+        os.utime(store.path(digest), (month_ago, month_ago))
+    store.put(b"fresh")
+    
+    assert store.prune(30 * 86400) == 1
+    assert old not in store and fresh in store
+
+def test_prune_keeps_recently_read_blobs(tmp_path):
+    """Test that reading a blob protects it from pruning, as resuming a run does."""
+    store = BlobStore(tmp_path)
+    old, read = store.put(b"old"), store.put(b"read")
+    month_ago = time.time() - 31 * 86400
+    for digest in (old, read):
+        os.utime(store.path(digest), (month_ago, month_ago))
+    assert store.get(read) == b"read"
+    
+    assert store.prune(30 * 86400) == 1
+    assert old not in store and read in store
+
+def test_references_resolve_and_pass_values_through(fake_llm, monkeypatch):
+    """Test that references resolve lazily and plain values are left alone."""
+    articles = [{"title": "Agents", "summary": "About agents"}]
+    ref = store_json(articles)
+    
+    assert is_ref(ref) and resolve_json(ref) == articles
+    assert resolve_text(store_text("notes")) == "notes"
+    assert resolve_text("inline notes") == "inline notes"
+    assert resolve_json(None, []) == []
+    
+    monkeypatch.setattr(settings, "blob_store_enabled", False)
+    assert store_json(articles) is articles
+
+def test_workflow_state_carries_references(fake_llm):
+    """Test that a multi-agent run's state holds references, not article text."""
+    graph, inputs, config = start_run("multi", "Research AI agents")
+    state = graph.invoke(inputs, config)
+    
+    assert is_ref(state["research_notes"]) and is_ref(state["articles"])
+    assert len(resolve_json(state["articles"])) > 0
+    assert "## Detailed Research Data" in resolve_text(state["research_notes"])
+    assert state["final_report"].startswith("Fake model response")
+    
+    carried = {key: state[key] for key in ("research_notes", "articles", "topic_articles")}
+    assert len(json.dumps(carried)) < 300
+
@@ -0,0 +1,128 @@
+"""
+Unit tests for LLM response caching
+"""
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from llm.cache import ResponseCache
+from llm.semantic_cache import SemanticCache
+from agents.writing_agents import WriterAgent
+
+@pytest.fixture
+def cache(tmp_path):
+    """Create an isolated on-disk response cache."""
+    cache = ResponseCache(tmp_path / "cache.sqlite", ttl_seconds=60, max_bytes=1000)
+    yield cache
+    cache.close()
+
+def test_cache_key_depends_on_model_settings():
+    """Test that keys change with provider, model, temperature and prompt."""
+    base = ResponseCache.make_key("groq", "llama", 0.3, "prompt")
+    
+    assert base == ResponseCache.make_key("groq", "llama", 0.3, "prompt")
+    assert base != ResponseCache.make_key("google", "llama", 0.3, "prompt")
+    assert base != ResponseCache.make_key("groq", "gemma", 0.3, "prompt")
+    assert base != ResponseCache.make_key("groq", "llama", 0.7, "prompt")
+    assert base != ResponseCache.make_key("groq", "llama", 0.3, "other prompt")
+
+def test_cache_hit_miss_and_persistence(cache, tmp_path):
+    """Test hit/miss counters and that entries survive reopening."""
+    assert cache.get("k") is None
+    cache.set("k", "value", latency=1.5)
+    assert cache.get("k") == "value"
+    
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["saved_seconds"] == 1.5
+    
+    reopened = ResponseCache(tmp_path / "cache.sqlite")
+    assert reopened.get("k") == "value"
+    reopened.close()
+
+def test_cache_ttl_expiry(cache, monkeypatch):
+    """Test that entries older than the TTL are treated as misses."""
+    cache.set("k", "value")
+    
+    import llm.cache
+    real_time = llm.cache.time.time
+    monkeypatch.setattr(llm.cache.time, "time", lambda: real_time() + 120)
+    
+    assert cache.get("k") is None
+    assert cache.stats()["expired"] == 1
+
+def test_cache_lru_eviction(cache):
+    """Test that least recently used entries are evicted past max_bytes."""
+    cache.set("a", "x" * 400)
+    cache.set("b", "x" * 400)
+    cache.get("a")  # "b" is now least recently used
+    cache.set("c", "x" * 400)
+    
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+def test_agent_uses_cache(cache, monkeypatch, fake_llm):
+    """Test that BaseAgent serves repeated prompts from the cache."""
+    monkeypatch.setattr("agents.base.get_response_cache", lambda: cache)
+    monkeypatch.setattr(
+        "llm.clients.ChatGroq",
+        lambda **kwargs: FakeListChatModel(responses=["first", "second"])
+    )
+    
+    agent = WriterAgent()
+    agent.use_cache = True
+    
+    assert agent.invoke("same prompt") == "first"
+    assert agent.invoke("same prompt") == "first"
+    
+    agent.use_cache = False
+    assert agent.invoke("same prompt") == "second"
+
+def test_semantic_cache_matches_near_duplicates():
+    """Test that near-duplicate prompts hit and unrelated ones miss."""
+    cache = SemanticCache(max_entries=8)
+    cache.add("scope", "Research the latest developments in quantum computing", "answer")
+    
+    assert cache.lookup("scope", "Research latest developments in quantum computing.", 0.9) == "answer"
+    assert cache.lookup("scope", "Compare LLM providers", 0.9) is None
+    assert cache.lookup("other scope", "Research the latest developments in quantum computing", 0.9) is None
+    
+    stats = cache.stats()
+    assert stats["saved_calls"] == 1
+    assert stats["misses"] == 2
+
+def test_semantic_cache_is_bounded():
+    """Test that the least recently used entry is overwritten when full."""
+    cache = SemanticCache(max_entries=2)
+    cache.add("scope", "first prompt about agents", "1")
+    cache.add("scope", "second prompt about graphs", "2")
+    cache.lookup("scope", "first prompt about agents", 0.99)
+    cache.add("scope", "third prompt about caches", "3")
+    
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["evictions"] == 1
+    assert cache.lookup("scope", "second prompt about graphs", 0.99) is None
+    assert cache.lookup("scope", "first prompt about agents", 0.99) == "1"
+
+def test_agent_semantic_tier(monkeypatch, fake_llm):
+    """Test that a paraphrased task reuses the cached answer for the same template."""
+    cache = SemanticCache(max_entries=8)
+    monkeypatch.setattr("agents.base.get_semantic_cache", lambda: cache)
+    monkeypatch.setattr(
+        "llm.clients.ChatGroq",
+        lambda **kwargs: FakeListChatModel(responses=["first", "second"])
+    )
+    
+    agent = WriterAgent()
+    agent.use_cache = False
+    agent.semantic_threshold = 0.9
+    
+    template = "Write a report.\nTask: {}\nBe concise."
+    task = "Research the latest developments in quantum computing"
+    paraphrase = "Research latest developments in quantum computing."
+    
+    assert agent.invoke(template.format(task), semantic_text=task) == "first"
+    assert agent.invoke(template.format(paraphrase), semantic_text=paraphrase) == "first"
+    assert agent.invoke("Another template: " + task, semantic_text=task) == "second"
+
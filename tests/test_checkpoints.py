@@ -0,0 +1,121 @@
+"""
+Test durable checkpoints and resuming failed runs
+"""
+import sqlite3
+import pytest
+from agents.research_agents import DataCollectorAgent, ResearchAgent
+from agents.writing_agents import WriterAgent
+from workflows.checkpoints import CompressedSerializer, clear_checkpoints, get_checkpointer, get_run_store
+from workflows.registry import finish_run, resume_run, start_run
+
+def _count_calls(monkeypatch, cls, counts):
+    original = cls.execute
+    
+    def execute(self, state, **kwargs):
+        counts[cls.__name__] = counts.get(cls.__name__, 0) + 1
+        return original(self, state, **kwargs)
+    
+    monkeypatch.setattr(cls, "execute", execute)
+
+def test_serializer_compresses_large_payloads():
+    """Test that large states are compressed and both sizes round-trip."""
+    serde = CompressedSerializer(min_size=1024)
+    state = {"articles": [{"title": "Agents", "summary": "An article about agents. " * 20}] * 20}
+    
+    type_, data = serde.dumps_typed(state)
+    assert type_.endswith("+zlib")
+    assert len(data) < len(CompressedSerializer(min_size=10 ** 9).dumps_typed(state)[1]) / 5
+    assert serde.loads_typed((type_, data)) == state
+    
+    small = {"status": "started"}
+    type_, data = serde.dumps_typed(small)
+    assert not type_.endswith("+zlib")
+    assert serde.loads_typed((type_, data)) == small
+
+def test_failed_writer_resumes_without_rerunning_research(fake_llm, monkeypatch):
+    """Test that a run whose writer failed resumes at the writer."""
+    counts = {}
+    _count_calls(monkeypatch, ResearchAgent, counts)
+    failures = []
+    original_prompt = WriterAgent._build_prompt
+    
+    def flaky_prompt(self, state):
+        if not failures:
+            failures.append(1)
+            raise RuntimeError("Writer crashed")
+        return original_prompt(self, state)
+    
+    monkeypatch.setattr(WriterAgent, "_build_prompt", flaky_prompt)
+    
+    graph, inputs, config = start_run("multi", "Research AI agents")
+    state = graph.invoke(inputs, config)
+    assert finish_run(config, state) == "failed"
+    run_id = config["configurable"]["thread_id"]
+    assert get_run_store().get(run_id)["status"] == "failed"
+    
+    graph, inputs, config = resume_run(run_id)
+    assert inputs is None
+    state = graph.invoke(inputs, config)
+    
+    assert state["final_report"].startswith("Fake model response")
+    assert state["errors"] == []
+    assert counts["ResearchAgent"] == 1
+    assert finish_run(config, state) == "completed"
+    # Completed runs don't keep their checkpoints
+    assert not graph.get_state({"configurable": {"thread_id": run_id}}).values
+
+def test_interrupted_run_continues_from_last_checkpoint(fake_llm, monkeypatch):
+    """Test that a run that raised mid-graph continues at the step that raised."""
+    counts = {}
+    _count_calls(monkeypatch, ResearchAgent, counts)
+    original = DataCollectorAgent.execute
+    
+    def crash(self, state):
+        raise RuntimeError("Process died")
+    
+    monkeypatch.setattr(DataCollectorAgent, "execute", crash)
+    graph, inputs, config = start_run("multi", "Research RAG systems", include_sentiment=False)
+    with pytest.raises(RuntimeError):
+        graph.invoke(inputs, config)
+    finish_run(config, error="Process died")
+    
+    monkeypatch.setattr(DataCollectorAgent, "execute", original)
+    graph, inputs, config = resume_run(config["configurable"]["thread_id"])
+    state = graph.invoke(inputs, config)
+    
+    assert state["status"] == "complete"
+    assert counts["ResearchAgent"] == 1
+
+def test_completed_runs_cannot_be_resumed(fake_llm):
+    """Test that resuming a finished run is rejected."""
+    graph, inputs, config = start_run("multi", "Research AI agents", include_sentiment=False)
+    finish_run(config, graph.invoke(inputs, config))
+    
+    with pytest.raises(ValueError):
+        resume_run(config["configurable"]["thread_id"])
+
+def test_running_runs_need_force_to_resume(fake_llm):
+    """Test that a run still marked running is only resumed when forced."""
+    graph, inputs, config = start_run("multi", "Research AI agents", include_sentiment=False)
+    run_id = config["configurable"]["thread_id"]
+    graph.invoke(inputs, config)
+    assert get_run_store().get(run_id)["status"] == "running"
+    
+    with pytest.raises(ValueError, match="still running"):
+        resume_run(run_id)
+    # Its checkpoints were left alone
+    assert graph.get_state(config).values
+    
+    graph, inputs, config = resume_run(run_id, force=True)
+    assert get_run_store().get(run_id)["status"] == "running"
+
+def test_clear_checkpoints_closes_connections(fake_llm):
+    """Test that clearing the singletons closes their SQLite connections."""
+    checkpointer, store = get_checkpointer(), get_run_store()
+    clear_checkpoints()
+    
+    for conn in (checkpointer.conn, store._conn):
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+    assert get_run_store() is not store
+
@@ -0,0 +1,68 @@
+"""
+Test near-duplicate article detection
+"""
+from agents.research_agents import DataCollectorAgent
+from config.settings import settings
+from tools.dedup import NearDuplicateIndex, dedup_articles, simhash
+from tools.search_tools import _build_articles
+from utils.blobs import resolve_json, resolve_text
+
+ORIGINAL = {
+    "title": "OpenAI ships a new agent platform",
+    "url": "https://example.com/a",
+    "summary": "OpenAI released an agent platform for building multi-step workflows with tool use and memory, aimed at enterprise teams.",
+    "source": "Tech Blog"
+}
+COPY = {
+    **ORIGINAL,
+    "url": "https://example.com/b",
+    "summary": "OpenAI released an agent platform for building multi-step workflows with tool use and memory, aimed at enterprise teams!",
+    "source": "Engineering Digest"
+}
+
+def _distance(a: str, b: str) -> int:
+    return bin(simhash(a) ^ simhash(b)).count("1")
+
+def test_simhash_separates_near_and_distinct_texts():
+    """Test that copies are a few bits apart and different articles are not."""
+    first, second = _build_articles("RAG Systems")[:2]
+    
+    assert _distance(ORIGINAL["summary"], COPY["summary"]) <= 6
+    assert _distance(first["summary"], second["summary"]) > 6
+
+def test_dedup_keeps_best_source_and_counts_tokens(tmp_path, monkeypatch):
+    """Test that near-duplicates across topics collapse to the preferred source."""
+    monkeypatch.setattr(settings, "dedup_source_priority", "Engineering Digest")
+    index = NearDuplicateIndex(tmp_path / "dedup.sqlite")
+    other = _build_articles("RAG Systems")[0]
+    
+    kept, stats = dedup_articles({"Agents": [ORIGINAL, other], "OpenAI": [COPY]}, index)
+    
+    assert kept == {"Agents": [other], "OpenAI": [COPY]}
+    assert stats["duplicates"] == 1
+    assert stats["tokens_removed"] > 10
+
+def test_index_persists_clusters_across_runs(tmp_path):
+    """Test that a reopened index puts a later copy in the earlier article's cluster."""
+    path = tmp_path / "dedup.sqlite"
+    first = NearDuplicateIndex(path)
+    cluster = first.cluster(ORIGINAL)
+    first.close()
+    
+    second = NearDuplicateIndex(path)
+    assert second.cluster(ORIGINAL) == cluster
+    assert second.cluster(COPY) == cluster
+    assert second.cluster(_build_articles("RAG Systems")[0]) != cluster
+
+def test_collector_reports_removed_duplicates(fake_llm, monkeypatch):
+    """Test that the collector drops copies returned for overlapping topics."""
+    monkeypatch.setattr(
+        DataCollectorAgent, "_search_topic",
+        lambda self, topic: [ORIGINAL] if topic == "AI" else [COPY, *_build_articles(topic)[:1]]
+    )
+    result = DataCollectorAgent().execute({"trending_topics": ["AI", "OpenAI"]})
+    
+    assert len(resolve_json(result["articles"])) == 2
+    assert result["dedup_stats"]["duplicates"] == 1
+    assert resolve_text(result["research_notes"]).count("OpenAI ships a new agent platform") == 1
+
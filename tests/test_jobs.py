@@ -0,0 +1,85 @@
+"""
+Test the background job executor
+"""
+import threading
+import time
+import pytest
+from agents.research_agents import ResearchAgent
+from agents.writing_agents import WriterAgent
+from workflows.jobs import JobExecutor, get_job_executor
+
+def test_job_records_nodes_tokens_and_final_state(fake_llm):
+    """Test that a submitted run reports each node, the streamed report and its state."""
+    executor = get_job_executor()
+    job_id = executor.submit("multi", "Research AI agents", include_sentiment=False)
+    job = executor.wait(job_id, timeout=60)
+    
+    assert job["status"] == "completed"
+    assert [entry["node"] for entry in job["nodes"]] == ["research", "collect", "analyze", "write"]
+    assert job["report_preview"].startswith("Fake model response")
+    assert job["state"]["final_report"].startswith("Fake model response")
+    assert job["run_id"] and job["error"] is None
+
+def test_failed_job_can_be_resumed(fake_llm, monkeypatch):
+    """Test that agent errors fail the job and a resume job finishes the run."""
+    failures = []
+    original_prompt = WriterAgent._build_prompt
+    
+    def flaky_prompt(self, state):
+        if not failures:
+            failures.append(1)
+            raise RuntimeError("Writer crashed")
+        return original_prompt(self, state)
+    
+    monkeypatch.setattr(WriterAgent, "_build_prompt", flaky_prompt)
+    executor = get_job_executor()
+    failed = executor.wait(executor.submit("multi", "Research AI agents"), timeout=60)
+    assert failed["status"] == "failed" and "Writer crashed" in failed["error"]
+    
+    resumed = executor.wait(executor.submit("multi", failed["task"], resume_id=failed["run_id"]), timeout=60)
+    assert resumed["status"] == "completed"
+    assert resumed["run_id"] == failed["run_id"]
+    assert [entry["node"] for entry in resumed["nodes"]] == ["write"]
+
+def test_executor_keeps_newest_finished_jobs(fake_llm):
+    """Test that jobs run side by side and only max_jobs finished ones are kept."""
+    executor = JobExecutor(max_workers=3, max_jobs=2)
+    job_ids = [executor.submit("multi", f"Task {i}", include_sentiment=False) for i in range(3)]
+    for job_id in job_ids:
+        executor.wait(job_id, timeout=60)
+    executor.shutdown()
+    
+    kept = executor.list(job_ids)
+    assert len(kept) == 2
+    assert all(job["status"] == "completed" for job in kept)
+    assert executor.get("unknown") is None
+
+def test_executor_refuses_a_second_job_for_a_live_run(fake_llm, monkeypatch):
+    """Test that a run owned by an unfinished job cannot be resumed by another."""
+    release = threading.Event()
+    original = ResearchAgent.execute
+    
+    def blocked(self, state):
+        release.wait(timeout=30)
+        return original(self, state)
+    
+    monkeypatch.setattr(ResearchAgent, "execute", blocked)
+    executor = JobExecutor(max_workers=2)
+    try:
+        job_id = executor.submit("multi", "Research AI agents", include_sentiment=False)
+        deadline = time.time() + 10
+        while not executor.get(job_id)["run_id"] and time.time() < deadline:
+            time.sleep(0.01)
+        run_id = executor.get(job_id)["run_id"]
+        
+        assert executor.active_run_ids() == {run_id}
+        with pytest.raises(ValueError, match="already being executed"):
+            executor.submit("multi", "Research AI agents", resume_id=run_id, force=True)
+        
+        release.set()
+        assert executor.wait(job_id, timeout=60)["status"] == "completed"
+        assert executor.active_run_ids() == set()
+    finally:
+        release.set()
+        executor.shutdown()
+
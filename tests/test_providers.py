@@ -0,0 +1,120 @@
+"""
+Test the provider pool: circuit breakers, failover and hedging
+"""
+import asyncio
+import threading
+import time
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from agents.research_agents import ResearchAgent
+from config.settings import settings
+from llm import providers
+from llm.clients import clear_chat_models
+from llm.providers import BackendHealth, ProviderPool
+
+PRIMARY = ("groq", "primary-model")
+FALLBACK = ("google", "fallback-model")
+
+def test_circuit_opens_and_recovers():
+    """Test that consecutive failures open the circuit and a successful trial closes it."""
+    health = BackendHealth("test", failure_threshold=3, cooldown=0.05)
+    for _ in range(3):
+        assert health.allow()
+        health.record(0.1, ok=False)
+    
+    assert health.state == "open"
+    assert not health.allow()
+    
+    time.sleep(0.06)
+    assert health.allow()
+    # Only one trial call at a time while half-open
+    assert not health.allow()
+    health.record(0.1, ok=True)
+    assert health.state == "closed"
+
+def test_failover_and_open_circuit_skip():
+    """Test that failures fail over, and an open circuit skips the backend entirely."""
+    pool = ProviderPool([FALLBACK], failure_threshold=2, cooldown=60)
+    calls = []
+    
+    def func(provider, model):
+        calls.append(provider)
+        if provider == "groq":
+            raise RuntimeError("Groq is down")
+        return "answer"
+    
+    for _ in range(2):
+        assert pool.call(PRIMARY, func) == (FALLBACK, "answer")
+    assert calls == ["groq", "google", "groq", "google"]
+    
+    calls.clear()
+    assert pool.call(PRIMARY, func) == (FALLBACK, "answer")
+    assert calls == ["google"]
+    assert pool.stats()["failovers"] == 2
+    assert pool.stats()["backends"]["groq:primary-model"]["state"] == "open"
+
+def test_hedged_call_takes_the_faster_backend():
+    """Test that a slow primary is hedged after the delay and the fallback wins."""
+    pool = ProviderPool([FALLBACK], hedge=True, hedge_delay=0.05)
+    primary_done = threading.Event()
+    
+    def func(provider, model):
+        if provider == "groq":
+            time.sleep(0.5)
+            primary_done.set()
+        return provider
+    
+    backend, result = pool.call(PRIMARY, func)
+    
+    # The call returned with the fallback's answer before the primary finished
+    assert (backend, result) == (FALLBACK, "google")
+    assert not primary_done.is_set()
+    assert pool.stats()["hedges"] == 1
+    assert pool.stats()["hedge_wins"] == 1
+
+def test_async_hedge_cancels_the_loser():
+    """Test async hedging: the first answer wins and the slower call is cancelled."""
+    pool = ProviderPool([FALLBACK], hedge=True, hedge_delay=0.05)
+    cancelled = []
+    
+    async def func(provider, model):
+        try:
+            await asyncio.sleep(0.5 if provider == "groq" else 0.01)
+        except asyncio.CancelledError:
+            cancelled.append(provider)
+            raise
+        return provider
+    
+    backend, result = asyncio.run(pool.acall(PRIMARY, func))
+    
+    assert backend == FALLBACK
+    assert cancelled == ["groq"]
+    # A cancelled hedge isn't counted against the backend
+    assert pool.stats()["backends"]["groq:primary-model"]["calls"] == 0
+
+def test_fast_primary_is_not_hedged():
+    """Test that no duplicate is sent when the primary answers within the delay."""
+    pool = ProviderPool([FALLBACK], hedge=True, hedge_delay=0.5)
+    backend, _ = pool.call(PRIMARY, lambda provider, model: provider)
+    
+    assert backend == PRIMARY
+    assert pool.stats()["hedges"] == 0
+
+def test_agent_fails_over_to_fallback_model(fake_llm, monkeypatch):
+    """Test that an agent whose model errors is served by a fallback backend."""
+    class BrokenModel:
+        def invoke(self, prompt):
+            raise RuntimeError("Service unavailable")
+    
+    def factory(**kwargs):
+        if kwargs["model"] == settings.cheap_model:
+            return BrokenModel()
+        return FakeListChatModel(responses=["Fallback response"])
+    
+    clear_chat_models()
+    monkeypatch.setattr("llm.clients.ChatGroq", factory)
+    monkeypatch.setattr(providers, "_pool", ProviderPool([("groq", settings.default_model)]))
+    
+    agent = ResearchAgent()
+    assert agent.invoke("Summarize these topics briefly.") == "Fallback response"
+    assert agent.last_model == settings.default_model
+
@@ -0,0 +1,127 @@
+"""
+Test the adaptive client-side rate limiter
+"""
+import asyncio
+import pytest
+from agents.research_agents import ResearchAgent
+from config.settings import settings
+from llm.rate_limit import (
+    RateLimiter,
+    SharedTokenBucket,
+    TokenBucket,
+    clear_rate_limiters,
+    parse_duration,
+    rate_limit_stats
+)
+
+class FakeRateLimitError(Exception):
+    status_code = 429
+    
+    def __init__(self, retry_after: str = "0"):
+        super().__init__("Too many requests")
+        self.response = type("Response", (), {"headers": {"retry-after": retry_after}, "extensions": {}})()
+
+def test_parse_duration():
+    """Test the duration formats used in rate-limit headers."""
+    assert parse_duration("7.66s") == pytest.approx(7.66)
+    assert parse_duration("2m59.56s") == pytest.approx(179.56)
+    assert parse_duration("120ms") == pytest.approx(0.12)
+    assert parse_duration("3") == 3.0
+    assert parse_duration(None) is None
+
+def test_token_bucket_queues_reservations():
+    """Test that reservations beyond the level wait for the refill."""
+    bucket = TokenBucket(rate=10, capacity=5)
+    
+    assert bucket.reserve(5) == 0.0
+    assert bucket.reserve(5) == pytest.approx(0.5, abs=0.05)
+    assert bucket.reserve(1) == pytest.approx(0.6, abs=0.05)
+
+def test_shared_bucket_state_is_shared(tmp_path):
+    """Test that two buckets on the same file draw from one budget."""
+    path = tmp_path / "limits.sqlite"
+    first = SharedTokenBucket(rate=1, capacity=10, path=path, name="model:tokens")
+    second = SharedTokenBucket(rate=1, capacity=10, path=path, name="model:tokens")
+    
+    assert first.reserve(10) == 0.0
+    assert second.reserve(5) > 4.0
+
+def test_aimd_concurrency():
+    """Test that a 429 halves the concurrency limit and successes grow it back."""
+    limiter = RateLimiter("test", 1000, 100000, max_concurrency=8)
+    
+    limiter.on_rate_limited(0)
+    assert limiter.concurrency_limit == 4
+    # Failures within the same window count as one congestion event
+    limiter.on_rate_limited(0)
+    assert limiter.concurrency_limit == 4
+    
+    # Roughly +1 per round of `limit` successes
+    for _ in range(5):
+        limiter.on_success()
+    assert limiter.concurrency_limit == 5
+    assert limiter.stats()["rate_limited"] == 2
+
+def test_observe_headers():
+    """Test that provider headers update the token budget and pause on an exhausted quota."""
+    limiter = RateLimiter("test", 30, 6000)
+    limiter.observe({
+        "x-ratelimit-limit-tokens": "12000",
+        "x-ratelimit-remaining-tokens": "100",
+        "x-ratelimit-remaining-requests": "0",
+        "x-ratelimit-reset-requests": "2s"
+    })
+    
+    assert limiter.tokens.capacity == 12000
+    assert limiter.tokens.level() < 200
+    assert limiter.requests.reserve(1) > 1.5
+
+def test_call_retries_after_rate_limit():
+    """Test that a 429 is retried and shrinks the concurrency limit."""
+    limiter = RateLimiter("test", 1000, 100000, max_concurrency=4)
+    attempts = []
+    
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise FakeRateLimitError()
+        return "ok"
+    
+    assert limiter.call(flaky, tokens=10) == "ok"
+    assert len(attempts) == 2
+    assert limiter.concurrency_limit == 2
+    
+    with pytest.raises(FakeRateLimitError):
+        limiter.call(lambda: (_ for _ in ()).throw(FakeRateLimitError()), tokens=10, retries=0)
+
+def test_async_slots_respect_concurrency_limit():
+    """Test that no more calls run at once than the concurrency limit."""
+    limiter = RateLimiter("test", 1000, 100000, max_concurrency=2)
+    running, peak = 0, 0
+    
+    async def work():
+        nonlocal running, peak
+        async with limiter.aslot(1):
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+    
+    async def main():
+        await asyncio.gather(*(work() for _ in range(6)))
+    
+    asyncio.run(main())
+    assert peak == 2
+
+def test_agents_share_the_model_limiter(fake_llm, monkeypatch):
+    """Test that agent model calls go through the shared per-model limiter."""
+    monkeypatch.setattr(settings, "rate_limit_enabled", True)
+    clear_rate_limiters()
+    
+    ResearchAgent().invoke("Summarize these topics briefly.")
+    ResearchAgent().invoke("Summarize these other topics briefly.")
+    
+    stats = rate_limit_stats()
+    assert stats[f"groq:{settings.cheap_model}"]["calls"] == 2
+    clear_rate_limiters()
+
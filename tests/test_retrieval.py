@@ -0,0 +1,75 @@
+"""
+Test retrieval of task-relevant articles
+"""
+from agents.research_agents import DETAILED_DATA_HEADER, format_article, retrieve_details
+from agents.writing_agents import WriterAgent
+from config.settings import settings
+from tools.retrieval import PassageIndex, TfidfVectorizer, get_passage_index
+from tools.search_tools import _build_articles
+
+PASSAGES = [
+    "Vector databases add hybrid search for retrieval augmented generation.",
+    "Chip makers report record demand for AI accelerators and GPUs.",
+    "New agent frameworks coordinate tools, memory and planning.",
+    "Quantum computing startups raise funding for error correction."
+]
+
+def _state(n_topics: int) -> dict:
+    articles = [a for i in range(n_topics) for a in _build_articles(f"Topic {i}")]
+    details = "\n\n".join(format_article(article) for article in articles)
+    return {
+        "current_task": "Summarize Topic 3 developments",
+        "research_notes": f"## Trending Topics\n...\n\n{DETAILED_DATA_HEADER}\n\n{details}",
+        "articles": articles,
+        "analysis_results": "Analysis"
+    }
+
+def test_vectorizer_shares_the_hashing_features():
+    """Test that passages are hashed like utils.vectorize, minus stopwords."""
+    vectorizer = TfidfVectorizer(dim=512)
+    vectors = vectorizer.fit(PASSAGES)
+    
+    assert vectors.shape == (len(PASSAGES), 512)
+    assert vectorizer.hashing.features("the GPU and the chips") == ["gpu", "chips", "gpu chips"]
+    assert not vectorizer.transform(["the and of"]).any()
+
+def test_search_ranks_relevant_passages_first():
+    """Test that a batch of queries is answered with the matching passages."""
+    index = PassageIndex(PASSAGES, dim=512)
+    results = index.search(["GPU accelerators demand", "agent frameworks with memory"], k=2)
+    
+    assert [hits[0][0] for hits in results] == [1, 2]
+    assert all(len(hits) == 2 and hits[0][1] >= hits[1][1] for hits in results)
+
+def test_select_covers_every_query_in_passage_order():
+    """Test that selection takes the best passage of each query and keeps passage order."""
+    index = PassageIndex(PASSAGES, dim=512)
+    
+    assert index.select(["quantum error correction", "vector database search"], k=2) == [0, 3]
+    assert index.select(["anything"], k=10) == [0, 1, 2, 3]
+
+def test_index_is_reused_for_same_passages():
+    """Test that the Analyst and the Writer of a run share one index."""
+    assert get_passage_index(PASSAGES, 512) is get_passage_index(list(PASSAGES), 512)
+    assert get_passage_index(PASSAGES, 512) is not get_passage_index(PASSAGES[:3], 512)
+
+def test_retrieve_details_keeps_small_sets_and_can_be_disabled(monkeypatch):
+    """Test that details pass through unchanged when there is nothing to narrow."""
+    state = _state(2)
+    details = state["research_notes"][state["research_notes"].index("\n\n" + DETAILED_DATA_HEADER):]
+    assert retrieve_details(state, details, ["trends"]) == details
+    
+    state = _state(5)
+    monkeypatch.setattr(settings, "retrieval_enabled", False)
+    assert retrieve_details(state, "details", ["trends"]) == "details"
+
+def test_writer_prompt_stays_flat_as_articles_grow(fake_llm):
+    """Test that the Writer's prompt barely grows from 30 to 300 articles."""
+    writer = WriterAgent()
+    small = writer._build_prompt(_state(10))
+    large = writer._build_prompt(_state(100))
+    
+    assert len(large) < len(small) * 1.2
+    assert large.count("Source:") == settings.retrieval_top_k
+    assert "Topic 3" in large
+
@@ -0,0 +1,51 @@
+"""
+Test stage-aware model routing and cascades
+"""
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from agents.research_agents import ResearchAgent
+from agents.writing_agents import EditorAgent
+from config.settings import settings
+from llm.clients import clear_chat_models
+from llm.routing import ModelRouter, get_router, load_rules
+
+def test_router_matches_rules_in_order():
+    """Test that the first matching rule wins and unmatched calls fall back."""
+    router = ModelRouter(
+        load_rules('[{"agents": ["Editor"], "model": "big"}, {"max_output_tokens": 300, "model": "cheap"}]'),
+        aliases={"cheap": "small-model"}
+    )
+    
+    assert router.route("Editor", 100, fallback="default", expected_output_tokens=50) == "big"
+    assert router.route("Researcher", 100, fallback="default", expected_output_tokens=150) == "small-model"
+    assert router.route("Writer", 100, fallback="default", expected_output_tokens=1200) == "default"
+    assert router.route("Writer", 100, fallback="default") == "default"
+
+def test_researcher_is_served_by_cheap_model(fake_llm):
+    """Test that the short research overview runs on the cheap model."""
+    agent = ResearchAgent()
+    agent.invoke("Summarize these topics briefly.")
+    
+    assert agent.model_name == settings.default_model
+    assert agent.last_model == settings.cheap_model
+
+def test_cascade_escalates_on_failed_validation(monkeypatch):
+    """Test that a rejected cheap-model answer is retried on the agent's model."""
+    def factory(**kwargs):
+        if kwargs["model"] == settings.cheap_model:
+            return FakeListChatModel(responses=["I'm sorry, I can't help with that."])
+        return FakeListChatModel(responses=["# Report\n\nA properly edited report."])
+    
+    clear_chat_models()
+    monkeypatch.setattr("llm.clients.ChatGroq", factory)
+    get_router().reset_stats()
+    try:
+        agent = EditorAgent()
+        result = agent.execute({"final_report": "# Report\n\nDraft."})
+        
+        assert agent.cascade
+        assert result["final_report"] == "# Report\n\nA properly edited report."
+        assert agent.last_model == settings.default_model
+        assert get_router().stats()["escalations"] == 1
+    finally:
+        clear_chat_models()
+
@@ -0,0 +1,67 @@
+"""
+Test token counting and context budgets
+"""
+from agents.research_agents import DETAILED_DATA_HEADER
+from agents.writing_agents import WriterAgent
+from utils import tokens
+from utils.tokens import clear_token_counts, count_tokens, fit_sections, truncate_tokens
+
+def test_count_tokens_is_memoized(monkeypatch):
+    """Test that repeated counts are served from the cache, which keeps only digests."""
+    text = "LangGraph agents coordinate research, analysis and writing."
+    clear_token_counts()
+    calls = []
+    original = tokens._count
+    monkeypatch.setattr(tokens, "_count", lambda t: calls.append(t) or original(t))
+    
+    first = count_tokens(text)
+    second = count_tokens(text)
+    
+    assert first == second > 0
+    assert len(calls) == 1
+    assert all(isinstance(key, bytes) and len(key) == 16 for key in tokens._counts)
+    assert count_tokens("") == 0
+
+def test_truncate_keeps_whole_paragraphs():
+    """Test that truncation drops trailing paragraphs before cutting text."""
+    text = "First paragraph here.\n\nSecond paragraph here.\n\nThird paragraph here."
+    
+    trimmed = truncate_tokens(text, count_tokens("First paragraph here.\n\nSecond paragraph here."))
+    
+    assert trimmed == "First paragraph here.\n\nSecond paragraph here."
+    assert count_tokens(truncate_tokens(text, 2)) <= 2
+
+def test_fit_sections_trims_in_priority_order():
+    """Test that low-priority sections are trimmed first and only as needed."""
+    sections = {
+        "task": "Research AI agents",
+        "analysis": "Insight one.\n\nInsight two.",
+        "articles": "\n\n".join(f"Article {i} summary text." for i in range(20))
+    }
+    budget = count_tokens(sections["task"]) + count_tokens(sections["analysis"]) + 10
+    
+    fitted, saved = fit_sections(sections, ("articles", "analysis", "task"), budget)
+    
+    assert fitted["task"] == sections["task"]
+    assert fitted["analysis"] == sections["analysis"]
+    assert fitted["articles"].startswith("Article 0")
+    assert saved > 0
+    assert sum(count_tokens(t) for t in fitted.values()) <= budget
+
+def test_writer_prompt_fits_context_budget(fake_llm):
+    """Test that the writer trims article details to its budget."""
+    articles = "\n\n".join(f"**Article {i}**\nA long summary of development {i}." for i in range(200))
+    state = {
+        "research_notes": f"## Trending Topics\n\nOverview\n\n{DETAILED_DATA_HEADER}\n\n{articles}",
+        "analysis_results": "Key insight"
+    }
+    agent = WriterAgent()
+    untrimmed = agent._build_prompt(state)
+    
+    agent.context_budget = 500
+    prompt = agent._build_prompt(state)
+    
+    assert count_tokens(prompt) <= 500 < count_tokens(untrimmed)
+    assert "Overview" in prompt and "Key insight" in prompt
+    assert "Article 199" not in prompt
+
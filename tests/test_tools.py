@@ -0,0 +1,309 @@
+"""
+Unit tests for tools
+"""
+import asyncio
+import httpx
+import numpy as np
+import pandas as pd
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from tools.cache import ToolCache
+from tools.data_tools import process_data
+from tools.patterns import HeavyHitters, PatternEngine
+from tools import search_tools
+from tools.search_tools import _build_articles
+from tools.summarize import TextRankSummarizer, _truncate, split_sentences
+from tools.sentiment import SentimentEngine, load_lexicon
+
+@pytest.fixture
+def counted_tool():
+    """Build a cached sync/async tool pair that counts backend calls."""
+    cache = ToolCache(ttls={"lookup": 60})
+    calls = []
+    
+    @cache.cached("lookup")
+    def lookup(topic: str, max_results: int = 3):
+        calls.append(topic)
+        time.sleep(0.2)
+        return [f"{topic}-{i}" for i in range(max_results)]
+    
+    @cache.acached("lookup")
+    async def alookup(topic: str, max_results: int = 3):
+        calls.append(topic)
+        await asyncio.sleep(0.2)
+        return [f"{topic}-{i}" for i in range(max_results)]
+    
+    return cache, lookup, alookup, calls
+
+def test_tool_cache_coalesces_threads(counted_tool):
+    """Test that simultaneous callers share one backend call."""
+    cache, lookup, _, calls = counted_tool
+    
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: lookup("AI", max_results=2), range(8)))
+    
+    assert calls == ["AI"]
+    assert all(result == ["AI-0", "AI-1"] for result in results)
+    assert cache.stats()["backend_calls_saved"] == 7
+
+@pytest.mark.asyncio
+async def test_tool_cache_coalesces_coroutines(counted_tool):
+    """Test that coroutines and defaults normalize to the same key."""
+    cache, lookup, alookup, calls = counted_tool
+    
+    results = await asyncio.gather(alookup("ML"), alookup("ML", 3), alookup(topic="ML", max_results=3))
+    
+    assert calls == ["ML"]
+    assert results[0] == results[1] == results[2]
+    assert lookup("ML") == results[0]  # sync callers reuse the async result
+    assert calls == ["ML"]
+
+def test_tool_cache_ttl_and_invalidation(counted_tool):
+    """Test TTL expiry and explicit invalidation."""
+    cache, lookup, _, calls = counted_tool
+    
+    lookup("AI")
+    lookup("AI")
+    assert calls == ["AI"]
+    
+    assert cache.invalidate("lookup", topic="AI") == 1
+    lookup("AI")
+    assert calls == ["AI", "AI"]
+    
+    cache.ttls["lookup"] = 0
+    cache.invalidate()
+    lookup("AI")
+    lookup("AI")
+    assert calls == ["AI", "AI", "AI", "AI"]
+
+def test_tool_cache_warm(counted_tool):
+    """Test that warming pre-populates entries."""
+    cache, lookup, _, calls = counted_tool
+    
+    assert cache.warm("lookup", [{"topic": "AI"}, {"topic": "ML"}]) == 2
+    assert cache.warm("lookup", [{"topic": "AI"}]) == 0
+    
+    lookup("AI")
+    lookup("ML", max_results=3)
+    assert calls == ["AI", "ML"]
+
+def test_tool_cache_does_not_cache_errors():
+    """Test that failures propagate to every waiter and aren't stored."""
+    cache = ToolCache(ttls={"flaky": 60})
+    attempts = []
+    
+    @cache.cached("flaky")
+    def flaky():
+        attempts.append(1)
+        raise RuntimeError("backend down")
+    
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            flaky()
+    assert len(attempts) == 2
+
+def test_sentiment_matches_whole_words_and_phrases():
+    """Test that terms match on word boundaries and phrases span whitespace."""
+    engine = SentimentEngine({"good": 1.0, "bad": -2.0, "state of the art": 1.5})
+    
+    assert engine.score("Goodbye, badges.")["sentiment"] == "neutral"
+    result = engine.score("GOOD and state  of\nthe art, but bad")
+    assert (result["positive_signals"], result["negative_signals"]) == (2, 1)
+    assert result["score"] == 55  # 2.5 of 4.5 matched weight
+    assert result["sentiment"] == "mixed"
+
+def test_sentiment_batch_scores_each_document(tmp_path):
+    """Test per-document and aggregate results from a lexicon file."""
+    lexicon = tmp_path / "lexicon.tsv"
+    lexicon.write_text("# comment\ngreat\t2\npoor\t-1\n")
+    engine = SentimentEngine(load_lexicon(lexicon))
+    
+    result = engine.score_batch(["A great release", "Poor docs, poor tests", "Nothing to see"])
+    
+    assert [d["sentiment"] for d in result["documents"]] == ["positive", "negative", "neutral"]
+    assert [d["score"] for d in result["documents"]] == [100, 0, 50]
+    assert result["aggregate"]["score"] == 50
+    assert result["aggregate"]["documents"] == 3
+    assert result["aggregate"]["labels"] == {"negative": 1, "neutral": 1, "positive": 1}
+
+def test_pattern_engine_counts_unigrams_and_bigrams():
+    """Test that stopwords are skipped and bigrams never span one."""
+    engine = PatternEngine().add_all([
+        "Multi-Agent Systems in production",
+        "Scaling multi-agent systems for the enterprise"
+    ])
+    counts = dict(engine.top(20))
+    
+    assert counts["multi agent"] == 2
+    assert counts["agent systems"] == 2
+    assert counts["production"] == 1
+    assert "systems production" not in counts
+    assert not any(word in counts for word in ("in", "the", "for"))
+
+def test_heavy_hitters_bounded_and_mergeable():
+    """Test that frequent items survive a long tail in bounded memory, across shards."""
+    stream = ["agents"] * 300 + ["rag"] * 200 + [f"rare{i}" for i in range(2000)]
+    
+    single = HeavyHitters(capacity=50)
+    for item in stream:
+        single.add(item)
+    shards = [HeavyHitters(capacity=50) for _ in range(4)]
+    for i, item in enumerate(stream):
+        shards[i % 4].add(item)
+    merged = shards[0]
+    for shard in shards[1:]:
+        merged.merge(shard)
+    
+    for summary in (single, merged):
+        assert len(summary.counters) <= 50
+        assert [item for item, _ in summary.top(2)] == ["agents", "rag"]
+        assert 300 - summary.error <= summary.counters["agents"] <= 300
+    assert merged.n == len(stream)
+
+ARTICLE = (
+    "LangGraph 1.0 was released this week with durable execution. "
+    "The release focuses on multi-agent workflows and durable execution for production agents. "
+    "Weather was nice in San Francisco. "
+    "Teams deploying multi-agent workflows report lower latency with durable execution. "
+    "Some people had lunch. "
+    "Checkpointing lets production agents resume after failures."
+)
+
+def test_textrank_keeps_central_sentences_within_length():
+    """Test that off-topic sentences are dropped and the summary fits max_length."""
+    summarizer = TextRankSummarizer()
+    
+    summary = summarizer.summarize(ARTICLE, max_length=200)
+    assert len(summary) <= 200
+    assert summary.startswith("The release focuses on multi-agent workflows")
+    assert "lunch" not in summary and "Weather" not in summary
+    
+    assert summarizer.summarize("Short text.", max_length=200) == "Short text."
+    assert summarizer.summarize("x" * 300, max_length=50) == "x" * 47 + "..."
+
+def test_truncate_never_exceeds_max_length():
+    """Test that truncation adds an ellipsis only when there is room for text."""
+    text = "Agents coordinate tools"
+    
+    assert _truncate(text, 100) == text
+    assert _truncate(text, 10) == "Agents..."
+    assert _truncate(text, 3) == "Age"
+    assert _truncate(text, 0) == ""
+    assert all(len(_truncate(text, n)) <= n for n in range(len(text)))
+
+def test_textrank_batch():
+    """Test that the batch API summarizes each text independently."""
+    summaries = TextRankSummarizer().summarize_batch([ARTICLE, "Short text."], max_length=120)
+    
+    assert len(summaries[0]) <= 120
+    assert summaries[1] == "Short text."
+
+def test_textrank_batch_ranks_like_single_texts():
+    """Test that padded batches (in one or several chunks) score each text on its own."""
+    documents = [split_sentences(ARTICLE), ["Only stopwords here.", "The and of it."], split_sentences(ARTICLE)[:3]]
+    summarizer = TextRankSummarizer()
+    chunked = TextRankSummarizer(max_batch_cells=1)
+    
+    for scores, small_chunks, sentences in zip(summarizer.rank_batch(documents), chunked.rank_batch(documents), documents):
+        assert np.allclose(scores, summarizer.rank_batch([sentences])[0])
+        assert np.allclose(scores, small_chunks)
+        assert np.isclose(scores.sum(), 1.0)
+
+ROWS = [
+    {"title": "Agents in production", "source": "Tech Blog", "date": "2025-11-01", "score": 0.9},
+    {"title": "RAG patterns", "source": "Engineering Digest", "date": "2025-10-28", "score": 0.4},
+    {"title": "Agent costs", "source": "Tech Blog", "date": "2025-10-25", "score": 0.7},
+]
+
+def test_process_data_columnar_operations():
+    """Test filter, sort, group, top-k and projection on article fields."""
+    def run(**kwargs):
+        return process_data.invoke({"data": ROWS, **kwargs})
+    
+    assert [r["title"] for r in run(operation="filter", where="source == 'Tech Blog' and score > 0.8")] == ["Agents in production"]
+    assert [r["date"] for r in run(operation="sort", by="date", ascending=True)] == ["2025-10-25", "2025-10-28", "2025-11-01"]
+    assert [r["score"] for r in run(operation="top_k", by="score", k=2)] == [0.9, 0.7]
+    assert run(operation="project", fields=["title", "missing"])[1] == {"title": "RAG patterns"}
+    
+    groups = run(operation="group", by="source")
+    assert groups[0] == {"source": "Tech Blog", "count": 2, "score_mean": pytest.approx(0.8), "latest": "2025-11-01"}
+    
+    # Default filter still drops records with too little text
+    assert process_data.invoke({"data": [{"t": "short"}, {"t": "x" * 60}]}) == [{"t": "x" * 60}]
+
+def test_process_data_rejects_unknown_fields_and_code():
+    """Test that bad fields and non-comparison filters fail with a clear error."""
+    articles = _build_articles("AI")
+    longest = max(articles, key=lambda a: sum(len(v) for v in a.values()))
+    assert process_data.invoke({"data": articles, "operation": "top_k", "k": 1}) == [longest]
+    
+    for kwargs in (
+        {"operation": "top_k", "by": "score"},
+        {"operation": "sort", "by": "rank"},
+        {"operation": "group", "by": "author"},
+        {"operation": "filter", "where": "score > 0.5"},
+        {"operation": "filter", "where": "source.str.len() > 3"},
+        {"operation": "filter", "where": "__import__('os').getcwd()"}
+    ):
+        with pytest.raises(ValueError):
+            process_data.invoke({"data": articles, **kwargs})
+
+def test_process_data_is_faster_than_a_dataframe_round_trip():
+    """Test that filtering and ranking 100k articles beats converting them through pandas."""
+    rows = [
+        {**article, "score": (i % 997) / 997}
+        for i in range(100_000 // 3 + 1)
+        for article in _build_articles(f"Topic {i % 50}")
+    ]
+    
+    def best_of(func, repeat=3):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            timings.append(time.perf_counter() - start)
+        return min(timings), result
+    
+    # Both sides are measured on this machine, under the same load, and
+    # without LangChain's own argument validation and callbacks
+    baseline, _ = best_of(lambda: pd.DataFrame(rows).query("score > 0.9").to_dict("records"))
+    elapsed, (selected, top) = best_of(lambda: (
+        process_data.func(rows, operation="filter", where="source == 'Tech Blog' and score > 0.9"),
+        process_data.func(rows, operation="top_k", by="score", k=10)
+    ))
+    
+    assert selected and all(r["source"] == "Tech Blog" and r["score"] > 0.9 for r in selected)
+    assert [r["score"] for r in top] == sorted((r["score"] for r in rows), reverse=True)[:10]
+    assert elapsed < baseline
+
+def test_search_goes_through_the_shared_http_pool(monkeypatch):
+    requests = []
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"articles": [
+            {"title": "Pooled", "url": "https://example.com/a", "snippet": "From the backend", "source": "API"}
+        ]})
+    monkeypatch.setattr(search_tools.settings, "search_api_url", "https://search.test/api")
+    monkeypatch.setattr(search_tools, "_http_client", httpx.Client(transport=httpx.MockTransport(handler)))
+    
+    articles = search_tools.search_articles.invoke({"topic": "pool sync topic", "max_results": 1})
+    assert articles == [{"title": "Pooled", "url": "https://example.com/a", "summary": "From the backend", "source": "API", "date": ""}]
+    assert requests[0].url.params["q"] == "pool sync topic"
+    
+    async def run():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        search_tools._async_http_clients[asyncio.get_running_loop()] = client
+        result = await search_tools.search_articles.ainvoke({"topic": "pool async topic", "max_results": 1})
+        assert search_tools.get_async_http_client() is client
+        await search_tools.aclose_http_clients()
+        return result, client
+    
+    articles, client = asyncio.run(run())
+    assert articles[0]["title"] == "Pooled"
+    assert requests[1].url.params["q"] == "pool async topic"
+    assert client.is_closed
+    
+    search_tools.close_http_clients()
+    assert search_tools._http_client is None
+
@@ -0,0 +1,90 @@
+"""
+Test the per-topic memo store and topic reuse across runs
+"""
+from agents.analysis_agents import AnalystAgent, split_topic_analysis
+from agents.research_agents import DataCollectorAgent
+from agents.writing_agents import WriterAgent
+from config.settings import settings
+from tools.search_tools import TRENDING_TOPICS, _build_articles
+from tools.topic_memo import TopicMemo, get_topic_memo
+from utils.blobs import resolve_json
+
+TOPICS = TRENDING_TOPICS[:3]
+
+def _state(topic_articles):
+    return {"topic_articles": topic_articles, "trending_topics": list(topic_articles)}
+
+def test_lookup_matches_on_article_fingerprint(tmp_path):
+    """Test that a topic only hits while its articles are unchanged."""
+    memo = TopicMemo(tmp_path / "memo.sqlite")
+    articles = _build_articles("RAG")
+    memo.put("RAG", TopicMemo.fingerprint(articles), articles, "Summary.", "- Insight")
+    
+    # Article order doesn't matter
+    assert memo.lookup("RAG", TopicMemo.fingerprint(articles[::-1]))["summary"] == "Summary."
+    assert memo.lookup("RAG", TopicMemo.fingerprint(articles[:2])) is None
+    assert memo.lookup("Agents", TopicMemo.fingerprint(articles)) is None
+    assert memo.stats()["changed"] == 1
+    assert memo.stats()["hits"] == 1
+
+def test_split_topic_analysis():
+    """Test that summary and insights are split on the model's headings."""
+    assert split_topic_analysis("**Summary:** It grew.\n\n**Insights:**\n- Adoption") == ("It grew.", "- Adoption")
+    assert split_topic_analysis("No headings here.") == ("No headings here.", "")
+
+def test_analyst_recomputes_only_changed_topics(fake_llm, monkeypatch):
+    """Test that unchanged topics reuse their sections and the report says so."""
+    prompts = []
+    original = AnalystAgent.invoke
+    
+    def invoke(self, prompt, semantic_text=None):
+        prompts.append(prompt)
+        return original(self, prompt, semantic_text)
+    
+    monkeypatch.setattr(AnalystAgent, "invoke", invoke)
+    monkeypatch.setattr(settings, "topic_memo_enabled", True)
+    topic_articles = {topic: _build_articles(topic)[:2] for topic in TOPICS}
+    
+    # One call per topic, then one synthesis over the sections
+    first = AnalystAgent().execute(_state(topic_articles))
+    assert len(prompts) == 4
+    assert set(first["topic_sections"].values()) == {"recomputed"}
+    assert "Key Insights" in prompts[-1] and all(topic in prompts[-1] for topic in TOPICS)
+    
+    # One topic picks up a new article
+    topic_articles[TOPICS[1]] = _build_articles(TOPICS[1])
+    second = AnalystAgent().execute(_state(topic_articles))
+    
+    assert len(prompts) == 6
+    assert TOPICS[1] in prompts[-2] and TOPICS[0] not in prompts[-2]
+    assert second["topic_sections"] == {
+        TOPICS[0]: "reused",
+        TOPICS[1]: "recomputed",
+        TOPICS[2]: "reused"
+    }
+    assert second["analysis_results"] == first["analysis_results"]
+    
+    report = WriterAgent().execute({**_state(topic_articles), **second})["final_report"]
+    assert "2 reused, 1 recomputed" in report
+    assert f"- {TOPICS[1]}: recomputed" in report
+
+def test_collector_falls_back_to_stored_articles(fake_llm, monkeypatch):
+    """Test that a failed search reuses the topic's memoized articles."""
+    monkeypatch.setattr(settings, "topic_memo_enabled", True)
+    stored = _build_articles(TOPICS[0])
+    get_topic_memo().put(TOPICS[0], TopicMemo.fingerprint(stored), stored, "Summary.", "")
+    original = DataCollectorAgent._search_topic
+    
+    def search(self, topic):
+        if topic in TOPICS[:2]:
+            raise RuntimeError("Search API down")
+        return original(self, topic)
+    
+    monkeypatch.setattr(DataCollectorAgent, "_search_topic", search)
+    result = DataCollectorAgent().execute({"trending_topics": TOPICS})
+    
+    topic_articles = resolve_json(result["topic_articles"])
+    assert list(topic_articles) == [TOPICS[0], TOPICS[2]]
+    assert topic_articles[TOPICS[0]] == stored
+    assert len(resolve_json(result["articles"])) == 5
+
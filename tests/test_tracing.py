@@ -0,0 +1,73 @@
+"""
+Test tracing spans and metrics export
+"""
+import json
+import pytest
+from utils.tracing import NOOP_SPAN, Tracer, traced, tracer
+from workflows.multi_agent import create_multi_agent_system
+
+@pytest.fixture
+def trace_file(tmp_path, monkeypatch):
+    """Enable the process-wide tracer, writing to a temporary file."""
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(tracer, "enabled", True)
+    monkeypatch.setattr(tracer, "trace_path", path)
+    monkeypatch.setattr(tracer, "metrics_path", tmp_path / "metrics.prom")
+    tracer.metrics.clear()
+    yield path
+    tracer.close()
+    tracer.metrics.clear()
+
+def _read_spans(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+def test_disabled_tracer_is_noop():
+    """Test that a disabled tracer records nothing."""
+    disabled = Tracer(enabled=False)
+    with disabled.span("llm", "Agent") as span:
+        span.set(prompt_chars=10)
+    
+    assert span is NOOP_SPAN
+    assert disabled.metrics.snapshot() == {}
+
+def test_spans_nest_and_record_errors(trace_file):
+    """Test parent links, error capture and the Prometheus rendering."""
+    @traced("tool")
+    def failing_tool():
+        raise RuntimeError("backend down")
+    
+    with tracer.span("workflow", "multi") as root:
+        with pytest.raises(RuntimeError):
+            failing_tool()
+    tracer.flush()
+    
+    tool_span, root_span = _read_spans(trace_file)
+    assert tool_span["parent_id"] == root.span_id
+    assert tool_span["trace_id"] == root_span["trace_id"]
+    assert tool_span["error"] == "RuntimeError: backend down"
+    
+    metrics = (trace_file.parent / "metrics.prom").read_text()
+    assert 'agent_span_errors_total{kind="tool",name="failing_tool"} 1' in metrics
+    assert 'agent_span_duration_seconds_count{kind="workflow",name="multi"} 1' in metrics
+
+def test_workflow_records_node_tool_and_llm_spans(trace_file, fake_llm):
+    """Test that a multi-agent run is traced end to end."""
+    system = create_multi_agent_system()
+    with tracer.span("workflow", "multi"):
+        system.invoke({
+            "current_task": "Traced task",
+            "messages": [],
+            "next_agent": "researcher",
+            "status": "started"
+        })
+    tracer.flush()
+    
+    spans = _read_spans(trace_file)
+    kinds = {(s["kind"], s["name"]) for s in spans}
+    assert {("node", "research"), ("node", "writing"), ("tool", "search_articles"), ("llm", "Writer")} <= kinds
+    assert len({s["trace_id"] for s in spans}) == 1
+    
+    llm_span = next(s for s in spans if s["kind"] == "llm" and s["name"] == "Writer")
+    assert llm_span["attributes"]["prompt_chars"] > 0
+    assert llm_span["attributes"]["completion_chars"] == len("Fake model response")
+
@@ -1,7 +1,9 @@
 """
 Integration tests for workflows
 """
+import asyncio
 import pytest
+from config.settings import settings
 from workflows.single_agent import create_single_agent_system
 from workflows.multi_agent import create_multi_agent_system
 
@@ -55,3 +57,99 @@ async def test_workflow_error_handling():
         # Expected behavior - log and handle gracefully
         assert str(e) is not None
 
+def _multi_agent_input(task: str) -> dict:
+    return {
+        "current_task": task,
+        "messages": [],
+        "research_notes": "",
+        "trending_topics": [],
+        "articles": [],
+        "analysis_results": "",
+        "patterns": [],
+        "final_report": "",
+        "next_agent": "researcher",
+        "status": "started"
+    }
+
+@pytest.mark.asyncio
+async def test_multi_agent_workflow_async(fake_llm):
+    """Test that several multi-agent runs share one event loop."""
+    system = create_multi_agent_system()
+    
+    results = await asyncio.gather(*[
+        system.ainvoke(_multi_agent_input(f"Concurrent task {i}"))
+        for i in range(3)
+    ])
+    
+    for result in results:
+        assert result["status"] == "complete"
+        assert result["final_report"].startswith("Fake model response")
+
+@pytest.mark.asyncio
+async def test_multi_agent_workflow_astream(fake_llm):
+    """Test that astream yields one update per node."""
+    system = create_multi_agent_system()
+    
+    nodes = []
+    async for update in system.astream(_multi_agent_input("Stream task"), stream_mode="updates"):
+        nodes.extend(update.keys())
+    
+    assert nodes[:2] == ["research", "collect"]
+    assert set(nodes[2:4]) == {"analyze", "sentiment"}
+    assert nodes[4:] == ["write"]
+
+def test_multi_agent_parallel_branches_merge(fake_llm):
+    """Test that analysis branches run together and both reach the writer."""
+    system = create_multi_agent_system()
+    
+    result = system.invoke(_multi_agent_input("Fan-out task"))
+    
+    assert result["analysis_results"].startswith("Fake model response")
+    assert "sentiment" in result["sentiment_analysis"]
+    assert result["status"] == "complete"
+
+def test_multi_agent_without_sentiment(fake_llm):
+    """Test that the sentiment branch can be disabled."""
+    system = create_multi_agent_system(include_sentiment=False)
+    
+    result = system.invoke(_multi_agent_input("No sentiment task"))
+    
+    assert "sentiment" not in system.get_graph().nodes
+    assert result["status"] == "complete"
+
+def test_multi_agent_streams_writer_tokens(fake_llm, monkeypatch):
+    """Test that the writer's tokens arrive as custom stream events."""
+    monkeypatch.setattr(settings, "topic_memo_enabled", True)
+    system = create_multi_agent_system()
+    
+    tokens = []
+    completed = []
+    for mode, chunk in system.stream(_multi_agent_input("Streaming task"), stream_mode=["updates", "custom"]):
+        if mode == "custom":
+            assert chunk["node"] == "writing"
+            tokens.append(chunk["token"])
+        else:
+            completed.extend(chunk)
+    
+    # The topic sections note is streamed after the model's tokens
+    assert "".join(tokens).startswith("Fake model response")
+    assert "*Topic sections: 0 reused, 5 recomputed*" in "".join(tokens)
+    assert completed[-1] == "write"
+
+def test_registry_reuses_compiled_graphs(fake_llm):
+    """Test that workflows are compiled once and agents share model clients."""
+    from workflows.registry import get_workflow, clear_workflows
+    from llm.clients import get_chat_model, list_chat_models
+    
+    clear_workflows()
+    try:
+        graph = get_workflow("multi")
+        assert get_workflow("multi", include_sentiment=True) is graph
+        assert get_workflow("multi", include_sentiment=False) is not graph
+        
+        # Researcher and Data Collector share one client: 4 clients for 5 agents
+        assert get_chat_model("groq", "llama-3.3-70b-versatile", 0.3) is get_chat_model("groq", "llama-3.3-70b-versatile", 0.3)
+        assert len(list_chat_models()) == 4
+    finally:
+        clear_workflows()
+
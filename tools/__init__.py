@@ -1,13 +1,17 @@
+from .cache import tool_cache
 from .search_tools import fetch_trending_topics, search_articles
-from .data_tools import process_data, summarize_text
-from .analysis_tools import analyze_sentiment, detect_patterns
+from .data_tools import process_data, summarize_text, summarize_texts
+from .analysis_tools import analyze_sentiment, analyze_sentiment_batch, detect_patterns
 
 __all__ = [
     'fetch_trending_topics',
     'search_articles',
     'process_data',
     'summarize_text',
+    'summarize_texts',
     'analyze_sentiment',
-    'detect_patterns'
+    'analyze_sentiment_batch',
+    'detect_patterns',
+    'tool_cache'
 ]
 
@@ -3,12 +3,16 @@ Analysis and Pattern Detection Tools
 """
 from typing import Dict, List, Any
 from langchain_core.tools import tool
+from config.settings import settings
+from tools.patterns import PatternEngine
+from tools.sentiment import get_sentiment_engine
 from utils.logger import get_logger
-import re
+from utils.tracing import traced
 
 logger = get_logger(__name__)
 
 @tool
+@traced("tool")
 def analyze_sentiment(text: str) -> Dict[str, Any]:
     """
     Analyze sentiment of text content.
@@ -21,61 +25,51 @@ def analyze_sentiment(text: str) -> Dict[str, Any]:
     """
     logger.info("Analyzing sentiment")
     
-    # Simple keyword-based sentiment (in production, use LLM or dedicated service)
-    positive_keywords = ['good', 'great', 'excellent', 'amazing', 'love', 'best', 'innovative']
-    negative_keywords = ['bad', 'terrible', 'awful', 'hate', 'worst', 'poor', 'broken']
+    # Weighted lexicon matched on whole words (in production, use LLM or dedicated service)
+    result = get_sentiment_engine().score(text)
     
-    text_lower = text.lower()
-    positive_count = sum(1 for word in positive_keywords if word in text_lower)
-    negative_count = sum(1 for word in negative_keywords if word in text_lower)
+    logger.info(f"Sentiment: {result['sentiment']} (score: {result['score']})")
+    return result
+
+@tool
+@traced("tool")
+def analyze_sentiment_batch(texts: List[str]) -> Dict[str, Any]:
+    """
+    Analyze sentiment of many documents at once.
     
-    total = positive_count + negative_count
-    if total == 0:
-        sentiment = "neutral"
-        score = 50
-    else:
-        score = int((positive_count / total) * 100)
-        if score > 60:
-            sentiment = "positive"
-        elif score < 40:
-            sentiment = "negative"
-        else:
-            sentiment = "mixed"
+    Args:
+        texts: Documents to analyze, e.g. one per article
     
-    result = {
-        "sentiment": sentiment,
-        "score": score,
-        "confidence": min(total * 10, 100),
-        "positive_signals": positive_count,
-        "negative_signals": negative_count
-    }
+    Returns:
+        Per-document results under "documents" and the combined result
+        under "aggregate"
+    """
+    logger.info(f"Analyzing sentiment of {len(texts)} documents")
     
-    logger.info(f"Sentiment: {sentiment} (score: {score})")
+    result = get_sentiment_engine().score_batch(texts)
+    
+    aggregate = result["aggregate"]
+    logger.info(f"Sentiment: {aggregate['sentiment']} (score: {aggregate['score']})")
     return result
 
 @tool
-def detect_patterns(data: List[str]) -> List[str]:
+@traced("tool")
+def detect_patterns(data: List[str], top_k: int = 5) -> List[str]:
     """
     Detect common patterns in text data.
     
     Args:
-        data: List of text items
+        data: List of text items, e.g. topic names and article text
+        top_k: Number of patterns to return
     
     Returns:
         List of detected patterns
     """
     logger.info(f"Detecting patterns in {len(data)} items")
     
-    # Find common keywords
-    word_freq = {}
-    for item in data:
-        words = re.findall(r'\b[a-z]{4,}\b', item.lower())
-        for word in words:
-            word_freq[word] = word_freq.get(word, 0) + 1
-    
-    # Get top patterns
-    patterns = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:5]
-    result = [f"{word} (appears {count} times)" for word, count in patterns]
+    # Frequent words and word pairs, counted in one pass with bounded memory
+    engine = PatternEngine(capacity=settings.pattern_capacity).add_all(data)
+    result = [f"{gram} (appears {count} times)" for gram, count in engine.top(top_k)]
     
     logger.info(f"Detected {len(result)} patterns")
     return result
@@ -0,0 +1,216 @@
+"""
+Tool Result Cache with Single-Flight Deduplication
+"""
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from config.settings import settings
+from utils.logger import get_logger
+import asyncio
+import copy
+import functools
+import inspect
+import threading
+import time
+
+logger = get_logger(__name__)
+
+CacheKey = Tuple[str, Tuple[Tuple[str, Any], ...]]
+
+def parse_ttls(spec: str) -> Dict[str, float]:
+    """Parse "tool=seconds,other_tool=seconds" into a name -> TTL map."""
+    ttls = {}
+    for item in spec.split(","):
+        if "=" in item:
+            name, value = item.split("=", 1)
+            ttls[name.strip()] = float(value)
+    return ttls
+
+class ToolCache:
+    """
+    TTL cache for tool results that also coalesces in-flight calls.
+    
+    Concurrent callers asking for the same (tool, arguments) share one
+    backend call: the first caller runs it and everyone else waits on the
+    same future, whether they are threads or coroutines. Results are then
+    kept for the tool's TTL; a TTL of 0 keeps only the coalescing.
+    """
+    
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, default_ttl: float = 0.0, max_entries: int = 1024):
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        
+        self._lock = threading.Lock()
+        self._entries: Dict[CacheKey, Tuple[float, Any]] = {}
+        self._inflight: Dict[CacheKey, Future] = {}
+        self._functions: Dict[str, Callable] = {}
+        self._signatures: Dict[str, inspect.Signature] = {}
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "expired": 0}
+    
+    def ttl_for(self, name: str) -> float:
+        return self.ttls.get(name, self.default_ttl)
+    
+    def _key(self, name: str, args: tuple, kwargs: dict) -> CacheKey:
+        """Normalize call arguments so positional, keyword and default forms match."""
+        bound = self._signatures[name].bind(*args, **kwargs)
+        bound.apply_defaults()
+        return name, tuple(sorted(bound.arguments.items()))
+    
+    def _claim(self, key: CacheKey) -> Tuple[bool, Any, Optional[Future], bool]:
+        """
+        Return (hit, value, future, is_leader) for a key.
+        
+        On a miss the caller either becomes the leader (the future is new
+        and registered as in flight) or a follower of an existing call.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if now < expires:
+                    self._stats["hits"] += 1
+                    return True, value, None, False
+                del self._entries[key]
+                self._stats["expired"] += 1
+            
+            future = self._inflight.get(key)
+            if future is not None:
+                self._stats["coalesced"] += 1
+                return False, None, future, False
+            
+            self._stats["misses"] += 1
+            future = Future()
+            self._inflight[key] = future
+            return False, None, future, True
+    
+    def _settle(self, key: CacheKey, future: Future, value: Any = None, error: Optional[BaseException] = None):
+        """Publish the leader's result to followers and store it."""
+        with self._lock:
+            self._inflight.pop(key, None)
+            ttl = self.ttl_for(key[0])
+            if error is None and ttl > 0:
+                if len(self._entries) >= self.max_entries:
+                    # Drop the entry closest to expiry to stay bounded
+                    oldest = min(self._entries, key=lambda k: self._entries[k][0])
+                    del self._entries[oldest]
+                self._entries[key] = (time.monotonic() + ttl, value)
+        
+        if error is None:
+            future.set_result(value)
+        else:
+            future.set_exception(error)
+    
+    def cached(self, name: str) -> Callable:
+        """Decorate a blocking tool implementation."""
+        def decorator(func: Callable) -> Callable:
+            self._signatures[name] = inspect.signature(func)
+            
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                key = self._key(name, args, kwargs)
+                hit, value, future, is_leader = self._claim(key)
+                if hit:
+                    return copy.deepcopy(value)
+                if not is_leader:
+                    return copy.deepcopy(future.result())
+                
+                try:
+                    value = func(*args, **kwargs)
+                except BaseException as e:
+                    self._settle(key, future, error=e)
+                    raise
+                self._settle(key, future, value)
+                return copy.deepcopy(value)
+            
+            self._functions[name] = wrapper
+            return wrapper
+        return decorator
+    
+    def acached(self, name: str) -> Callable:
+        """Decorate an async tool implementation sharing the same cache entries."""
+        def decorator(func: Callable) -> Callable:
+            if name not in self._signatures:
+                self._signatures[name] = inspect.signature(func)
+            
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                key = self._key(name, args, kwargs)
+                hit, value, future, is_leader = self._claim(key)
+                if hit:
+                    return copy.deepcopy(value)
+                if not is_leader:
+                    return copy.deepcopy(await asyncio.wrap_future(future))
+                
+                try:
+                    value = await func(*args, **kwargs)
+                except BaseException as e:
+                    self._settle(key, future, error=e)
+                    raise
+                self._settle(key, future, value)
+                return copy.deepcopy(value)
+            
+            return wrapper
+        return decorator
+    
+    def warm(self, name: str, calls: List[Dict[str, Any]]) -> int:
+        """
+        Pre-populate the cache for a tool.
+        
+        Args:
+            name: Tool name
+            calls: Keyword arguments for each call to cache
+        
+        Returns:
+            Number of calls that actually hit the backend
+        """
+        func = self._functions[name]
+        fetched = 0
+        for kwargs in calls:
+            key = self._key(name, (), kwargs)
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and time.monotonic() < entry[0]:
+                    continue
+            func(**kwargs)
+            fetched += 1
+        logger.info(f"Warmed {fetched} {name} results")
+        return fetched
+    
+    def invalidate(self, name: Optional[str] = None, **kwargs) -> int:
+        """
+        Drop cached results.
+        
+        With no name every entry is dropped; with a name only that tool's
+        entries; with a name and arguments only that exact call.
+        """
+        with self._lock:
+            if name is None:
+                keys = list(self._entries)
+            elif kwargs:
+                keys = [self._key(name, (), kwargs)]
+            else:
+                keys = [k for k in self._entries if k[0] == name]
+            
+            removed = 0
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    removed += 1
+        return removed
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["in_flight"] = len(self._inflight)
+        calls = stats["hits"] + stats["misses"] + stats["coalesced"]
+        stats["backend_calls_saved"] = stats["hits"] + stats["coalesced"]
+        stats["hit_rate"] = stats["backend_calls_saved"] / calls if calls else 0.0
+        return stats
+
+# Process-wide cache shared by all search tools
+tool_cache = ToolCache(
+    ttls=parse_ttls(settings.tool_cache_ttls) if settings.tool_cache_enabled else {},
+    default_ttl=0.0
+)
+
@@ -1,40 +1,77 @@
 """
 Data Processing Tools
 """
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from langchain_core.tools import tool
+from tools.frames import ArticleFrame
+from tools.summarize import TextRankSummarizer
 from utils.logger import get_logger
+from utils.tracing import traced
 import json
 
 logger = get_logger(__name__)
 
+_summarizer = TextRankSummarizer()
+
 @tool
-def process_data(data: List[Dict[str, Any]], operation: str = "filter") -> List[Dict[str, Any]]:
+@traced("tool")
+def process_data(
+    data: List[Dict[str, Any]],
+    operation: str = "filter",
+    by: Optional[str] = None,
+    where: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    k: int = 10,
+    ascending: bool = False
+) -> List[Dict[str, Any]]:
     """
     Process and transform data.
     
     Args:
-        data: List of data dictionaries
-        operation: Operation to perform (filter, sort, group)
+        data: List of data dictionaries, e.g. articles
+        operation: Operation to perform (filter, sort, group, top_k, project)
+        by: Field to sort, group or rank on (sort and top_k default to text length)
+        where: Filter expression of field comparisons joined by and/or/not,
+            e.g. "source == 'Tech Blog' and score > 0.5"
+        fields: Fields to keep for project
+        k: Number of items for top_k
+        ascending: Sort or rank in ascending order
     
     Returns:
-        Processed data
+        Processed data (the selected input records themselves, except for
+        group and project)
+    
+    Raises:
+        ValueError: If by or where names a field no record has, or where
+            is not a plain comparison expression
     """
     logger.info(f"Processing data with operation: {operation}")
     
+    if not data:
+        return []
+    
+    frame = ArticleFrame.from_records(data)
     if operation == "filter":
-        # Filter out low-quality items
-        processed = [item for item in data if len(str(item)) > 50]
+        # Filter out low-quality items (too little text), then apply the expression
+        processed = frame.filter(where, min_text_length=0 if where else 50)
     elif operation == "sort":
-        # Sort by relevance (simplified)
-        processed = sorted(data, key=lambda x: len(str(x)), reverse=True)
+        # Sort by a field, or by relevance (text length) without one
+        processed = frame.sort(by, ascending=ascending)
+    elif operation == "group":
+        processed = frame.group(by or "source")
+    elif operation == "top_k":
+        processed = frame.top_k(k, by, ascending=ascending)
+    elif operation == "project":
+        processed = frame.project(fields or [])
     else:
-        processed = data
+        processed = frame
     
-    logger.info(f"Processed {len(processed)} items")
-    return processed
+    result = processed.to_records()
+    logger.info(f"Processed {len(result)} items")
+    return result
 
 @tool
+@traced("tool")
 def summarize_text(text: str, max_length: int = 200) -> str:
     """
     Summarize long text content.
@@ -48,16 +85,25 @@ def summarize_text(text: str, max_length: int = 200) -> str:
     """
     logger.info(f"Summarizing text of length: {len(text)}")
     
-    if len(text) <= max_length:
-        return text
-    
-    # Simple extractive summarization (in production, use LLM)
-    sentences = text.split(". ")
-    summary = ". ".join(sentences[:3]) + "."
-    
-    if len(summary) > max_length:
-        summary = summary[:max_length-3] + "..."
+    # Extractive TextRank summary (no LLM call)
+    summary = _summarizer.summarize(text, max_length)
     
     logger.info(f"Generated summary of length: {len(summary)}")
     return summary
 
+@tool
+@traced("tool")
+def summarize_texts(texts: List[str], max_length: int = 200) -> List[str]:
+    """
+    Summarize many texts at once.
+    
+    Args:
+        texts: Texts to summarize, e.g. article bodies
+        max_length: Maximum length of each summary
+    
+    Returns:
+        One summary per text, in order
+    """
+    logger.info(f"Summarizing {len(texts)} texts")
+    return _summarizer.summarize_batch(texts, max_length)
+
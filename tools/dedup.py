@@ -0,0 +1,207 @@
+"""
+Near-Duplicate Article Detection
+"""
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from config.settings import settings
+from utils.logger import get_logger
+from utils.tokens import count_tokens
+import hashlib
+import numpy as np
+import re
+import sqlite3
+import threading
+import time
+
+logger = get_logger(__name__)
+
+BITS = 64
+BANDS = 8
+_BAND_BITS = BITS // BANDS
+_SHIFTS = np.arange(BITS, dtype=np.uint64)
+_WORD = re.compile(r"[a-z0-9]+")
+
+def simhash(text: str) -> int:
+    """
+    64-bit SimHash over the words and word pairs of a text.
+    
+    Texts that share most of their features get fingerprints that differ
+    in only a few bits.
+    """
+    words = _WORD.findall(text.lower())
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    if not features:
+        return 0
+    
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest(), "little") for f in features),
+        dtype=np.uint64,
+        count=len(features)
+    )
+    # Every feature votes +1/-1 on every bit; positive totals become 1 bits
+    bits = ((hashes[:, None] >> _SHIFTS) & np.uint64(1)).astype(np.int64)
+    votes = (2 * bits - 1).sum(axis=0)
+    return int(sum(1 << i for i in np.flatnonzero(votes > 0).tolist()))
+
+def bands(fingerprint: int) -> List[int]:
+    """
+    Split a fingerprint into BANDS equal slices.
+    
+    Two fingerprints within BANDS - 1 bits of each other agree on at least
+    one whole band, so looking up candidates by band finds them all.
+    """
+    mask = (1 << _BAND_BITS) - 1
+    return [(fingerprint >> (i * _BAND_BITS)) & mask for i in range(BANDS)]
+
+def article_text(article: Dict[str, Any]) -> str:
+    return f"{article.get('title', '')}\n{article.get('summary', '')}"
+
+class NearDuplicateIndex:
+    """
+    Persistent SimHash index that assigns articles to near-duplicate clusters.
+    
+    Each article is stored with its fingerprint, its bands and the
+    cluster it joined: the cluster of the closest stored article within
+    max_distance bits, or a new cluster of its own. Because the index
+    lives in SQLite, an article seen in an earlier run is not hashed
+    again and its copies land in the same cluster every time. Entries
+    not seen for retention_days are pruned.
+    """
+    
+    def __init__(self, path: Path, max_distance: int = 6, retention_days: Optional[float] = 30):
+        if max_distance >= BANDS:
+            raise ValueError(f"max_distance must be below {BANDS} for the band lookup to find every match")
+        self.path = Path(path)
+        self.max_distance = max_distance
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS signatures (
+                key TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                cluster TEXT NOT NULL,
+                {", ".join(f"band{i} INTEGER NOT NULL" for i in range(BANDS))},
+                seen REAL NOT NULL
+            )
+        """)
+        for i in range(BANDS):
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_signatures_band{i} ON signatures(band{i})")
+        if retention_days is not None:
+            self._conn.execute("DELETE FROM signatures WHERE seen < ?", (time.time() - retention_days * 86400,))
+    
+    @staticmethod
+    def make_key(article: Dict[str, Any]) -> str:
+        """Identify an article by its URL and text, so edited articles are hashed again."""
+        payload = f"{article.get('url', '')}\n{article_text(article)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+    
+    def cluster(self, article: Dict[str, Any]) -> str:
+        """Return the id of the near-duplicate cluster an article belongs to."""
+        key = self.make_key(article)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT cluster FROM signatures WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._conn.execute("UPDATE signatures SET seen = ? WHERE key = ?", (now, key))
+                return row[0]
+            
+            fingerprint = simhash(article_text(article))
+            article_bands = bands(fingerprint)
+            candidates = self._conn.execute(
+                "SELECT fingerprint, cluster FROM signatures WHERE "
+                + " OR ".join(f"band{i} = ?" for i in range(BANDS)),
+                article_bands
+            ).fetchall()
+            
+            cluster, best = key, self.max_distance + 1
+            for other, other_cluster in candidates:
+                distance = bin(fingerprint ^ int(other, 16)).count("1")
+                if distance < best:
+                    cluster, best = other_cluster, distance
+            
+            self._conn.execute(
+                f"INSERT INTO signatures (key, fingerprint, cluster, {', '.join(f'band{i}' for i in range(BANDS))}, seen) "
+                f"VALUES (?, ?, ?, {', '.join('?' for _ in range(BANDS))}, ?)",
+                (key, f"{fingerprint:016x}", cluster, *article_bands, now)
+            )
+            return cluster
+    
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM signatures")
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def source_rank(source: Optional[str]) -> int:
+    """Position of a source in DEDUP_SOURCE_PRIORITY (unlisted sources rank last)."""
+    priority = [s.strip() for s in settings.dedup_source_priority.split(",") if s.strip()]
+    return priority.index(source) if source in priority else len(priority)
+
+def dedup_articles(
+    topic_articles: Dict[str, List[Dict[str, Any]]],
+    index: "NearDuplicateIndex"
+) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, int]]:
+    """
+    Collapse near-duplicate articles across every topic.
+    
+    Of each cluster only the best copy is kept: the one from the most
+    preferred source, then the one with the most text.
+    
+    Returns:
+        The remaining articles per topic (topics left empty are dropped)
+        and stats with the number of articles, duplicates removed and the
+        prompt tokens they would have cost
+    """
+    entries: List[Tuple[str, Dict[str, Any], str]] = [
+        (topic, article, index.cluster(article))
+        for topic, articles in topic_articles.items()
+        for article in articles
+    ]
+    
+    best: Dict[str, Dict[str, Any]] = {}
+    for _, article, cluster in entries:
+        current = best.get(cluster)
+        if current is None or _quality(article) > _quality(current):
+            best[cluster] = article
+    
+    kept: Dict[str, List[Dict[str, Any]]] = {}
+    tokens_removed = 0
+    for topic, article, cluster in entries:
+        if best[cluster] is article:
+            kept.setdefault(topic, []).append(article)
+        else:
+            tokens_removed += count_tokens(article_text(article))
+    
+    duplicates = len(entries) - len(best)
+    return kept, {"articles": len(entries), "duplicates": duplicates, "tokens_removed": tokens_removed}
+
+def _quality(article: Dict[str, Any]) -> Tuple[int, int]:
+    return -source_rank(article.get("source")), len(article.get("summary", ""))
+
+_dedup_index: Optional[NearDuplicateIndex] = None
+_dedup_index_lock = threading.Lock()
+
+def get_dedup_index() -> NearDuplicateIndex:
+    """Return the process-wide index (data/dedup.sqlite)."""
+    global _dedup_index
+    with _dedup_index_lock:
+        if _dedup_index is None:
+            _dedup_index = NearDuplicateIndex(
+                settings.data_dir / "dedup.sqlite",
+                max_distance=settings.dedup_max_distance
+            )
+        return _dedup_index
+
+def clear_dedup_index():
+    """Close the process-wide index (mainly for tests)."""
+    global _dedup_index
+    with _dedup_index_lock:
+        if _dedup_index is not None:
+            _dedup_index.close()
+            _dedup_index = None
+
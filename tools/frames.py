@@ -0,0 +1,277 @@
+"""
+Columnar Article Batches
+"""
+from typing import Any, Dict, List, Optional, Sequence
+import ast
+import numpy as np
+import operator
+import pandas as pd
+
+_COMPARISONS = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge
+}
+
+class ArticleFrame:
+    """
+    A batch of article records viewed column by column.
+    
+    The records themselves are never copied: a frame is the original
+    list plus an array of selected row positions, and a field is turned
+    into a NumPy column (cached, shared by derived frames) only when an
+    operation needs it. Every operation returns a new frame, so chains
+    like frame.filter("score > 0.5").top_k(10, "score").project(["title"])
+    only build dicts again for the rows that to_records() returns.
+    """
+    
+    def __init__(
+        self,
+        records: Sequence[Dict[str, Any]],
+        rows: Optional[np.ndarray] = None,
+        columns: Optional[Dict[str, np.ndarray]] = None
+    ):
+        self._records = records
+        self.rows = np.arange(len(records), dtype=np.intp) if rows is None else rows
+        self._columns = {} if columns is None else columns
+        self._fields: Optional[List[str]] = None
+    
+    @classmethod
+    def from_records(cls, records: Sequence[Dict[str, Any]]) -> "ArticleFrame":
+        return cls(list(records))
+    
+    def to_records(self) -> List[Dict[str, Any]]:
+        """The selected records, in row order (the original dicts, not copies)."""
+        records = self._records
+        return [records[i] for i in self.rows.tolist()]
+    
+    def __len__(self) -> int:
+        return len(self.rows)
+    
+    @property
+    def fields(self) -> List[str]:
+        """Every field that appears in at least one record, in first-seen order."""
+        if self._fields is None:
+            self._fields = list(dict.fromkeys(key for record in self._records for key in record))
+        return self._fields
+    
+    def column(self, field: str) -> np.ndarray:
+        """
+        A field's values for every record (None where missing).
+        
+        Numeric fields become float arrays with NaN for missing values;
+        anything else is an object array.
+        
+        Raises:
+            ValueError: If no record has the field
+        """
+        if field not in self._columns:
+            values = [record.get(field) for record in self._records]
+            first = next((v for v in values if v is not None), None)
+            if first is None and not any(field in record for record in self._records):
+                raise ValueError(f"Unknown field '{field}'; available fields: {', '.join(self.fields)}")
+            column = None
+            if isinstance(first, (int, float)) and not isinstance(first, bool):
+                try:
+                    column = np.array(values, dtype=float)  # None becomes NaN
+                except (TypeError, ValueError):
+                    pass
+            if column is None:
+                column = np.empty(len(values), dtype=object)
+                column[:] = values
+            self._columns[field] = column
+        return self._columns[field]
+    
+    def _derive(self, rows: np.ndarray) -> "ArticleFrame":
+        frame = ArticleFrame(self._records, rows, self._columns)
+        frame._fields = self._fields
+        return frame
+    
+    def text_length(self) -> np.ndarray:
+        """Total characters across each selected record's text fields."""
+        records = self._records
+        return np.fromiter(
+            (sum(len(v) for v in records[i].values() if isinstance(v, str)) for i in self.rows.tolist()),
+            dtype=np.int64,
+            count=len(self.rows)
+        )
+    
+    def filter(self, where: Optional[str] = None, min_text_length: int = 0) -> "ArticleFrame":
+        """
+        Keep records matching an expression and/or with enough text.
+        
+        Args:
+            where: Comparisons of fields with literals joined by and/or/not,
+                e.g. "source == 'Tech Blog' and (score > 0.5 or date >= '2025-10-28')";
+                "in"/"not in" take a list of literals
+            min_text_length: Minimum characters across the text fields
+        
+        Raises:
+            ValueError: If the expression is not of that form or names an unknown field
+        """
+        rows = self.rows
+        if min_text_length:
+            rows = rows[self.text_length() >= min_text_length]
+        if where:
+            rows = rows[_Expression(where, self, rows).mask]
+        return self._derive(rows)
+    
+    def sort(self, by: Optional[str] = None, ascending: bool = False) -> "ArticleFrame":
+        """Sort on a field (records missing it go last); without one, longest text first."""
+        if by is None:
+            lengths = self.text_length()
+            return self._derive(self.rows[np.argsort(lengths if ascending else -lengths, kind="stable")])
+        
+        values = self.column(by)[self.rows]
+        present = ~pd.isna(values)
+        order = np.flatnonzero(present)
+        keys = values[order]
+        if keys.dtype == object:
+            # Rank distinct values so descending order can stay stable for ties
+            try:
+                keys = np.unique(keys, return_inverse=True)[1]
+            except TypeError:
+                raise ValueError(f"Field '{by}' mixes values that cannot be compared") from None
+        ranked = np.argsort(keys if ascending else -keys, kind="stable")
+        return self._derive(np.concatenate([self.rows[order[ranked]], self.rows[~present]]))
+    
+    def top_k(self, k: int, by: Optional[str] = None, ascending: bool = False) -> "ArticleFrame":
+        """The k records with the highest (or lowest) values of a field, or the longest texts."""
+        if by is not None and self.column(by).dtype == float and k < len(self.rows):
+            values = self.column(by)[self.rows]
+            keys = np.where(np.isnan(values), np.inf, values if ascending else -values)
+            if k <= 0:
+                return self._derive(self.rows[:0])
+            # Everything strictly better than the k-th key, then the earliest ties
+            threshold = np.partition(keys, k - 1)[k - 1]
+            better = np.flatnonzero(keys < threshold)
+            ties = np.flatnonzero(keys == threshold)[:k - len(better)]
+            candidates = np.concatenate([better, ties])
+            candidates = candidates[np.lexsort((candidates, keys[candidates]))]
+            return self._derive(self.rows[candidates])
+        sorted_frame = self.sort(by, ascending=ascending)
+        return sorted_frame._derive(sorted_frame.rows[:max(0, k)])
+    
+    def group(self, by: str) -> "ArticleFrame":
+        """
+        One row per value of a field, most common first.
+        
+        Each row has the record count, the mean of every numeric field
+        (as <field>_mean) and, when records have dates, the latest one.
+        """
+        df = pd.DataFrame({by: self.column(by)[self.rows]})
+        numeric = [f for f in self.fields if f != by and self.column(f).dtype == float]
+        for field in numeric:
+            df[field] = self.column(field)[self.rows]
+        if "date" in self.fields and by != "date":
+            df["date"] = self.column("date")[self.rows]
+        
+        grouped = df.groupby(by, sort=False, dropna=False)
+        summary = grouped.size().rename("count").to_frame()
+        if numeric:
+            summary = summary.join(grouped[numeric].mean().add_suffix("_mean"))
+        if "date" in df.columns and by != "date":
+            summary = summary.join(grouped["date"].max().rename("latest"))
+        summary = summary.reset_index().sort_values("count", ascending=False, kind="stable")
+        
+        records = [
+            {key: value for key, value in record.items() if not (isinstance(value, float) and np.isnan(value))}
+            for record in summary.to_dict("records")
+        ]
+        return ArticleFrame(records)
+    
+    def project(self, fields: Sequence[str]) -> "ArticleFrame":
+        """Keep only the given fields, in the given order (unknown fields are ignored)."""
+        records = self._records
+        projected = [
+            {f: records[i][f] for f in fields if f in records[i]}
+            for i in self.rows.tolist()
+        ]
+        return ArticleFrame(projected)
+
+class _Expression:
+    """
+    Evaluates a filter expression over a frame's columns.
+    
+    Only field names, literals, comparisons and and/or/not are accepted.
+    Anything else (calls, attributes, arithmetic) is rejected, so
+    model-written filters cannot run arbitrary code.
+    """
+    
+    def __init__(self, text: str, frame: ArticleFrame, rows: np.ndarray):
+        self.text = text
+        self.frame = frame
+        self.rows = rows
+        try:
+            tree = ast.parse(text.strip(), mode="eval")
+        except SyntaxError as e:
+            raise ValueError(f"Invalid filter expression {text!r}: {e.msg}") from None
+        self.mask = np.asarray(self._eval(tree.body), dtype=bool)
+    
+    def _eval(self, node: ast.AST) -> Any:
+        if isinstance(node, ast.BoolOp):
+            combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+            result = self._eval(node.values[0])
+            for value in node.values[1:]:
+                result = combine(result, self._eval(value))
+            return result
+        if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.BitAnd, ast.BitOr)):
+            combine = np.logical_and if isinstance(node.op, ast.BitAnd) else np.logical_or
+            return combine(self._eval(node.left), self._eval(node.right))
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Not, ast.Invert)):
+            return np.logical_not(self._eval(node.operand))
+        if isinstance(node, ast.Compare):
+            result = np.ones(len(self.rows), dtype=bool)
+            left = node.left
+            for op, right in zip(node.ops, node.comparators):
+                result &= self._compare(op, left, right)
+                left = right
+            return result
+        raise ValueError(f"Unsupported filter expression {self.text!r}: use fields, literals, comparisons and and/or/not")
+    
+    def _operand(self, node: ast.AST) -> Any:
+        if isinstance(node, ast.Name):
+            return self.frame.column(node.id)[self.rows]
+        try:
+            return ast.literal_eval(node)
+        except ValueError:
+            raise ValueError(f"Unsupported value in filter expression {self.text!r}: {ast.unparse(node)}") from None
+    
+    def _compare(self, op: ast.cmpop, left: ast.AST, right: ast.AST) -> np.ndarray:
+        a, b = self._operand(left), self._operand(right)
+        if isinstance(op, (ast.In, ast.NotIn)):
+            if not isinstance(a, np.ndarray) or not isinstance(b, (list, tuple, set)):
+                raise ValueError(f"'in' needs a field on the left and a list on the right in {self.text!r}")
+            mask = pd.Series(a).isin(list(b)).to_numpy()
+            return ~mask if isinstance(op, ast.NotIn) else mask
+        if type(op) not in _COMPARISONS:
+            raise ValueError(f"Unsupported comparison in filter expression {self.text!r}")
+        compare = _COMPARISONS[type(op)]
+        
+        if isinstance(a, np.ndarray) and a.dtype == float or isinstance(b, np.ndarray) and b.dtype == float:
+            try:
+                with np.errstate(invalid="ignore"):
+                    return np.asarray(compare(a, b), dtype=bool)
+            except TypeError:
+                raise ValueError(f"Cannot compare a numeric field with {ast.unparse(right)} in {self.text!r}") from None
+        
+        if not isinstance(a, np.ndarray) and not isinstance(b, np.ndarray):
+            raise ValueError(f"Comparisons need a field on one side in {self.text!r}")
+        
+        # Object columns: missing values never match, and mismatched types are an error
+        present = np.ones(len(self.rows), dtype=bool)
+        for side in (a, b):
+            if isinstance(side, np.ndarray):
+                present &= pd.notna(side)
+        lhs = a[present] if isinstance(a, np.ndarray) else a
+        rhs = b[present] if isinstance(b, np.ndarray) else b
+        result = np.zeros(len(self.rows), dtype=bool)
+        try:
+            result[present] = compare(lhs, rhs)
+        except TypeError:
+            raise ValueError(f"Cannot compare {ast.unparse(left)} with {ast.unparse(right)} in {self.text!r}") from None
+        return result
+
@@ -0,0 +1,126 @@
+"""
+Streaming Pattern Engine
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+import heapq
+import re
+
+STOPWORDS = frozenset("""
+a about above after again against all also an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further
+had has have having he her here hers him his how i if in into is it its itself just more most
+my no nor not now of off on once only or other our ours out over own same she should so some
+such than that the their theirs them then there these they this those through to too under
+until up very was we were what when where which while who whom why will with would you your
+new via using use used based
+""".split())
+
+_TOKEN = re.compile(r"[a-z][a-z0-9]*")
+
+class HeavyHitters:
+    """
+    Misra-Gries summary: approximate counts of the most frequent items.
+    
+    At most capacity items are tracked. When a new item arrives and the
+    table is full, every counter is decremented instead, so memory stays
+    bounded however many items are seen. Any item seen more than
+    n / (capacity + 1) times is guaranteed to be tracked, and each count
+    is low by at most `error`.
+    """
+    
+    def __init__(self, capacity: int = 1000):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.counters: Dict[str, int] = {}
+        self.n = 0
+        self.error = 0
+    
+    def add(self, item: str, count: int = 1):
+        self.n += count
+        counters = self.counters
+        if item in counters:
+            counters[item] += count
+            return
+        if len(counters) < self.capacity:
+            counters[item] = count
+            return
+        
+        # Table is full: decrement everything (the new item included)
+        decrement = min(count, min(counters.values()))
+        self.error += decrement
+        for key in list(counters):
+            counters[key] -= decrement
+            if counters[key] <= 0:
+                del counters[key]
+        if count > decrement:
+            counters[item] = count - decrement
+    
+    def merge(self, other: "HeavyHitters") -> "HeavyHitters":
+        """
+        Fold another summary (e.g. from another shard) into this one.
+        
+        Counts are summed, then reduced by the (capacity + 1)-th largest
+        count so the table fits again; the error bounds add up.
+        """
+        counters = self.counters
+        for item, count in other.counters.items():
+            counters[item] = counters.get(item, 0) + count
+        self.n += other.n
+        self.error += other.error
+        
+        if len(counters) > self.capacity:
+            cut = heapq.nlargest(self.capacity + 1, counters.values())[-1]
+            self.error += cut
+            self.counters = {item: count - cut for item, count in counters.items() if count > cut}
+        return self
+    
+    def top(self, k: int) -> List[Tuple[str, int]]:
+        """The k items with the highest counts, ties broken alphabetically."""
+        return heapq.nsmallest(k, self.counters.items(), key=lambda item: (-item[1], item[0]))
+
+class PatternEngine:
+    """
+    Counts unigrams and bigrams across a stream of documents.
+    
+    Text is lowercased and split into alphanumeric tokens. Unigrams of
+    min_length characters or more and bigrams of adjacent tokens are
+    counted, skipping stopwords (a bigram never spans a stopword). Both
+    share one HeavyHitters summary, so engines for separate shards can be
+    merged.
+    """
+    
+    def __init__(self, capacity: int = 1000, min_length: int = 4, stopwords: Optional[Iterable[str]] = None):
+        self.min_length = min_length
+        self.stopwords = STOPWORDS if stopwords is None else frozenset(stopwords)
+        self.sketch = HeavyHitters(capacity)
+        self.documents = 0
+    
+    def add(self, text: str):
+        """Count the n-grams of one document."""
+        self.documents += 1
+        previous = None
+        for token in _TOKEN.findall(text.lower()):
+            if token in self.stopwords:
+                previous = None
+                continue
+            if len(token) >= self.min_length:
+                self.sketch.add(token)
+            if previous is not None:
+                self.sketch.add(f"{previous} {token}")
+            previous = token
+    
+    def add_all(self, texts: Iterable[str]) -> "PatternEngine":
+        for text in texts:
+            self.add(text)
+        return self
+    
+    def merge(self, other: "PatternEngine") -> "PatternEngine":
+        self.sketch.merge(other.sketch)
+        self.documents += other.documents
+        return self
+    
+    def top(self, k: int = 5, min_count: int = 1) -> List[Tuple[str, int]]:
+        """The k most frequent n-grams seen at least min_count times."""
+        return [(gram, count) for gram, count in self.sketch.top(k) if count >= min_count]
+
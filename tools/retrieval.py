@@ -0,0 +1,124 @@
+"""
+Local Retrieval Index over Collected Articles
+"""
+from collections import OrderedDict
+from typing import List, Sequence, Tuple
+from tools.patterns import STOPWORDS
+from utils.vectorize import HashingVectorizer
+import hashlib
+import numpy as np
+import threading
+
+class TfidfVectorizer:
+    """
+    Embeds text as L2-normalized TF-IDF vectors of hashed words and word pairs.
+    
+    Term counts come from utils.vectorize.HashingVectorizer (stopwords
+    dropped, no character n-grams); IDF weights are fitted on the
+    indexed passages.
+    """
+    
+    def __init__(self, dim: int = 2048):
+        self.dim = dim
+        self.hashing = HashingVectorizer(n_features=dim, char_ngram=0, normalize=False, stopwords=STOPWORDS)
+        self.idf = np.ones(dim, dtype=np.float32)
+    
+    def fit(self, texts: Sequence[str]) -> np.ndarray:
+        """Fit IDF weights on texts and return their vectors."""
+        counts = self.hashing.transform(texts)
+        document_frequency = np.count_nonzero(counts, axis=0)
+        self.idf = (np.log((1 + len(texts)) / (1 + document_frequency)) + 1).astype(np.float32)
+        return self._normalize(counts * self.idf)
+    
+    def transform(self, texts: Sequence[str]) -> np.ndarray:
+        return self._normalize(self.hashing.transform(texts) * self.idf)
+    
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+class PassageIndex:
+    """
+    In-memory cosine-similarity index over text passages.
+    
+    Passage vectors are rows of one matrix, so a batch of queries is
+    scored with a single matrix product and each query's top k are
+    picked with argpartition.
+    """
+    
+    def __init__(self, passages: Sequence[str], dim: int = 2048):
+        self.passages = list(passages)
+        self.vectorizer = TfidfVectorizer(dim)
+        self.matrix = self.vectorizer.fit(self.passages)
+    
+    def __len__(self) -> int:
+        return len(self.passages)
+    
+    def search(self, queries: Sequence[str], k: int) -> List[List[Tuple[int, float]]]:
+        """
+        Return the k best (passage index, cosine score) pairs for every query.
+        
+        Args:
+            queries: Query texts, scored together
+            k: Passages per query
+        """
+        k = min(k, len(self.passages))
+        if k <= 0:
+            return [[] for _ in queries]
+        
+        scores = self.vectorizer.transform(queries) @ self.matrix.T
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, candidates in zip(scores, top):
+            ranked = candidates[np.argsort(-row[candidates], kind="stable")]
+            results.append([(int(i), float(row[i])) for i in ranked])
+        return results
+    
+    def select(self, queries: Sequence[str], k: int) -> List[int]:
+        """
+        Indices of up to k passages relevant to any of the queries, in passage order.
+        
+        Each query contributes its best passages in turn, so every query
+        (e.g. every report section) is represented.
+        """
+        if len(self.passages) <= k:
+            return list(range(len(self.passages)))
+        
+        ranked = self.search(queries, k)
+        chosen: List[int] = []
+        for position in range(k):
+            for hits in ranked:
+                if position < len(hits) and hits[position][0] not in chosen and len(chosen) < k:
+                    chosen.append(hits[position][0])
+        return sorted(chosen)
+
+_indexes: "OrderedDict[str, PassageIndex]" = OrderedDict()
+_indexes_lock = threading.Lock()
+
+def get_passage_index(passages: Sequence[str], dim: int = 2048, max_indexes: int = 16) -> PassageIndex:
+    """
+    Return an index over passages, reusing one built for the same passages.
+    
+    The Analyst and the Writer of a run retrieve from the same articles,
+    so the second one finds the index already built.
+    """
+    digest = hashlib.sha256()
+    digest.update(str(dim).encode("utf-8"))
+    for passage in passages:
+        digest.update(b"\0" + passage.encode("utf-8"))
+    key = digest.hexdigest()
+    
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is not None:
+            _indexes.move_to_end(key)
+            return index
+    
+    index = PassageIndex(passages, dim)
+    with _indexes_lock:
+        _indexes[key] = index
+        while len(_indexes) > max_indexes:
+            _indexes.popitem(last=False)
+    return index
+
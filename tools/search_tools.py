@@ -1,16 +1,134 @@
 """
 Search and Information Retrieval Tools
 """
-from typing import List, Dict
-from langchain_core.tools import tool
+from typing import Any, List, Dict, Optional
+from weakref import WeakKeyDictionary
+from langchain_core.tools import StructuredTool
+from config.settings import settings
+from tools.cache import tool_cache
 from utils.logger import get_logger
 from utils.helpers import retry_with_backoff
+from utils.tracing import traced
+import asyncio
+import atexit
+import threading
 import time
+import httpx
 
 logger = get_logger(__name__)
 
-@tool
-def fetch_trending_topics(timeframe: str = "week", limit: int = 5) -> List[str]:
+# Pooled HTTP clients shared by every search call in the process; the
+# blocking one is closed at exit, async ones by aclose_http_clients()
+_http_client: Optional[httpx.Client] = None
+_async_http_clients: "WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = WeakKeyDictionary()
+_http_lock = threading.Lock()
+
+def _http_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_connections
+    )
+
+def get_http_client() -> httpx.Client:
+    """Return the process-wide pooled HTTP client for blocking calls."""
+    global _http_client
+    with _http_lock:
+        if _http_client is None:
+            _http_client = httpx.Client(limits=_http_limits(), timeout=settings.timeout_seconds)
+        return _http_client
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    Return the pooled async HTTP client for the running event loop.
+    
+    Async connections are bound to the loop that opened them, so each
+    loop gets one shared client rather than one per call.
+    """
+    loop = asyncio.get_running_loop()
+    with _http_lock:
+        client = _async_http_clients.get(loop)
+        if client is not None and client.is_closed:
+            client = None
+        if client is None:
+            client = httpx.AsyncClient(limits=_http_limits(), timeout=settings.timeout_seconds)
+            _async_http_clients[loop] = client
+        return client
+
+def close_http_clients():
+    """Close the pooled blocking client (registered to run at exit)."""
+    global _http_client
+    with _http_lock:
+        if _http_client is not None:
+            _http_client.close()
+            _http_client = None
+
+async def aclose_http_clients():
+    """Close the running loop's pooled async client; call it before the loop ends."""
+    with _http_lock:
+        client = _async_http_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+atexit.register(close_http_clients)
+
+def _parse_topics(payload: Any, limit: int) -> List[str]:
+    topics = payload.get("topics", []) if isinstance(payload, dict) else payload
+    return [str(topic) for topic in topics][:limit]
+
+def _parse_articles(payload: Any, max_results: int) -> List[Dict[str, str]]:
+    """Normalize a search backend's JSON (a list, or {"articles": [...]}) to article dicts."""
+    items = payload.get("articles", []) if isinstance(payload, dict) else payload
+    return [
+        {
+            "title": item.get("title", ""),
+            "url": item.get("url", ""),
+            "summary": item.get("summary") or item.get("snippet", ""),
+            "source": item.get("source", ""),
+            "date": item.get("date", "")
+        }
+        for item in items[:max_results]
+    ]
+
+TRENDING_TOPICS = [
+    "AI Agents and LangGraph 1.0",
+    "Multi-Agent System Architectures",
+    "OpenAI Operator Platform",
+    "Anthropic Claude 4 Models",
+    "Production LLM Deployment",
+    "RAG Systems Optimization",
+    "Agentic Workflow Patterns",
+    "LLM Cost Optimization",
+]
+
+def _build_articles(topic: str) -> List[Dict[str, str]]:
+    slug = topic.lower().replace(' ', '-')
+    return [
+        {
+            "title": f"Deep Dive into {topic}",
+            "url": f"https://example.com/articles/{slug}",
+            "summary": f"Comprehensive analysis of {topic} covering latest developments, key players, and future implications.",
+            "source": "Tech Blog",
+            "date": "2025-11-01"
+        },
+        {
+            "title": f"{topic}: Best Practices and Patterns",
+            "url": f"https://example.com/guides/{slug}",
+            "summary": f"Practical guide to implementing {topic} in production environments with real-world examples.",
+            "source": "Engineering Digest",
+            "date": "2025-10-28"
+        },
+        {
+            "title": f"The Future of {topic}",
+            "url": f"https://example.com/trends/{slug}",
+            "summary": f"Expert predictions and emerging trends in {topic} for 2025 and beyond.",
+            "source": "Tech Trends",
+            "date": "2025-10-25"
+        }
+    ]
+
+@traced("tool", "fetch_trending_topics")
+@tool_cache.cached("fetch_trending_topics")
+def _fetch_trending_topics(timeframe: str = "week", limit: int = 5) -> List[str]:
     """
     Fetch trending tech topics.
     
@@ -23,31 +141,38 @@ def fetch_trending_topics(timeframe: str = "week", limit: int = 5) -> List[str]:
     """
     logger.info(f"Fetching trending topics for timeframe: {timeframe}")
     
-    # Simulated data - in production, call real APIs like:
-    # - Google Trends API
-    # - Twitter Trends API
-    # - Reddit API
-    # - Hacker News API
+    if settings.trends_api_url:
+        response = get_http_client().get(settings.trends_api_url, params={"timeframe": timeframe, "limit": limit})
+        response.raise_for_status()
+        topics = _parse_topics(response.json(), limit)
+    else:
+        time.sleep(0.5)  # Simulated data when no TRENDS_API_URL is configured
+        topics = TRENDING_TOPICS[:limit]
     
-    time.sleep(0.5)  # Simulate API call
+    logger.info(f"Found {len(topics)} trending topics")
+    return topics
+
+@traced("tool", "fetch_trending_topics")
+@tool_cache.acached("fetch_trending_topics")
+async def _afetch_trending_topics(timeframe: str = "week", limit: int = 5) -> List[str]:
+    """Async variant of fetch_trending_topics using get_async_http_client()."""
+    logger.info(f"Fetching trending topics for timeframe: {timeframe}")
     
-    topics = [
-        "AI Agents and LangGraph 1.0",
-        "Multi-Agent System Architectures",
-        "OpenAI Operator Platform",
-        "Anthropic Claude 4 Models",
-        "Production LLM Deployment",
-        "RAG Systems Optimization",
-        "Agentic Workflow Patterns",
-        "LLM Cost Optimization",
-    ]
+    if settings.trends_api_url:
+        response = await get_async_http_client().get(settings.trends_api_url, params={"timeframe": timeframe, "limit": limit})
+        response.raise_for_status()
+        topics = _parse_topics(response.json(), limit)
+    else:
+        await asyncio.sleep(0.5)  # Simulated data when no TRENDS_API_URL is configured
+        topics = TRENDING_TOPICS[:limit]
     
-    logger.info(f"Found {len(topics[:limit])} trending topics")
-    return topics[:limit]
+    logger.info(f"Found {len(topics)} trending topics")
+    return topics
 
-@tool
+@traced("tool", "search_articles")
+@tool_cache.cached("search_articles")
 @retry_with_backoff()
-def search_articles(topic: str, max_results: int = 3) -> List[Dict[str, str]]:
+def _search_articles(topic: str, max_results: int = 3) -> List[Dict[str, str]]:
     """
     Search for articles about a specific topic.
     
@@ -60,38 +185,48 @@ def search_articles(topic: str, max_results: int = 3) -> List[Dict[str, str]]:
     """
     logger.info(f"Searching articles for topic: {topic}")
     
-    # In production, use:
-    # - Serper API
-    # - Google Custom Search
-    # - Bing Search API
-    # - Brave Search API
+    if settings.search_api_url:
+        response = get_http_client().get(settings.search_api_url, params={"q": topic, "num": max_results})
+        response.raise_for_status()
+        articles = _parse_articles(response.json(), max_results)
+    else:
+        time.sleep(0.3)  # Simulated data when no SEARCH_API_URL is configured
+        articles = _build_articles(topic)[:max_results]
     
-    time.sleep(0.3)  # Simulate API call
+    logger.info(f"Found {len(articles)} articles")
+    return articles
+
+@traced("tool", "search_articles")
+@tool_cache.acached("search_articles")
+@retry_with_backoff()
+async def _asearch_articles(topic: str, max_results: int = 3) -> List[Dict[str, str]]:
+    """Async variant of search_articles using get_async_http_client()."""
+    logger.info(f"Searching articles for topic: {topic}")
     
-    articles = [
-        {
-            "title": f"Deep Dive into {topic}",
-            "url": f"https://example.com/articles/{topic.lower().replace(' ', '-')}",
-            "summary": f"Comprehensive analysis of {topic} covering latest developments, key players, and future implications.",
-            "source": "Tech Blog",
-            "date": "2025-11-01"
-        },
-        {
-            "title": f"{topic}: Best Practices and Patterns",
-            "url": f"https://example.com/guides/{topic.lower().replace(' ', '-')}",
-            "summary": f"Practical guide to implementing {topic} in production environments with real-world examples.",
-            "source": "Engineering Digest",
-            "date": "2025-10-28"
-        },
-        {
-            "title": f"The Future of {topic}",
-            "url": f"https://example.com/trends/{topic.lower().replace(' ', '-')}",
-            "summary": f"Expert predictions and emerging trends in {topic} for 2025 and beyond.",
-            "source": "Tech Trends",
-            "date": "2025-10-25"
-        }
-    ]
+    if settings.search_api_url:
+        response = await get_async_http_client().get(settings.search_api_url, params={"q": topic, "num": max_results})
+        response.raise_for_status()
+        articles = _parse_articles(response.json(), max_results)
+    else:
+        await asyncio.sleep(0.3)  # Simulated data when no SEARCH_API_URL is configured
+        articles = _build_articles(topic)[:max_results]
     
-    logger.info(f"Found {len(articles[:max_results])} articles")
-    return articles[:max_results]
+    logger.info(f"Found {len(articles)} articles")
+    return articles
+
+# Tools expose both entry points: invoke() runs the blocking function and
+# ainvoke() awaits the coroutine instead of borrowing a worker thread. Both
+# share tool_cache, so concurrent callers for the same arguments are
+# coalesced into one backend call and results are reused for the tool's TTL.
+fetch_trending_topics = StructuredTool.from_function(
+    func=_fetch_trending_topics,
+    coroutine=_afetch_trending_topics,
+    name="fetch_trending_topics"
+)
+
+search_articles = StructuredTool.from_function(
+    func=_search_articles,
+    coroutine=_asearch_articles,
+    name="search_articles"
+)
 
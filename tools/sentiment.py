@@ -0,0 +1,180 @@
+"""
+Batch Sentiment Engine
+"""
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+from config.settings import settings
+from utils.logger import get_logger
+import numpy as np
+import re
+import threading
+
+logger = get_logger(__name__)
+
+DEFAULT_LEXICON = Path(__file__).parent / "sentiment_lexicon.tsv"
+
+def load_lexicon(path: Union[str, Path]) -> Dict[str, float]:
+    """
+    Load a weighted lexicon of "term<TAB>weight" lines.
+    
+    Blank lines and lines starting with # are skipped. Terms are
+    lowercased, and runs of whitespace inside phrases are collapsed.
+    """
+    lexicon = {}
+    for number, line in enumerate(Path(path).read_text(encoding="utf-8").splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        term, sep, weight = line.rpartition("\t")
+        if not sep:
+            raise ValueError(f"{path}:{number}: expected <term><TAB><weight>")
+        lexicon[" ".join(term.lower().split())] = float(weight)
+    return lexicon
+
+def _label(score: float, signals: int) -> str:
+    if signals == 0:
+        return "neutral"
+    if score > 60:
+        return "positive"
+    if score < 40:
+        return "negative"
+    return "mixed"
+
+class SentimentEngine:
+    """
+    Lexicon sentiment scorer for batches of documents.
+    
+    Every term is compiled into one case-insensitive alternation with word
+    boundaries, so a document is scanned once regardless of the lexicon
+    size and "good" does not match inside "goodbye". Matches from the
+    whole batch are gathered into flat arrays and summed per document
+    with NumPy.
+    
+    A document's score is its positive weight as a share of all matched
+    weight (0-100, 50 when nothing matched).
+    """
+    
+    def __init__(self, lexicon: Dict[str, float]):
+        terms = sorted(lexicon, key=len, reverse=True)  # Longest phrase wins at a position
+        self._index = {term: i for i, term in enumerate(terms)}
+        self.weights = np.array([lexicon[term] for term in terms], dtype=np.float64)
+        self._pattern = re.compile(
+            r"\b(" + "|".join(r"\s+".join(map(re.escape, term.split())) for term in terms) + r")\b",
+            re.IGNORECASE
+        ) if terms else None
+    
+    @classmethod
+    def from_file(cls, path: Union[str, Path]) -> "SentimentEngine":
+        return cls(load_lexicon(path))
+    
+    def _term_ids(self, text: str) -> List[int]:
+        index = self._index
+        ids = (index.get(" ".join(match.lower().split())) for match in self._pattern.findall(text))
+        return [i for i in ids if i is not None]
+    
+    def score_batch(self, texts: Sequence[str]) -> Dict[str, Any]:
+        """
+        Score every document and the batch as a whole.
+        
+        Args:
+            texts: Documents to score
+        
+        Returns:
+            {"documents": [per-document results], "aggregate": batch result};
+            each result has sentiment, score, confidence, positive_signals
+            and negative_signals
+        """
+        n = len(texts)
+        if self._pattern is None or n == 0:
+            term_ids = np.zeros(0, dtype=np.intp)
+            doc_ids = np.zeros(0, dtype=np.intp)
+        else:
+            matches = [self._term_ids(text) for text in texts]
+            counts = np.fromiter((len(m) for m in matches), dtype=np.intp, count=n)
+            term_ids = np.fromiter((i for m in matches for i in m), dtype=np.intp, count=int(counts.sum()))
+            doc_ids = np.repeat(np.arange(n), counts)
+        
+        weights = self.weights[term_ids]
+        positive = weights > 0
+        negative = weights < 0
+        positive_weight = np.bincount(doc_ids, weights=np.where(positive, weights, 0.0), minlength=n)
+        negative_weight = np.bincount(doc_ids, weights=np.where(negative, -weights, 0.0), minlength=n)
+        positive_signals = np.bincount(doc_ids[positive], minlength=n)
+        negative_signals = np.bincount(doc_ids[negative], minlength=n)
+        
+        total_weight = positive_weight + negative_weight
+        scores = np.full(n, 50.0)
+        np.divide(positive_weight * 100, total_weight, out=scores, where=total_weight > 0)
+        scores = scores.astype(np.int64)
+        signals = positive_signals + negative_signals
+        labels = np.select(
+            [signals == 0, scores > 60, scores < 40],
+            ["neutral", "positive", "negative"],
+            default="mixed"
+        )
+        confidence = np.minimum(signals * 10, 100)
+        
+        documents = [
+            {
+                "sentiment": label,
+                "score": score,
+                "confidence": conf,
+                "positive_signals": pos,
+                "negative_signals": neg
+            }
+            for label, score, conf, pos, neg in zip(
+                labels.tolist(), scores.tolist(), confidence.tolist(),
+                positive_signals.tolist(), negative_signals.tolist()
+            )
+        ]
+        
+        total = total_weight.sum()
+        aggregate = self._result(
+            positive_weight.sum() * 100 / total if total > 0 else 50.0,
+            int(positive_signals.sum()),
+            int(negative_signals.sum())
+        )
+        names, counts = np.unique(labels, return_counts=True)
+        aggregate.update({
+            "documents": n,
+            "mean_score": round(float(scores.mean()), 1) if n else 50.0,
+            "labels": dict(zip(names.tolist(), counts.tolist()))
+        })
+        
+        return {"documents": documents, "aggregate": aggregate}
+    
+    def score(self, text: str) -> Dict[str, Any]:
+        """Score a single document."""
+        return self.score_batch([text])["documents"][0]
+    
+    @staticmethod
+    def _result(score: float, positive_signals: int, negative_signals: int) -> Dict[str, Any]:
+        signals = positive_signals + negative_signals
+        score = int(score)
+        return {
+            "sentiment": _label(score, signals),
+            "score": score,
+            "confidence": min(signals * 10, 100),
+            "positive_signals": positive_signals,
+            "negative_signals": negative_signals
+        }
+
+_engine: Optional[SentimentEngine] = None
+_engine_lock = threading.Lock()
+
+def get_sentiment_engine() -> SentimentEngine:
+    """Return the process-wide engine for the configured lexicon."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            path = settings.sentiment_lexicon or DEFAULT_LEXICON
+            _engine = SentimentEngine.from_file(path)
+            logger.info(f"Loaded {len(_engine.weights)} sentiment terms from {path}")
+        return _engine
+
+def clear_sentiment_engine():
+    """Drop the shared engine so the lexicon is reloaded on next use."""
+    global _engine
+    with _engine_lock:
+        _engine = None
+
@@ -0,0 +1,161 @@
+"""
+Extractive TextRank Summarizer
+"""
+from typing import List, Sequence, Tuple
+from tools.patterns import STOPWORDS
+import numpy as np
+import re
+
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[]?[A-Z0-9])")
+_WORD = re.compile(r"[a-z][a-z0-9]*")
+
+def split_sentences(text: str) -> List[str]:
+    """Split text on sentence-ending punctuation followed by a capitalized word."""
+    return [sentence.strip() for sentence in _SENTENCE_BOUNDARY.split(text.strip()) if sentence.strip()]
+
+def _truncate(text: str, max_length: int) -> str:
+    if len(text) <= max_length:
+        return text
+    if max_length <= 3:
+        # No room for an ellipsis next to any text
+        return text[:max(0, max_length)]
+    return text[:max_length - 3].rstrip() + "..."
+
+class TextRankSummarizer:
+    """
+    Picks the most central sentences of a text without calling a model.
+    
+    Sentences are embedded as TF-IDF rows (IDF over the text's own
+    sentences), compared by cosine similarity in one matrix product, and
+    ranked by PageRank over the similarity graph. The best-ranked
+    sentences that fit within max_length are returned in their original
+    order. Batches of texts are padded into 3-D arrays and ranked
+    together, with one batched matrix product and one power iteration.
+    """
+    
+    def __init__(
+        self,
+        damping: float = 0.85,
+        max_iterations: int = 50,
+        tolerance: float = 1e-6,
+        max_batch_cells: int = 2_000_000
+    ):
+        self.damping = damping
+        self.max_iterations = max_iterations
+        self.tolerance = tolerance
+        # Texts x sentences x terms cells per padded batch; bounds memory
+        self.max_batch_cells = max_batch_cells
+    
+    def rank(self, sentences: Sequence[str]) -> np.ndarray:
+        """TextRank score of every sentence (scores sum to 1)."""
+        return self.rank_batch([sentences])[0]
+    
+    def rank_batch(self, documents: Sequence[Sequence[str]]) -> List[np.ndarray]:
+        """TextRank scores of every sentence of every document, in document order."""
+        results: List[np.ndarray] = [np.ones(len(sentences)) for sentences in documents]
+        
+        # Tokenize every sentence once into (sentence, local term) index arrays
+        terms: List[Tuple[np.ndarray, np.ndarray, int]] = []
+        for sentences in documents:
+            words = [[w for w in _WORD.findall(sentence.lower()) if w not in STOPWORDS] for sentence in sentences]
+            vocabulary = {}
+            cols = [vocabulary.setdefault(w, len(vocabulary)) for sentence_words in words for w in sentence_words]
+            rows = np.repeat(np.arange(len(sentences), dtype=np.intp), [len(w) for w in words])
+            terms.append((rows, np.array(cols, dtype=np.intp), len(vocabulary)))
+        
+        # Group documents of similar shape so padding stays small
+        ranked = sorted((d for d, sentences in enumerate(documents) if len(sentences) > 1),
+                        key=lambda d: (len(documents[d]), terms[d][2]))
+        chunk: List[int] = []
+        for d in ranked:
+            sentences, vocabulary = len(documents[d]), max(1, terms[d][2])
+            if chunk and (len(chunk) + 1) * sentences * vocabulary > self.max_batch_cells:
+                self._rank_chunk(chunk, documents, terms, results)
+                chunk = []
+            chunk.append(d)
+        if chunk:
+            self._rank_chunk(chunk, documents, terms, results)
+        return results
+    
+    def _rank_chunk(
+        self,
+        chunk: List[int],
+        documents: Sequence[Sequence[str]],
+        terms: List[Tuple[np.ndarray, np.ndarray, int]],
+        results: List[np.ndarray]
+    ):
+        sizes = np.array([len(documents[d]) for d in chunk])
+        batch, width = len(chunk), int(sizes.max())
+        vocabulary = max(1, max(terms[d][2] for d in chunk))
+        valid = np.arange(width) < sizes[:, None]
+        n = sizes[:, None].astype(float)
+        
+        counts = np.zeros((batch, width, vocabulary))
+        documents_index = np.repeat(np.arange(batch, dtype=np.intp), [len(terms[d][0]) for d in chunk])
+        rows = np.concatenate([terms[d][0] for d in chunk])
+        cols = np.concatenate([terms[d][1] for d in chunk])
+        np.add.at(counts, (documents_index, rows, cols), 1.0)
+        
+        document_frequency = np.count_nonzero(counts, axis=1)
+        idf = np.log((1 + n) / (1 + document_frequency)) + 1
+        weights = counts * idf[:, None, :]
+        norms = np.linalg.norm(weights, axis=2, keepdims=True)
+        weights = np.divide(weights, norms, out=np.zeros_like(weights), where=norms > 0)
+        
+        similarity = weights @ weights.transpose(0, 2, 1)
+        similarity[:, np.arange(width), np.arange(width)] = 0.0
+        out_weight = similarity.sum(axis=2, keepdims=True)
+        # Sentences with no similar neighbour link to every sentence evenly
+        uniform = np.broadcast_to(valid[:, None, :] / n[:, :, None], similarity.shape)
+        transition = np.where(out_weight > 0, similarity / np.where(out_weight > 0, out_weight, 1.0), uniform)
+        
+        # Padding sentences start at 0 and receive nothing, so they stay 0
+        base = (1 - self.damping) * valid / n
+        scores = valid / n
+        active = np.ones(batch, dtype=bool)
+        for _ in range(self.max_iterations):
+            updated = base + self.damping * (scores[:, None, :] @ transition)[:, 0]
+            converged = np.abs(updated - scores).sum(axis=1) < self.tolerance
+            scores = np.where(active[:, None], updated, scores)
+            active &= ~converged
+            if not active.any():
+                break
+        
+        for b, d in enumerate(chunk):
+            results[d] = scores[b, :sizes[b]]
+    
+    def summarize(self, text: str, max_length: int = 200) -> str:
+        """Summarize one text to at most max_length characters."""
+        return self.summarize_batch([text], max_length)[0]
+    
+    def summarize_batch(self, texts: Sequence[str], max_length: int = 200) -> List[str]:
+        """Summarize many texts, ranked together; texts already within max_length are returned as they are."""
+        summaries = list(texts)
+        pending = [(i, split_sentences(text)) for i, text in enumerate(texts) if len(text) > max_length]
+        for i, sentences in pending:
+            if len(sentences) <= 1:
+                summaries[i] = _truncate(texts[i], max_length)
+        pending = [(i, sentences) for i, sentences in pending if len(sentences) > 1]
+        
+        scores = self.rank_batch([sentences for _, sentences in pending])
+        for (i, sentences), sentence_scores in zip(pending, scores):
+            summaries[i] = self._select(sentences, sentence_scores, max_length)
+        return summaries
+    
+    @staticmethod
+    def _select(sentences: List[str], scores: np.ndarray, max_length: int) -> str:
+        # Greedily take the best-ranked sentences that still fit, leaving
+        # out below-average ones rather than padding the summary with them
+        lengths = np.fromiter((len(s) for s in sentences), dtype=np.intp, count=len(sentences))
+        order = np.argsort(-scores, kind="stable")
+        chosen, used = [], 0
+        for i in order[scores[order] >= scores.mean() - 1e-12]:
+            extra = lengths[i] + (1 if chosen else 0)
+            if used + extra <= max_length:
+                chosen.append(i)
+                used += extra
+        
+        if not chosen:
+            return _truncate(sentences[int(np.argmax(scores))], max_length)
+        return " ".join(sentences[i] for i in sorted(chosen))
+
@@ -0,0 +1,151 @@
+"""
+Per-Topic Memo Store
+"""
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from config.settings import settings
+from utils.logger import get_logger
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+logger = get_logger(__name__)
+
+class TopicMemo:
+    """
+    Articles and per-topic analysis for each trending topic, in SQLite.
+    
+    Every entry remembers a fingerprint of the articles it was computed
+    from. A topic whose articles still have the same fingerprint reuses
+    its summary and insights; a new topic or one with changed articles
+    misses and is recomputed. Entries older than ttl_seconds are ignored.
+    """
+    
+    def __init__(self, path: Path, ttl_seconds: Optional[float] = None):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS topics (
+                topic TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                articles TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                insights TEXT NOT NULL,
+                updated REAL NOT NULL
+            )
+        """)
+        
+        self._stats = {"hits": 0, "misses": 0, "changed": 0, "writes": 0}
+    
+    @staticmethod
+    def fingerprint(articles: List[Dict[str, Any]]) -> str:
+        """Hash a topic's articles, ignoring their order."""
+        items = sorted(
+            json.dumps([a.get("url"), a.get("title"), a.get("summary"), a.get("date")])
+            for a in articles
+        )
+        return hashlib.sha256("\n".join(items).encode("utf-8")).hexdigest()
+    
+    def get(self, topic: str) -> Optional[Dict[str, Any]]:
+        """Return the stored entry for a topic, whatever its fingerprint."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT topic, fingerprint, articles, summary, insights, updated FROM topics WHERE topic = ?",
+                (topic,)
+            ).fetchone()
+        
+        if row is None:
+            return None
+        entry = self._to_dict(row)
+        if self.ttl_seconds is not None and time.time() - entry["updated"] > self.ttl_seconds:
+            return None
+        return entry
+    
+    def lookup(self, topic: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Return the entry for a topic only if it was computed from the same articles."""
+        entry = self.get(topic)
+        with self._lock:
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            if entry["fingerprint"] != fingerprint:
+                self._stats["misses"] += 1
+                self._stats["changed"] += 1
+                return None
+            self._stats["hits"] += 1
+        return entry
+    
+    def put(self, topic: str, fingerprint: str, articles: List[Dict[str, Any]], summary: str, insights: str):
+        """Store a topic's articles and analysis, replacing any older entry."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO topics (topic, fingerprint, articles, summary, insights, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (topic, fingerprint, json.dumps(articles), summary, insights, time.time())
+            )
+            self._stats["writes"] += 1
+    
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._conn.execute("DELETE FROM topics")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the number of stored topics."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM topics").fetchone()[0]
+            stats = dict(self._stats)
+        
+        lookups = stats["hits"] + stats["misses"]
+        stats.update({
+            "entries": entries,
+            "hit_rate": stats["hits"] / lookups if lookups else 0.0
+        })
+        return stats
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+    
+    @staticmethod
+    def _to_dict(row) -> Dict[str, Any]:
+        topic, fingerprint, articles, summary, insights, updated = row
+        return {
+            "topic": topic,
+            "fingerprint": fingerprint,
+            "articles": json.loads(articles),
+            "summary": summary,
+            "insights": insights,
+            "updated": updated
+        }
+
+_topic_memo: Optional[TopicMemo] = None
+_topic_memo_lock = threading.Lock()
+
+def get_topic_memo() -> TopicMemo:
+    """Return the process-wide topic memo (data/topic_memo.sqlite)."""
+    global _topic_memo
+    with _topic_memo_lock:
+        if _topic_memo is None:
+            _topic_memo = TopicMemo(
+                settings.data_dir / "topic_memo.sqlite",
+                ttl_seconds=settings.topic_memo_ttl_days * 86400
+            )
+            logger.info(f"Topic memo at {_topic_memo.path}")
+        return _topic_memo
+
+def clear_topic_memo():
+    """Close the process-wide topic memo (mainly for tests)."""
+    global _topic_memo
+    with _topic_memo_lock:
+        if _topic_memo is not None:
+            _topic_memo.close()
+            _topic_memo = None
+
@@ -1,5 +1,6 @@
 from .logger import get_logger
 from .helpers import format_messages, extract_text, retry_with_backoff
+from .tracing import tracer, traced
 
-__all__ = ['get_logger', 'format_messages', 'extract_text', 'retry_with_backoff']
+__all__ = ['get_logger', 'format_messages', 'extract_text', 'retry_with_backoff', 'tracer', 'traced']
 
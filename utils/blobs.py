@@ -0,0 +1,160 @@
+"""
+Content-Addressed Blob Store
+"""
+from pathlib import Path
+from typing import Any, Optional, Union
+from config.settings import settings
+from utils.logger import get_logger
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+import threading
+import time
+
+logger = get_logger(__name__)
+
+REF_PREFIX = "blob:"
+
+class BlobStore:
+    """
+    Immutable byte blobs on disk, named by the SHA-256 of their content.
+    
+    Storing the same content twice writes it once, and a reference
+    ("blob:<digest>") stays valid for as long as the blob is kept, so
+    workflow state can carry references instead of the text itself.
+    Blobs are read through read-only memory maps. Storing or reading a
+    blob refreshes its age, and blobs left untouched for retention_days
+    are pruned, so a run's references survive as long as it is resumed
+    within that window.
+    """
+    
+    def __init__(self, root: Path, retention_days: Optional[float] = None):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        if retention_days is not None:
+            self.prune(retention_days * 86400)
+    
+    def path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest[2:]
+    
+    def put(self, data: bytes) -> str:
+        """Store bytes and return their digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if path.exists():
+            # Refresh the age so blobs still referenced are not pruned
+            os.utime(path)
+            return digest
+        
+        path.parent.mkdir(exist_ok=True)
+        # Write to a temporary file first so readers never see a partial blob
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        return digest
+    
+    def view(self, digest: str) -> Union[mmap.mmap, memoryview]:
+        """
+        Map a blob into memory (read-only); use it as a context manager.
+        
+        Raises:
+            KeyError: If the blob is not in the store
+        """
+        path = self.path(digest)
+        try:
+            with open(path, "rb") as f:
+                # Refresh the age so blobs still being read are not pruned
+                os.utime(f.fileno())
+                if os.fstat(f.fileno()).st_size == 0:
+                    return memoryview(b"")
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            raise KeyError(f"Unknown blob: {digest}") from None
+    
+    def get(self, digest: str) -> bytes:
+        with self.view(digest) as data:
+            return bytes(data)
+    
+    def __contains__(self, digest: str) -> bool:
+        return self.path(digest).exists()
+    
+    def prune(self, max_age_seconds: float) -> int:
+        """Delete blobs not stored or read within max_age_seconds; returns how many."""
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        for path in self.root.glob("*/*"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        if removed:
+            logger.info(f"Pruned {removed} blobs older than {max_age_seconds / 86400:.1f} days")
+        return removed
+
+_blob_store: Optional[BlobStore] = None
+_blob_store_lock = threading.Lock()
+
+def get_blob_store() -> BlobStore:
+    """Return the process-wide store (data/blobs)."""
+    global _blob_store
+    with _blob_store_lock:
+        if _blob_store is None:
+            _blob_store = BlobStore(settings.data_dir / "blobs", retention_days=settings.blob_retention_days)
+        return _blob_store
+
+def clear_blob_store():
+    """Forget the process-wide store (mainly for tests)."""
+    global _blob_store
+    with _blob_store_lock:
+        _blob_store = None
+
+def is_ref(value: Any) -> bool:
+    return isinstance(value, str) and value.startswith(REF_PREFIX)
+
+def store_text(text: str) -> str:
+    """Store text and return its reference (or the text itself when the store is disabled)."""
+    if not settings.blob_store_enabled:
+        return text
+    return REF_PREFIX + get_blob_store().put(text.encode("utf-8"))
+
+def store_json(value: Any) -> Any:
+    """Store a JSON-serializable value and return its reference (or the value when disabled)."""
+    if not settings.blob_store_enabled:
+        return value
+    payload = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    return REF_PREFIX + get_blob_store().put(payload.encode("utf-8"))
+
+def resolve_text(value: Any, default: str = "") -> str:
+    """
+    Text behind a reference; anything else is returned as it is.
+    
+    Args:
+        value: A reference from store_text, plain text or None
+        default: Returned for None
+    """
+    if value is None:
+        return default
+    if not is_ref(value):
+        return value
+    with get_blob_store().view(value[len(REF_PREFIX):]) as data:
+        return str(data, "utf-8")
+
+def resolve_json(value: Any, default: Any = None) -> Any:
+    """Value behind a reference from store_json; anything else is returned as it is."""
+    if value is None:
+        return default
+    if not is_ref(value):
+        return value
+    with get_blob_store().view(value[len(REF_PREFIX):]) as data:
+        return json.loads(str(data, "utf-8"))
+
@@ -5,6 +5,7 @@ from typing import List, Dict, Any
 from tenacity import retry, stop_after_attempt, wait_exponential
 from config.settings import settings
 from utils.logger import get_logger
+from utils.tokens import count_tokens
 
 logger = get_logger(__name__)
 
@@ -46,6 +47,30 @@ def truncate_text(text: str, max_length: int = 1000) -> str:
     return text[:max_length] + "..."
 
 def count_tokens_estimate(text: str) -> int:
-    """Rough estimate of token count (4 chars ≈ 1 token)."""
-    return len(text) // 4
+    """Token count of text (see utils.tokens.count_tokens)."""
+    return count_tokens(text)
+
+def percentile(values: List[float], q: float) -> float:
+    """Return the q-th percentile (0-100) of values using linear interpolation."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+def latency_summary(values: List[float]) -> Dict[str, float]:
+    """Summarize latencies in seconds as count, mean, p50/p90/p95/p99 and max."""
+    if not values:
+        return {"count": 0, "mean": 0.0, "p50": 0.0, "p90": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 4),
+        "p50": round(percentile(values, 50), 4),
+        "p90": round(percentile(values, 90), 4),
+        "p95": round(percentile(values, 95), 4),
+        "p99": round(percentile(values, 99), 4),
+        "max": round(max(values), 4)
+    }
 
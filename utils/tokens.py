@@ -0,0 +1,176 @@
+"""
+Token Counting and Context Budgets
+"""
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence, Tuple
+from config.settings import settings
+from utils.logger import get_logger
+import hashlib
+import math
+import re
+import threading
+
+logger = get_logger(__name__)
+
+try:
+    import tiktoken
+except ImportError:  # Optional: fall back to the heuristic counter
+    tiktoken = None
+
+# Word pieces and single punctuation marks, roughly how BPE tokenizers split text
+_PIECE_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+_encoding = None
+_encoding_loaded = False
+
+def _get_encoding():
+    """Load the tiktoken encoding once; None when tiktoken or its data is unavailable."""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        if tiktoken is not None:
+            try:
+                _encoding = tiktoken.get_encoding(settings.token_encoding)
+            except Exception as e:
+                logger.warning(f"Token encoding unavailable, using heuristic counts: {str(e)}")
+    return _encoding
+
+def _heuristic_count(text: str) -> int:
+    # Short words are usually one token; longer ones split about every 4 characters
+    return sum(max(1, math.ceil(len(piece) / 4)) for piece in _PIECE_RE.findall(text))
+
+def _count(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return _heuristic_count(text)
+
+# Recent counts keyed by a digest of the text, so prompts and article
+# bodies are not kept alive by the cache
+_COUNT_CACHE_SIZE = 4096
+_counts: "OrderedDict[bytes, int]" = OrderedDict()
+_counts_lock = threading.Lock()
+
+def count_tokens(text: str) -> int:
+    """
+    Count the tokens in text.
+    
+    Uses tiktoken (TOKEN_ENCODING, cl100k_base by default, a close proxy
+    for Llama's tokenizer) when it is installed, otherwise a word-piece
+    heuristic. Results are memoized by a digest of the text, so
+    re-counting the same prompt sections across agents is cheap.
+    """
+    if not text:
+        return 0
+    key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+    with _counts_lock:
+        count = _counts.get(key)
+        if count is not None:
+            _counts.move_to_end(key)
+            return count
+    
+    count = _count(text)
+    with _counts_lock:
+        _counts[key] = count
+        while len(_counts) > _COUNT_CACHE_SIZE:
+            _counts.popitem(last=False)
+    return count
+
+def clear_token_counts():
+    """Forget memoized token counts (mainly for tests)."""
+    with _counts_lock:
+        _counts.clear()
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """
+    Shorten text to at most max_tokens tokens.
+    
+    Whole paragraphs are kept while they fit; only when not even the
+    first paragraph fits is it cut mid-text.
+    """
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    
+    # Binary search for the longest run of leading paragraphs that fits
+    paragraphs = text.split("\n\n")
+    low, high = 0, len(paragraphs) - 1
+    while low < high:
+        mid = (low + high + 1) // 2
+        if count_tokens("\n\n".join(paragraphs[:mid])) <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    kept = paragraphs[:low]
+    if any(p.strip() for p in kept):
+        return "\n\n".join(kept)
+    
+    encoding = _get_encoding()
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+    
+    pieces = list(_PIECE_RE.finditer(text))
+    used = 0
+    for piece in pieces:
+        used += max(1, math.ceil(len(piece.group()) / 4))
+        if used > max_tokens:
+            return text[:piece.start()].rstrip()
+    return text
+
+def fit_sections(
+    sections: Dict[str, str],
+    trim_order: Sequence[str],
+    budget: int,
+    label: str = "prompt"
+) -> Tuple[Dict[str, str], int]:
+    """
+    Trim prompt sections until their total fits a token budget.
+    
+    Sections are trimmed one at a time in trim_order (lowest priority
+    first), each only as much as needed; sections not listed are never
+    trimmed.
+    
+    Args:
+        sections: Section name -> text
+        trim_order: Names of trimmable sections, lowest priority first
+        budget: Token budget for all sections together
+        label: Name used in log messages (usually the agent)
+    
+    Returns:
+        (fitted sections, tokens saved)
+    """
+    fitted = dict(sections)
+    total = sum(count_tokens(text) for text in fitted.values())
+    saved = 0
+    
+    for name in trim_order:
+        if total <= budget:
+            break
+        current = count_tokens(fitted[name])
+        trimmed = truncate_tokens(fitted[name], current - (total - budget))
+        removed = current - count_tokens(trimmed)
+        if removed:
+            fitted[name] = trimmed
+            total -= removed
+            saved += removed
+            logger.info(f"{label}: Trimmed {name} by {removed} tokens to fit a {budget}-token budget")
+    
+    if total > budget:
+        logger.warning(f"{label}: Prompt is {total} tokens, still over its {budget}-token budget")
+    return fitted, saved
+
+def parse_budgets(spec: str) -> Dict[str, int]:
+    """Parse "Writer=6000,Analyst=4000" into a name -> token budget map."""
+    budgets = {}
+    for item in spec.split(","):
+        if "=" in item:
+            name, value = item.split("=", 1)
+            budgets[name.strip()] = int(value)
+    return budgets
+
+def context_budget(agent_name: str) -> Optional[int]:
+    """Return the prompt token budget for an agent (None when budgets are disabled)."""
+    budget = parse_budgets(settings.context_budgets).get(agent_name, settings.context_budget_tokens)
+    return budget if budget > 0 else None
+
@@ -0,0 +1,344 @@
+"""
+Tracing Spans and Metrics Export
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from config.settings import settings
+from utils.logger import get_logger
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import uuid
+
+logger = get_logger(__name__)
+
+# Latency histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+class _NoopSpan:
+    """Span returned while tracing is disabled; every operation is free."""
+    
+    def set(self, **attributes):
+        pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+NOOP_SPAN = _NoopSpan()
+
+class Span:
+    """
+    A timed unit of work (graph node, tool call or LLM call).
+    
+    Spans opened inside another span share its trace id and record it as
+    their parent, including across the worker threads LangGraph uses for
+    parallel branches.
+    """
+    
+    def __init__(self, tracer: "Tracer", kind: str, name: str, attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.kind = kind
+        self.name = name
+        self.attributes = attributes
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = None
+        self.trace_id = None
+        self.error = None
+        self.start = 0.0
+        self.duration = 0.0
+        self._token = None
+    
+    def set(self, **attributes):
+        """Attach attributes such as prompt/completion sizes."""
+        self.attributes.update(attributes)
+    
+    def __enter__(self):
+        parent = _current_span.get()
+        self.parent_id = parent.span_id if parent else None
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self._token = _current_span.set(self)
+        self.start = time.time()
+        self._perf_start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self._perf_start
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        try:
+            _current_span.reset(self._token)
+        except ValueError:
+            # Generators can be closed from a different context than they ran in
+            pass
+        self.tracer._finish(self)
+        return False
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "kind": self.kind,
+            "name": self.name,
+            "start": self.start,
+            "duration": round(self.duration, 6),
+            "error": self.error,
+            "attributes": self.attributes
+        }
+
+class Metrics:
+    """Call/error counters, size counters and latency histograms per (kind, name)."""
+    
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    
+    def observe(self, span: Span):
+        with self._lock:
+            series = self._series.get((span.kind, span.name))
+            if series is None:
+                series = {
+                    "calls": 0,
+                    "errors": 0,
+                    "sum": 0.0,
+                    "buckets": [0] * len(self.buckets),
+                    "prompt_chars": 0,
+                    "completion_chars": 0
+                }
+                self._series[(span.kind, span.name)] = series
+            
+            series["calls"] += 1
+            series["errors"] += span.error is not None
+            series["sum"] += span.duration
+            for i, bound in enumerate(self.buckets):
+                if span.duration <= bound:
+                    series["buckets"][i] += 1
+            series["prompt_chars"] += span.attributes.get("prompt_chars", 0)
+            series["completion_chars"] += span.attributes.get("completion_chars", 0)
+    
+    def snapshot(self) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        with self._lock:
+            return {key: dict(series, buckets=list(series["buckets"])) for key, series in self._series.items()}
+    
+    def render(self) -> str:
+        """Render all series in the Prometheus text exposition format."""
+        snapshot = sorted(self.snapshot().items())
+        lines = []
+        
+        def labels(kind, name, **extra):
+            pairs = {"kind": kind, "name": name, **extra}
+            return ",".join(f'{k}="{_escape_label(v)}"' for k, v in pairs.items())
+        
+        lines.append("# HELP agent_span_duration_seconds Wall time of nodes, tools and LLM calls.")
+        lines.append("# TYPE agent_span_duration_seconds histogram")
+        for (kind, name), series in snapshot:
+            for bound, count in zip(self.buckets, series["buckets"]):
+                lines.append(f'agent_span_duration_seconds_bucket{{{labels(kind, name, le=str(bound))}}} {count}')
+            lines.append(f'agent_span_duration_seconds_bucket{{{labels(kind, name, le="+Inf")}}} {series["calls"]}')
+            lines.append(f'agent_span_duration_seconds_sum{{{labels(kind, name)}}} {series["sum"]:.6f}')
+            lines.append(f'agent_span_duration_seconds_count{{{labels(kind, name)}}} {series["calls"]}')
+        
+        counters = [
+            ("agent_span_calls_total", "calls", "Completed spans."),
+            ("agent_span_errors_total", "errors", "Spans that raised an exception."),
+            ("agent_llm_prompt_chars_total", "prompt_chars", "Characters sent to the model."),
+            ("agent_llm_completion_chars_total", "completion_chars", "Characters received from the model.")
+        ]
+        for metric, field, help_text in counters:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for (kind, name), series in snapshot:
+                if field.endswith("_chars") and kind != "llm":
+                    continue
+                lines.append(f'{metric}{{{labels(kind, name)}}} {series[field]}')
+        
+        return "\n".join(lines) + "\n"
+    
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+class Tracer:
+    """
+    Records spans to a JSONL trace file and aggregates them into metrics.
+    
+    While disabled, span() returns a shared no-op object, so instrumented
+    code pays for one attribute check and nothing else.
+    """
+    
+    def __init__(self, enabled: bool = False, trace_path: Optional[Path] = None, metrics_path: Optional[Path] = None):
+        self.enabled = enabled
+        self.trace_path = trace_path
+        self.metrics_path = metrics_path
+        self.metrics = Metrics()
+        self._lock = threading.Lock()
+        self._file = None
+        self._listeners: List[Callable[[Span], None]] = []
+    
+    def span(self, kind: str, name: str, **attributes):
+        """Open a span as a context manager; use .set() to add attributes."""
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, kind, name, attributes)
+    
+    def add_listener(self, listener: Callable[[Span], None]):
+        """Call listener with every finished span."""
+        with self._lock:
+            self._listeners.append(listener)
+    
+    def remove_listener(self, listener: Callable[[Span], None]):
+        with self._lock:
+            self._listeners.remove(listener)
+    
+    def _finish(self, span: Span):
+        self.metrics.observe(span)
+        for listener in self._listeners:
+            listener(span)
+        if self.trace_path is None:
+            return
+        
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            if self._file is None:
+                self.trace_path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.trace_path, "a", encoding="utf-8", buffering=1)
+            self._file.write(line + "\n")
+    
+    def write_metrics(self, path: Optional[Path] = None) -> Optional[Path]:
+        """Write the Prometheus text file atomically (for node_exporter's textfile collector)."""
+        path = path or self.metrics_path
+        if path is None:
+            return None
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(self.metrics.render(), encoding="utf-8")
+        os.replace(tmp, path)
+        return path
+    
+    def flush(self):
+        """Flush the trace file and rewrite the metrics file."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+        self.write_metrics()
+    
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+@contextmanager
+def capture_spans(write_traces: bool = False) -> Iterator[List[Span]]:
+    """
+    Enable the tracer temporarily and collect every span finished meanwhile.
+    
+    Args:
+        write_traces: Also append the spans to the JSONL trace file
+    
+    Yields:
+        List that fills with finished spans
+    """
+    spans: List[Span] = []
+    enabled, trace_path = tracer.enabled, tracer.trace_path
+    tracer.enabled = True
+    if not write_traces:
+        tracer.trace_path = None
+    tracer.add_listener(spans.append)
+    try:
+        yield spans
+    finally:
+        tracer.remove_listener(spans.append)
+        tracer.enabled, tracer.trace_path = enabled, trace_path
+
+def traced(kind: str, name: Optional[str] = None) -> Callable:
+    """
+    Decorate a sync or async function so each call is recorded as a span.
+    
+    Args:
+        kind: Span kind ("node", "tool", "llm", ...)
+        name: Span name (defaults to the function name)
+    """
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__name__
+        
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def awrapper(*args, **kwargs):
+                if not tracer.enabled:
+                    return await func(*args, **kwargs)
+                with tracer.span(kind, span_name) as span:
+                    result = await func(*args, **kwargs)
+                    _record_result_size(span, result)
+                    return result
+            return awrapper
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with tracer.span(kind, span_name) as span:
+                result = func(*args, **kwargs)
+                _record_result_size(span, result)
+                return result
+        return wrapper
+    return decorator
+
+def _record_result_size(span: Span, result: Any):
+    if isinstance(result, (list, tuple, dict, str)):
+        span.set(result_size=len(result))
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """
+    Serve the tracer's metrics at http://host:port/metrics from a daemon thread.
+    
+    Args:
+        port: Port to listen on (0 picks a free one)
+        host: Interface to bind
+    
+    Returns:
+        The running server (call shutdown() to stop it)
+    """
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = tracer.metrics.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            pass
+    
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    logger.info(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+# Process-wide tracer configured from settings
+tracer = Tracer(
+    enabled=settings.tracing_enabled,
+    trace_path=settings.logs_dir / "traces.jsonl",
+    metrics_path=settings.logs_dir / "metrics.prom"
+)
+
@@ -0,0 +1,78 @@
+"""
+Local Text Vectorization
+"""
+from typing import Collection, Iterable, List
+import re
+import zlib
+import numpy as np
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase and split text into alphanumeric word tokens."""
+    return _WORD_RE.findall(text.lower())
+
+class HashingVectorizer:
+    """
+    Stateless text vectorizer based on the hashing trick.
+    
+    Each text becomes word unigrams, word bigrams and character n-grams
+    of its words, hashed with CRC32 into a fixed number of signed
+    buckets. No vocabulary is stored and nothing leaves the process, so
+    vectors are stable across runs and safe to persist.
+    """
+    
+    def __init__(
+        self,
+        n_features: int = 4096,
+        char_ngram: int = 3,
+        normalize: bool = True,
+        stopwords: Collection[str] = ()
+    ):
+        self.n_features = n_features
+        self.char_ngram = char_ngram
+        self.normalize = normalize
+        self.stopwords = frozenset(stopwords)
+    
+    def features(self, text: str) -> List[str]:
+        """Return the hashed feature strings for a text."""
+        words = tokenize(text)
+        if self.stopwords:
+            words = [w for w in words if w not in self.stopwords]
+        feats = list(words)
+        feats.extend(f"{a} {b}" for a, b in zip(words, words[1:]))
+        
+        n = self.char_ngram
+        if n:
+            for word in words:
+                padded = f"<{word}>"
+                feats.extend(f"#{padded[i:i + n]}" for i in range(len(padded) - n + 1))
+        return feats
+    
+    def transform(self, texts: Iterable[str]) -> np.ndarray:
+        """Vectorize texts into a (len(texts), n_features) float32 matrix."""
+        texts = list(texts)
+        matrix = np.zeros((len(texts), self.n_features), dtype=np.float32)
+        
+        for row, text in enumerate(texts):
+            hashes = np.fromiter(
+                (zlib.crc32(f.encode("utf-8")) for f in self.features(text)),
+                dtype=np.uint32
+            )
+            if not hashes.size:
+                continue
+            signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+            np.add.at(matrix[row], hashes % self.n_features, signs)
+        
+        # Sublinear term frequency dampens repeated boilerplate
+        np.copyto(matrix, np.sign(matrix) * np.log1p(np.abs(matrix)))
+        
+        if self.normalize:
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+    
+    def transform_one(self, text: str) -> np.ndarray:
+        """Vectorize a single text into a 1-D vector."""
+        return self.transform([text])[0]
+
@@ -1,5 +1,23 @@
 from .single_agent import create_single_agent_system
 from .multi_agent import create_multi_agent_system
+from .registry import get_workflow, aget_workflow, make_input, get_output, prewarm, start_run, resume_run, finish_run
+from .batch import run_batch, arun_batch
+from .jobs import JobExecutor, get_job_executor
 
-__all__ = ['create_single_agent_system', 'create_multi_agent_system']
+__all__ = [
+    'create_single_agent_system',
+    'create_multi_agent_system',
+    'get_workflow',
+    'aget_workflow',
+    'make_input',
+    'get_output',
+    'prewarm',
+    'start_run',
+    'resume_run',
+    'finish_run',
+    'run_batch',
+    'arun_batch',
+    'JobExecutor',
+    'get_job_executor'
+]
 
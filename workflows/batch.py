@@ -0,0 +1,191 @@
+"""
+Headless Batch Runner
+"""
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+from config.settings import settings
+from tools.search_tools import aclose_http_clients
+from utils.helpers import latency_summary
+from utils.logger import get_logger
+from utils.tracing import tracer
+from workflows.checkpoints import get_run_store
+from workflows.registry import finish_run, get_output, resume_run, start_run
+import asyncio
+import json
+import threading
+import time
+
+logger = get_logger(__name__)
+
+def load_tasks(path: Path) -> List[Dict[str, Any]]:
+    """
+    Read tasks from a JSONL file.
+    
+    Each line is either a JSON string (the task) or an object with a
+    "task" field and optional "id" and "workflow" fields. Tasks without
+    an id are numbered by line.
+    
+    Args:
+        path: JSONL file of tasks
+    
+    Returns:
+        List of {"id", "task", "workflow"} dicts ("workflow" may be None)
+    """
+    tasks = []
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            if isinstance(item, str):
+                item = {"task": item}
+            if not item.get("task"):
+                raise ValueError(f"{path}:{line_no}: missing 'task'")
+            tasks.append({
+                "id": str(item.get("id", line_no)),
+                "task": item["task"],
+                "workflow": item.get("workflow")
+            })
+    return tasks
+
+def load_completed(path: Path, retry_failed: bool = True) -> Set[str]:
+    """
+    Return the ids already recorded in an output file.
+    
+    Args:
+        path: Output JSONL from an earlier (possibly interrupted) run
+        retry_failed: Leave failed tasks out so they run again
+    """
+    done = set()
+    if not Path(path).exists():
+        return done
+    
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A run killed mid-write can leave a truncated last line
+                continue
+            if record.get("status") == "ok" or not retry_failed:
+                done.add(str(record["id"]))
+    return done
+
+async def arun_batch(
+    input_path: Path,
+    output_path: Path,
+    workflow: str = "multi",
+    workers: Optional[int] = None,
+    resume: bool = True,
+    retry_failed: bool = True,
+    **options
+) -> Dict[str, Any]:
+    """
+    Run every task in a JSONL file and stream results to a JSONL output.
+    
+    Up to `workers` tasks run at once on the compiled graph's async path.
+    Each result is appended and flushed as soon as its task finishes, so
+    an interrupted batch can be resumed from the same output file. With
+    checkpoints enabled each task is run "<output stem>:<id>", and a
+    resumed batch continues failed tasks from their last good step.
+    
+    Args:
+        input_path: JSONL file of tasks (see load_tasks)
+        output_path: JSONL file results are appended to
+        workflow: Default workflow ("multi" or "single") for tasks that don't name one
+        workers: Maximum number of tasks in flight (default: BATCH_WORKERS)
+        resume: Skip tasks already recorded in output_path
+        retry_failed: When resuming, run previously failed tasks again
+        **options: Options for the multi-agent workflow (e.g. include_sentiment)
+    
+    Returns:
+        Summary with counts, wall time, throughput and latency percentiles
+    """
+    workers = workers or settings.batch_workers
+    tasks = load_tasks(input_path)
+    output_path = Path(output_path)
+    completed = load_completed(output_path, retry_failed) if resume else set()
+    pending = [t for t in tasks if t["id"] not in completed]
+    logger.info(f"Batch: {len(pending)} of {len(tasks)} tasks to run with {workers} workers")
+    
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    write_lock = threading.Lock()
+    semaphore = asyncio.Semaphore(workers)
+    latencies: List[float] = []
+    failed = 0
+    
+    async def run(item: Dict[str, Any], out):
+        nonlocal failed
+        name = item["workflow"] or workflow
+        run_id = f"{output_path.stem}:{item['id']}"
+        async with semaphore:
+            start = time.perf_counter()
+            record = {"id": item["id"], "task": item["task"], "workflow": name, "run_id": run_id}
+            config = None
+            try:
+                if resume and _resumable(run_id):
+                    # Runs of this output file still marked running were left by an interrupted batch
+                    graph, inputs, config = await asyncio.to_thread(resume_run, run_id, True)
+                else:
+                    graph, inputs, config = await asyncio.to_thread(
+                        start_run, name, item["task"], run_id, **(options if name == "multi" else {})
+                    )
+                with tracer.span("workflow", name, task_id=item["id"]):
+                    state = await graph.ainvoke(inputs, config)
+                status = await asyncio.to_thread(finish_run, config, state)
+                record.update(status="ok" if status == "completed" else "error", result=get_output(name, state))
+                if status != "completed":
+                    record["error"] = "; ".join(e["error"] for e in state["errors"])
+                    failed += 1
+            except Exception as e:
+                logger.error(f"Batch task {item['id']} failed: {str(e)}")
+                record.update(status="error", error=str(e))
+                failed += 1
+                if config is not None:
+                    await asyncio.to_thread(finish_run, config, None, str(e))
+            record["latency"] = round(time.perf_counter() - start, 4)
+            latencies.append(record["latency"])
+        
+        with write_lock:
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+    
+    start = time.perf_counter()
+    with open(output_path, "a" if resume else "w", encoding="utf-8") as out:
+        await asyncio.gather(*(run(item, out) for item in pending))
+    wall = time.perf_counter() - start
+    await aclose_http_clients()
+    tracer.flush()
+    
+    return {
+        "total": len(tasks),
+        "skipped": len(tasks) - len(pending),
+        "completed": len(pending) - failed,
+        "failed": failed,
+        "wall_seconds": round(wall, 4),
+        "throughput_per_min": round(60 * len(pending) / wall, 2) if wall and pending else 0.0,
+        "latency": latency_summary(latencies)
+    }
+
+def _resumable(run_id: str) -> bool:
+    if not settings.checkpoints_enabled:
+        return False
+    run = get_run_store().get(run_id)
+    return run is not None and run["status"] != "completed"
+
+def run_batch(input_path: Path, output_path: Path, **kwargs) -> Dict[str, Any]:
+    """Blocking wrapper around arun_batch (same arguments)."""
+    return asyncio.run(arun_batch(input_path, output_path, **kwargs))
+
+def format_summary(summary: Dict[str, Any]) -> str:
+    """Render a batch summary for the terminal."""
+    latency = summary["latency"]
+    return "\n".join([
+        f"Tasks: {summary['total']} total, {summary['completed']} completed, "
+        f"{summary['failed']} failed, {summary['skipped']} skipped (already done)",
+        f"Wall time: {summary['wall_seconds']:.1f}s  Throughput: {summary['throughput_per_min']:.2f} tasks/min",
+        f"Latency: mean {latency['mean']:.2f}s  p50 {latency['p50']:.2f}s  p90 {latency['p90']:.2f}s  "
+        f"p95 {latency['p95']:.2f}s  p99 {latency['p99']:.2f}s  max {latency['max']:.2f}s"
+    ])
+
@@ -0,0 +1,223 @@
+"""
+Durable Workflow Checkpoints
+"""
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite import SqliteSaver
+from config.settings import settings
+from utils.logger import get_logger
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+
+logger = get_logger(__name__)
+
+class CompressedSerializer(SerializerProtocol):
+    """
+    LangGraph's msgpack serializer with zlib on large payloads.
+    
+    Checkpoints carry the research notes and article lists, which are
+    mostly repetitive text; compressing anything over min_size bytes keeps
+    the database small for a few hundred microseconds per checkpoint.
+    """
+    
+    SUFFIX = "+zlib"
+    
+    def __init__(self, min_size: int = 1024, level: int = 1):
+        self.min_size = min_size
+        self.level = level
+        self._inner = JsonPlusSerializer()
+    
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        type_, data = self._inner.dumps_typed(obj)
+        if len(data) >= self.min_size:
+            return type_ + self.SUFFIX, zlib.compress(data, self.level)
+        return type_, data
+    
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if type_.endswith(self.SUFFIX):
+            return self._inner.loads_typed((type_[:-len(self.SUFFIX)], zlib.decompress(payload)))
+        return self._inner.loads_typed(data)
+
+class SqliteCheckpointer(SqliteSaver):
+    """
+    SQLite checkpointer that serves both the sync and the async graph API.
+    
+    SqliteSaver guards its single connection with a lock, so the async
+    methods simply run the sync ones on a worker thread.
+    """
+    
+    async def aget_tuple(self, config):
+        return await asyncio.to_thread(self.get_tuple, config)
+    
+    async def alist(self, config, *, filter=None, before=None, limit=None) -> AsyncIterator:
+        items = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+    
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+    
+    async def aput_writes(self, config, writes: Sequence[Tuple[str, Any]], task_id: str, task_path: str = ""):
+        return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+    
+    async def adelete_thread(self, thread_id: str):
+        return await asyncio.to_thread(self.delete_thread, thread_id)
+    
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+class RunStore:
+    """
+    Index of workflow runs (one checkpoint thread each) and their status.
+    
+    Status is "running" until the run finishes as "completed" or
+    "failed"; a "running" entry whose process died is resumable too.
+    """
+    
+    def __init__(self, path: Path):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                workflow TEXT NOT NULL,
+                task TEXT NOT NULL,
+                options TEXT NOT NULL,
+                status TEXT NOT NULL,
+                error TEXT,
+                created REAL NOT NULL,
+                updated REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_updated ON runs(updated)")
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+    
+    def start(self, run_id: str, workflow: str, task: str, options: Dict[str, Any]):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """INSERT INTO runs (run_id, workflow, task, options, status, created, updated)
+                   VALUES (?, ?, ?, ?, 'running', ?, ?)
+                   ON CONFLICT(run_id) DO UPDATE SET status = 'running', error = NULL, updated = excluded.updated""",
+                (run_id, workflow, task, json.dumps(options), now, now)
+            )
+    
+    def finish(self, run_id: str, status: str, error: Optional[str] = None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE runs SET status = ?, error = ?, updated = ? WHERE run_id = ?",
+                (status, error, time.time(), run_id)
+            )
+    
+    def get(self, run_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT run_id, workflow, task, options, status, error, created, updated FROM runs WHERE run_id = ?",
+                (run_id,)
+            ).fetchone()
+        return self._to_dict(row) if row else None
+    
+    def list(self, statuses: Sequence[str] = ("failed", "running"), limit: int = 20) -> List[Dict[str, Any]]:
+        """Most recently updated runs with one of the given statuses."""
+        placeholders = ",".join("?" for _ in statuses)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT run_id, workflow, task, options, status, error, created, updated FROM runs "
+                f"WHERE status IN ({placeholders}) ORDER BY updated DESC LIMIT ?",
+                (*statuses, limit)
+            ).fetchall()
+        return [self._to_dict(row) for row in rows]
+    
+    @staticmethod
+    def _to_dict(row) -> Dict[str, Any]:
+        run_id, workflow, task, options, status, error, created, updated = row
+        return {
+            "run_id": run_id,
+            "workflow": workflow,
+            "task": task,
+            "options": json.loads(options),
+            "status": status,
+            "error": error,
+            "created": created,
+            "updated": updated
+        }
+
+def new_run_id() -> str:
+    return uuid.uuid4().hex
+
+def run_config(run_id: str) -> Dict[str, Any]:
+    """Graph config that checkpoints a run under its id."""
+    return {"configurable": {"thread_id": run_id}}
+
+def resume_point(graph: Any, run_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Return the config to continue a run from, or None if there is nothing to resume.
+    
+    A run that was interrupted continues from its latest checkpoint. A
+    run whose agents reported errors is forked from the last checkpoint
+    before the first error, so only the failed step (and later ones) run
+    again.
+    """
+    config = run_config(run_id)
+    snapshot = graph.get_state(config)
+    if not snapshot.values:
+        return None
+    
+    if snapshot.values.get("errors"):
+        for state in graph.get_state_history(config):
+            if not state.values.get("errors"):
+                return state.config
+        return None
+    
+    return snapshot.config if snapshot.next else None
+
+def _db_path() -> Path:
+    return settings.data_dir / "checkpoints.sqlite"
+
+_checkpointer: Optional[SqliteCheckpointer] = None
+_run_store: Optional[RunStore] = None
+_lock = threading.Lock()
+
+def get_checkpointer() -> SqliteCheckpointer:
+    """Return the process-wide checkpointer (data/checkpoints.sqlite)."""
+    global _checkpointer
+    with _lock:
+        if _checkpointer is None:
+            conn = sqlite3.connect(str(_db_path()), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            _checkpointer = SqliteCheckpointer(conn, serde=CompressedSerializer())
+        return _checkpointer
+
+def get_run_store() -> RunStore:
+    """Return the process-wide run index (stored next to the checkpoints)."""
+    global _run_store
+    with _lock:
+        if _run_store is None:
+            _run_store = RunStore(_db_path())
+        return _run_store
+
+def clear_checkpoints():
+    """Close the checkpointer and run index (mainly for tests)."""
+    global _checkpointer, _run_store
+    with _lock:
+        if _checkpointer is not None:
+            _checkpointer.close()
+            _checkpointer = None
+        if _run_store is not None:
+            _run_store.close()
+            _run_store = None
+
@@ -0,0 +1,191 @@
+"""
+Background Job Executor
+"""
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Sequence, Set
+from config.settings import settings
+from utils.logger import get_logger
+from utils.tracing import tracer
+from workflows.registry import finish_run, resume_run, start_run
+import threading
+import time
+import uuid
+
+logger = get_logger(__name__)
+
+# Statuses a job moves through; "completed" and "failed" are final
+FINISHED = ("completed", "failed")
+
+class JobExecutor:
+    """
+    Runs workflows on a thread pool and keeps their progress in memory.
+    
+    submit() returns a job id straight away and the run streams on a
+    worker thread, recording each node's update, the writer's report
+    tokens and the final state as they arrive. Callers poll get() for a
+    snapshot, so a job outlives the request (or Streamlit rerun) that
+    started it. Only the newest max_jobs finished jobs are kept.
+    """
+    
+    def __init__(self, max_workers: int = 2, max_jobs: int = 50):
+        self.max_jobs = max_jobs
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._futures: Dict[str, Future] = {}
+    
+    def submit(self, name: str, task: str, resume_id: Optional[str] = None, force: bool = False, **options) -> str:
+        """
+        Queue a workflow run and return its job id.
+        
+        Args:
+            name: Workflow name ("single" or "multi")
+            task: Task description
+            resume_id: Continue this failed or interrupted run instead of starting one
+            force: Resume resume_id even if it is still marked running (see resume_run)
+            **options: Keyword arguments for the workflow's create function
+        
+        Raises:
+            ValueError: If an unfinished job is already running resume_id
+        """
+        job_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            if resume_id and resume_id in self._active_run_ids():
+                # Two jobs on one checkpoint thread would overwrite each other
+                raise ValueError(f"Run {resume_id} is already being executed by a job")
+            self._jobs[job_id] = {
+                "id": job_id,
+                "workflow": name,
+                "task": task,
+                "options": options,
+                "run_id": resume_id,
+                "status": "queued",
+                "created": time.time(),
+                "started": None,
+                "finished": None,
+                "nodes": [],
+                "tokens": [],
+                "state": None,
+                "error": None
+            }
+            self._futures[job_id] = self._pool.submit(self._run, job_id, name, task, resume_id, force, options)
+        logger.info(f"Queued {name} job {job_id}")
+        return job_id
+    
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Snapshot of a job, or None if it is unknown or was pruned.
+        
+        Returns:
+            Dict with the job's id, workflow, task, options, run_id, status,
+            timestamps, "nodes" ({"node", "update"} per finished node),
+            "report_preview" (the report streamed so far), "state" (the
+            final state once finished) and "error"
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            snapshot = {**job, "nodes": list(job["nodes"]), "report_preview": "".join(job["tokens"])}
+        del snapshot["tokens"]
+        return snapshot
+    
+    def list(self, job_ids: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Snapshots of the given jobs (default: all), newest first."""
+        with self._lock:
+            ids = list(self._jobs) if job_ids is None else [i for i in job_ids if i in self._jobs]
+        jobs = [job for job in (self.get(i) for i in ids) if job is not None]
+        return sorted(jobs, key=lambda job: job["created"], reverse=True)
+    
+    def active_run_ids(self) -> Set[str]:
+        """Run ids owned by jobs that have not finished."""
+        with self._lock:
+            return self._active_run_ids()
+    
+    def _active_run_ids(self) -> Set[str]:
+        return {job["run_id"] for job in self._jobs.values() if job["run_id"] and job["status"] not in FINISHED}
+    
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Block until a job finishes (or timeout seconds pass) and return its snapshot."""
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None:
+            wait([future], timeout=timeout)
+        return self.get(job_id)
+    
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+    
+    def _run(self, job_id: str, name: str, task: str, resume_id: Optional[str], force: bool, options: Dict[str, Any]):
+        self._update(job_id, status="running", started=time.time())
+        config = None
+        try:
+            if resume_id:
+                graph, inputs, config = resume_run(resume_id, force)
+            else:
+                graph, inputs, config = start_run(name, task, **options)
+            self._update(job_id, run_id=config["configurable"]["thread_id"])
+            
+            state: Dict[str, Any] = {}
+            with tracer.span("workflow", name, resumed=resume_id is not None):
+                for mode, chunk in graph.stream(inputs, config, stream_mode=["updates", "custom", "values"]):
+                    if mode == "values":
+                        state = chunk
+                    elif mode == "updates":
+                        with self._lock:
+                            self._jobs[job_id]["nodes"].extend(
+                                {"node": node, "update": update} for node, update in chunk.items()
+                            )
+                    elif mode == "custom" and chunk.get("token"):
+                        with self._lock:
+                            self._jobs[job_id]["tokens"].append(chunk["token"])
+            tracer.flush()
+            
+            status = finish_run(config, state)
+            error = "; ".join(f"{e['agent']}: {e['error']}" for e in state.get("errors") or []) or None
+            self._update(job_id, status=status, state=state, error=error, finished=time.time())
+            logger.info(f"Job {job_id} {status}")
+        
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {str(e)}")
+            if config is not None:
+                finish_run(config, error=str(e))
+            self._update(job_id, status="failed", error=str(e), finished=time.time())
+        
+        finally:
+            self._prune()
+    
+    def _update(self, job_id: str, **fields):
+        with self._lock:
+            self._jobs[job_id].update(fields)
+    
+    def _prune(self):
+        """Forget the oldest finished jobs beyond max_jobs."""
+        with self._lock:
+            finished = sorted(
+                (job for job in self._jobs.values() if job["status"] in FINISHED),
+                key=lambda job: job["finished"]
+            )
+            for job in finished[:max(0, len(finished) - self.max_jobs)]:
+                del self._jobs[job["id"]]
+                self._futures.pop(job["id"], None)
+
+_job_executor: Optional[JobExecutor] = None
+_job_executor_lock = threading.Lock()
+
+def get_job_executor() -> JobExecutor:
+    """Return the process-wide executor (JOB_WORKERS threads)."""
+    global _job_executor
+    with _job_executor_lock:
+        if _job_executor is None:
+            _job_executor = JobExecutor(settings.job_workers, settings.job_history)
+        return _job_executor
+
+def clear_job_executor():
+    """Wait for running jobs and drop the process-wide executor (mainly for tests)."""
+    global _job_executor
+    with _job_executor_lock:
+        if _job_executor is not None:
+            _job_executor.shutdown()
+            _job_executor = None
+
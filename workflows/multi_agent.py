@@ -1,33 +1,94 @@
 """
 Multi-Agent Workflow
 """
-from typing import TypedDict, Annotated, List, Literal
+from typing import TypedDict, Annotated, Any, Dict, List, Union
+from langchain_core.runnables import RunnableLambda
+from langgraph.config import get_stream_writer
 from langgraph.graph import StateGraph, END
+from agents.base import BaseAgent
 from agents.research_agents import ResearchAgent, DataCollectorAgent
-from agents.analysis_agents import AnalystAgent
+from agents.analysis_agents import AnalystAgent, SentimentAnalyzer
 from agents.writing_agents import WriterAgent
 from utils.logger import get_logger
+from utils.tracing import tracer
 import operator
 
 logger = get_logger(__name__)
 
+def _last_value(current, update):
+    """Reducer that keeps the most recent write, even from parallel branches."""
+    return update
+
 class MultiAgentState(TypedDict):
     """Shared state across all agents."""
     messages: Annotated[List, operator.add]
     current_task: str
+    # Notes and articles are usually blob references (see utils/blobs.py)
     research_notes: str
     trending_topics: List[str]
-    articles: List[dict]
+    articles: Union[List[dict], str]
+    topic_articles: Union[Dict[str, List[dict]], str]
+    dedup_stats: dict
     analysis_results: str
+    topic_sections: Dict[str, str]
     patterns: List[str]
+    sentiment_analysis: dict
     final_report: str
-    next_agent: str
-    status: str
+    next_agent: Annotated[str, _last_value]
+    status: Annotated[str, _last_value]
+    errors: Annotated[List[dict], operator.add]
 
-def create_multi_agent_system():
+def _make_node(label: str, agent: BaseAgent, status: str, stream_tokens: bool = False) -> RunnableLambda:
+    """
+    Wrap an agent as a graph node with both sync and async entry points.
+    
+    The compiled graph calls the sync function from invoke()/stream() and
+    the coroutine from ainvoke()/astream(), so one graph serves both.
+    
+    With stream_tokens, the agent's output chunks are emitted as
+    {"node": label, "token": chunk} events on the graph's "custom"
+    stream mode while the node is still running.
+    
+    Each run is recorded as a "node" span when tracing is enabled.
+    """
+    def token_kwargs():
+        if not stream_tokens:
+            return {}
+        writer = get_stream_writer()
+        return {"on_token": lambda token: writer({"node": label, "token": token})}
+    
+    def run(state: MultiAgentState):
+        logger.info(f"Executing {label} node")
+        with tracer.span("node", label, agent=agent.name):
+            result = agent.execute(state, **token_kwargs())
+        result["status"] = status
+        return result
+    
+    async def arun(state: MultiAgentState):
+        logger.info(f"Executing {label} node")
+        with tracer.span("node", label, agent=agent.name):
+            result = await agent.aexecute(state, **token_kwargs())
+        result["status"] = status
+        return result
+    
+    return RunnableLambda(run, afunc=arun, name=label)
+
+def create_multi_agent_system(include_sentiment: bool = True, checkpointer: Any = None):
     """
     Create a hierarchical multi-agent research system.
     
+    After collection the graph fans out into independent analysis
+    branches (analyst and, optionally, sentiment) that run in the same
+    step; the writer waits for every branch before it starts, so an
+    extra branch only adds latency if it is the slowest one.
+    
+    The compiled graph can be driven synchronously (invoke/stream) or
+    asynchronously (ainvoke/astream) on a shared event loop.
+    
+    Args:
+        include_sentiment: Run SentimentAnalyzer alongside the analyst
+        checkpointer: Saves state after every step so a run can be resumed
+    
     Returns:
         Compiled LangGraph application
     """
@@ -39,43 +100,26 @@ def create_multi_agent_system():
     analyst = AnalystAgent()
     writer = WriterAgent()
     
-    # Define workflow nodes
-    def research_node(state: MultiAgentState):
-        """Research team gathers trending topics."""
-        logger.info("Executing research node")
-        result = researcher.execute(state)
-        result["status"] = "research_complete"
-        return result
-    
-    def collect_node(state: MultiAgentState):
-        """Data collection team gathers detailed information."""
-        logger.info("Executing collection node")
-        result = collector.execute(state)
-        result["status"] = "collection_complete"
-        return result
+    # Define workflow nodes, one per team
+    research_node = _make_node("research", researcher, "research_complete")
+    collect_node = _make_node("collection", collector, "collection_complete")
+    write_node = _make_node("writing", writer, "complete", stream_tokens=True)
     
-    def analyze_node(state: MultiAgentState):
-        """Analysis team processes findings."""
-        logger.info("Executing analysis node")
-        result = analyst.execute(state)
-        result["status"] = "analysis_complete"
-        return result
-    
-    def write_node(state: MultiAgentState):
-        """Writing team creates final report."""
-        logger.info("Executing writing node")
-        result = writer.execute(state)
-        result["status"] = "complete"
-        return result
+    # Parallel analysis branches, joined before the writer
+    analysis_branches = {"analyze": _make_node("analysis", analyst, "analysis_complete")}
+    if include_sentiment:
+        analysis_branches["sentiment"] = _make_node("sentiment", SentimentAnalyzer(), "sentiment_complete")
     
     # Routing logic
-    def route_next(state: MultiAgentState) -> Literal["collect", "analyze", "write", "end"]:
-        """Determine next agent based on state."""
+    def route_next(state: MultiAgentState) -> Union[str, List[str]]:
+        """Determine next agent(s) based on state."""
         next_agent = state.get("next_agent", "end")
         
+        if next_agent == "analyst":
+            return list(analysis_branches)
+        
         routing = {
             "collector": "collect",
-            "analyst": "analyze",
             "writer": "write",
             "END": "end"
         }
@@ -88,19 +132,21 @@ def create_multi_agent_system():
     # Add nodes
     workflow.add_node("research", research_node)
     workflow.add_node("collect", collect_node)
-    workflow.add_node("analyze", analyze_node)
+    for name, node in analysis_branches.items():
+        workflow.add_node(name, node)
     workflow.add_node("write", write_node)
     
     # Set entry point
     workflow.set_entry_point("research")
     
     # Add edges with routing
+    branch_map = {name: name for name in analysis_branches}
     workflow.add_conditional_edges(
         "research",
         route_next,
         {
             "collect": "collect",
-            "analyze": "analyze",
+            **branch_map,
             "write": "write",
             "end": END
         }
@@ -110,22 +156,16 @@ def create_multi_agent_system():
         "collect",
         route_next,
         {
-            "analyze": "analyze",
+            **branch_map,
             "write": "write",
             "end": END
         }
     )
     
-    workflow.add_conditional_edges(
-        "analyze",
-        route_next,
-        {
-            "write": "write",
-            "end": END
-        }
-    )
+    # Fan-in: the writer runs once every analysis branch has finished
+    workflow.add_edge(list(analysis_branches), "write")
     
     workflow.add_edge("write", END)
     
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
 
@@ -0,0 +1,199 @@
+"""
+Compiled Workflow Registry
+"""
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+from config.settings import settings
+from llm.clients import list_chat_models, warm_connection
+from workflows.checkpoints import get_checkpointer, get_run_store, new_run_id, resume_point, run_config
+from workflows.single_agent import create_single_agent_system
+from workflows.multi_agent import create_multi_agent_system
+from utils.logger import get_logger
+import asyncio
+import inspect
+import threading
+
+logger = get_logger(__name__)
+
+WORKFLOW_BUILDERS: Dict[str, Callable[..., Any]] = {
+    "single": create_single_agent_system,
+    "multi": create_multi_agent_system,
+}
+
+_workflows: Dict[Tuple[str, Tuple], Any] = {}
+_workflows_lock = threading.Lock()
+
+def get_workflow(name: str, **options) -> Any:
+    """
+    Return the compiled graph for a workflow, building it on first use.
+    
+    Compiled graphs hold no per-run state, so one instance per
+    (name, options) is shared by every run in the process. With
+    CHECKPOINTS_ENABLED the graph checkpoints each step to SQLite, and
+    every run needs a thread id (see start_run).
+    
+    Args:
+        name: Workflow name ("single" or "multi")
+        **options: Keyword arguments for the workflow's create function
+    
+    Returns:
+        Compiled LangGraph application
+    """
+    # Apply defaults so get_workflow("multi") and an explicit default share a graph
+    builder = WORKFLOW_BUILDERS[name]
+    if settings.checkpoints_enabled:
+        options = {**options, "checkpointer": get_checkpointer()}
+    bound = inspect.signature(builder).bind(**options)
+    bound.apply_defaults()
+    key = (name, tuple(sorted(bound.arguments.items())))
+    
+    with _workflows_lock:
+        graph = _workflows.get(key)
+        if graph is None:
+            logger.info(f"Compiling {name} workflow {dict(options) or ''}")
+            graph = builder(**options)
+            _workflows[key] = graph
+        return graph
+
+async def aget_workflow(name: str, **options) -> Any:
+    """Async variant of get_workflow that builds off the event loop."""
+    return await asyncio.to_thread(get_workflow, name, **options)
+
+def make_input(name: str, task: str) -> Dict[str, Any]:
+    """
+    Build the initial state for running a task through a workflow.
+    
+    Args:
+        name: Workflow name ("single" or "multi")
+        task: Task description
+    
+    Returns:
+        Input dict for the compiled graph
+    """
+    if name == "single":
+        return {"task": task, "messages": [], "errors": []}
+    
+    return {
+        "current_task": task,
+        "messages": [],
+        "research_notes": "",
+        "trending_topics": [],
+        "articles": [],
+        "analysis_results": "",
+        "patterns": [],
+        "sentiment_analysis": {},
+        "final_report": "",
+        "next_agent": "researcher",
+        "status": "started",
+        "errors": []
+    }
+
+def start_run(name: str, task: str, run_id: Optional[str] = None, **options) -> Tuple[Any, Dict[str, Any], Dict[str, Any]]:
+    """
+    Prepare a new run of a workflow.
+    
+    Args:
+        name: Workflow name ("single" or "multi")
+        task: Task description
+        run_id: Id to checkpoint the run under (default: a new one)
+        **options: Keyword arguments for the workflow's create function
+    
+    Returns:
+        (graph, input, config) to pass to graph.invoke/stream/ainvoke/astream;
+        config["configurable"]["thread_id"] is the run id
+    """
+    graph = get_workflow(name, **options)
+    if settings.checkpoints_enabled and run_id:
+        # Reusing an id starts over; old checkpoints would leak state into the new run
+        get_checkpointer().delete_thread(run_id)
+    run_id = run_id or new_run_id()
+    if settings.checkpoints_enabled:
+        get_run_store().start(run_id, name, task, options)
+    return graph, make_input(name, task), run_config(run_id)
+
+def resume_run(run_id: str, force: bool = False) -> Tuple[Any, Optional[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Prepare to continue a failed or interrupted run from its last good checkpoint.
+    
+    Steps that completed are not repeated; when the run never reached a
+    checkpoint it starts over with its original task.
+    
+    Args:
+        run_id: Run to continue
+        force: Also resume a run still marked "running" (its process died);
+            the caller must know nothing is executing it any more
+    
+    Returns:
+        (graph, input, config) like start_run (input is None when resuming
+        from a checkpoint)
+    
+    Raises:
+        ValueError: If the run is unknown, completed, or running and force is not set
+    """
+    if not settings.checkpoints_enabled:
+        raise ValueError("Checkpointing is disabled (CHECKPOINTS_ENABLED=false)")
+    
+    run = get_run_store().get(run_id)
+    if run is None:
+        raise ValueError(f"Unknown run: {run_id}")
+    if run["status"] == "completed":
+        raise ValueError(f"Run {run_id} already completed")
+    if run["status"] == "running" and not force:
+        # Another execution may still be writing its checkpoints
+        raise ValueError(f"Run {run_id} is still running; pass force=True if it was interrupted")
+    
+    graph = get_workflow(run["workflow"], **run["options"])
+    config = resume_point(graph, run_id)
+    get_run_store().start(run_id, run["workflow"], run["task"], run["options"])
+    if config is None:
+        logger.info(f"Run {run_id} has no checkpoint to resume from, starting over")
+        get_checkpointer().delete_thread(run_id)
+        return graph, make_input(run["workflow"], run["task"]), run_config(run_id)
+    
+    logger.info(f"Resuming run {run_id} from checkpoint {config['configurable'].get('checkpoint_id')}")
+    return graph, None, config
+
+def finish_run(config: Dict[str, Any], state: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> str:
+    """
+    Record how a run ended and return its status ("completed" or "failed").
+    
+    A run fails when it raised (error) or an agent reported an error in
+    its final state. Checkpoints of completed runs are deleted unless
+    CHECKPOINT_KEEP_COMPLETED is set.
+    """
+    if error is None and state and state.get("errors"):
+        error = "; ".join(f"{e['agent']}: {e['error']}" for e in state["errors"])
+    status = "failed" if error else "completed"
+    
+    if settings.checkpoints_enabled:
+        run_id = config["configurable"]["thread_id"]
+        get_run_store().finish(run_id, status, error)
+        if status == "completed" and not settings.checkpoint_keep_completed:
+            get_checkpointer().delete_thread(run_id)
+    return status
+
+def get_output(name: str, state: Dict[str, Any]) -> str:
+    """Return the report text from a workflow's final state."""
+    if name == "single":
+        return state.get("result", "")
+    return state.get("final_report", "")
+
+def prewarm(workflows: Iterable[str] = ("single", "multi"), warm_connections: bool = False):
+    """
+    Build the workflows and their model clients ahead of the first run.
+    
+    Args:
+        workflows: Workflow names to compile
+        warm_connections: Also open each client's HTTP connection
+    """
+    for name in workflows:
+        get_workflow(name)
+    
+    if warm_connections:
+        warmed = sum(warm_connection(client) for client in list_chat_models().values())
+        logger.info(f"Warmed {warmed} model connections")
+
+def clear_workflows():
+    """Drop every compiled workflow (mainly for tests)."""
+    with _workflows_lock:
+        _workflows.clear()
+
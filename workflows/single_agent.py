@@ -1,14 +1,16 @@
 """
 Single Agent Workflow
 """
-from typing import TypedDict, Annotated, List
+from typing import TypedDict, Annotated, Any, List
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import create_react_agent
-from langchain_groq import ChatGroq
 from config.settings import settings
+from llm.clients import get_chat_model
 from tools.search_tools import fetch_trending_topics, search_articles
 from tools.analysis_tools import analyze_sentiment
 from utils.logger import get_logger
+from utils.tracing import tracer
 import operator
 
 logger = get_logger(__name__)
@@ -18,22 +20,25 @@ class SingleAgentState(TypedDict):
     messages: Annotated[List, operator.add]
     task: str
     result: str
+    errors: Annotated[List[dict], operator.add]
 
-def create_single_agent_system():
+def create_single_agent_system(checkpointer: Any = None):
     """
     Create a simple single-agent research system.
     
+    The compiled graph supports both invoke()/stream() and
+    ainvoke()/astream().
+    
+    Args:
+        checkpointer: Saves state after every step so a run can be resumed
+    
     Returns:
         Compiled LangGraph application
     """
     logger.info("Creating single agent system")
     
     # Create the agent with tools
-    model = ChatGroq(
-        model=settings.default_model,
-        temperature=0.7,
-        groq_api_key=settings.groq_api_key
-    )
+    model = get_chat_model("groq", settings.default_model, 0.7)
     
     agent = create_react_agent(
         model=model,
@@ -45,13 +50,10 @@ def create_single_agent_system():
     )
     
     # Define the workflow
-    def process_task(state: SingleAgentState):
-        """Process the task using the agent."""
-        logger.info("Single agent processing task")
-        
+    def build_prompt(state: SingleAgentState) -> str:
         task = state.get('task', 'Research trending tech topics')
         
-        prompt = f"""You are a research assistant. Complete this task:
+        return f"""You are a research assistant. Complete this task:
 
 {task}
 
@@ -61,31 +63,53 @@ Use the available tools to:
 3. Analyze the sentiment
 
 Then provide a concise summary (200-300 words)."""
+    
+    def build_result(content: str, error: Exception = None):
+        result = {
+            "result": content,
+            "messages": [{"role": "assistant", "content": content}]
+        }
+        if error is not None:
+            result["errors"] = [{"agent": "single", "error": str(error)}]
+        return result
+    
+    def process_task(state: SingleAgentState):
+        """Process the task using the agent."""
+        logger.info("Single agent processing task")
         
         try:
-            response = agent.invoke({
-                "messages": [{"role": "user", "content": prompt}]
-            })
+            with tracer.span("node", "process"):
+                response = agent.invoke({
+                    "messages": [{"role": "user", "content": build_prompt(state)}]
+                })
             
-            result = response["messages"][-1].content
+            return build_result(response["messages"][-1].content)
+        
+        except Exception as e:
+            logger.error(f"Single agent error: {str(e)}")
+            return build_result(f"Error: {str(e)}", e)
+    
+    async def aprocess_task(state: SingleAgentState):
+        """Process the task using the agent without blocking the event loop."""
+        logger.info("Single agent processing task")
+        
+        try:
+            with tracer.span("node", "process"):
+                response = await agent.ainvoke({
+                    "messages": [{"role": "user", "content": build_prompt(state)}]
+                })
             
-            return {
-                "result": result,
-                "messages": [{"role": "assistant", "content": result}]
-            }
+            return build_result(response["messages"][-1].content)
         
         except Exception as e:
             logger.error(f"Single agent error: {str(e)}")
-            return {
-                "result": f"Error: {str(e)}",
-                "messages": [{"role": "assistant", "content": f"Error: {str(e)}"}]
-            }
+            return build_result(f"Error: {str(e)}", e)
     
     # Build the graph
     workflow = StateGraph(SingleAgentState)
-    workflow.add_node("process", process_task)
+    workflow.add_node("process", RunnableLambda(process_task, afunc=aprocess_task, name="process"))
     workflow.set_entry_point("process")
     workflow.add_edge("process", END)
     
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
 